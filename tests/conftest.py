@@ -23,6 +23,8 @@ if FILENAME not in project_dir_content:
         f'Убедитесь, что у вас верная структура проекта.'
     )
 
+import pytest
+from django.core.cache import cache
 from django.utils.version import get_version
 
 assert get_version() < '3.0.0', 'Пожалуйста, используйте версию Django < 3.0.0'
@@ -37,3 +39,15 @@ pytest_plugins = [
     'tests.fixtures.fixture_user',
     'tests.fixtures.fixture_data',
 ]
+
+
+@pytest.fixture(autouse=True)
+def strict_query_budget(settings):
+    """Превышение бюджета SQL-запросов view роняет тест."""
+    settings.QUERY_BUDGET_STRICT = True
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """База откатывается после каждого теста, значит, и кэш сбрасывается."""
+    cache.clear()
@@ -0,0 +1,25 @@
+API_PER_PAGE_LIMIT = 20
+FIELDS_PARAM = 'fields'
+# Поле ответа -> путь в ORM; связи разворачиваются в JOIN одного запроса.
+API_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'text_html': 'text_html',
+    'excerpt_html': 'excerpt_html',
+    'pub_date': 'pub_date',
+    'updated': 'updated',
+    'author': 'author__username',
+    'author_first_name': 'author__first_name',
+    'author_last_name': 'author__last_name',
+    'group': 'group__slug',
+    'group_title': 'group__title',
+}
+LIST_FIELDS = ('id', 'excerpt_html', 'pub_date', 'author', 'group')
+DETAIL_FIELDS = (
+    'id', 'text', 'text_html', 'pub_date', 'updated', 'author', 'group',
+)
+# Пустая лента группы или автора стоит ещё одного запроса: проверки 404.
+API_QUERY_BUDGETS = {
+    'list': 2,
+    'detail': 1,
+}
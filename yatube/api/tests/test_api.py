@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from api.constants import API_PER_PAGE_LIMIT, LIST_FIELDS
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='test_user')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create([
+            Post(author=cls.user, group=cls.group, text=f'Пост № {i}')
+            for i in range(API_PER_PAGE_LIMIT + 5)
+        ])
+        cls.post = Post.objects.first()
+
+    def test_feeds_page_by_cursor(self):
+        """Тестируем, что ленты API листаются курсором без повторов."""
+
+        urls = (
+            reverse('api:index'),
+            reverse('api:group_list', args=['test_slug']),
+            reverse('api:profile', args=['test_user']),
+        )
+        expected = list(Post.objects.values_list('id', flat=True))
+        for url in urls:
+            with self.subTest(url=url):
+                with self.assertNumQueries(1):
+                    first = self.client.get(url).json()
+                self.assertEqual(set(first['results'][0]), set(LIST_FIELDS))
+                self.assertIsNone(first['previous'])
+                second = self.client.get(first['next']).json()
+                self.assertIsNone(second['next'])
+                ids = [row['id'] for row in
+                       first['results'] + second['results']]
+                self.assertListEqual(ids, expected)
+
+    def test_fields_projection(self):
+        url = reverse('api:post_detail', args=[self.post.pk])
+        with self.assertNumQueries(1):
+            data = self.client.get(url, {'fields': 'id,author,group'}).json()
+        self.assertDictEqual(data, {
+            'id': self.post.pk,
+            'author': 'test_user',
+            'group': 'test_slug',
+        })
+
+        response = self.client.get(url, {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_missing_objects_return_404(self):
+        urls = (
+            reverse('api:post_detail', args=[0]),
+            reverse('api:group_list', args=['missing']),
+            reverse('api:profile', args=['missing']),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
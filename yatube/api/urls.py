@@ -0,0 +1,12 @@
+from django.urls import path
+
+from . import views
+
+app_name: str = 'api'
+
+urlpatterns = [
+    path('posts/', views.index, name='index'),
+    path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('profile/<str:username>/', views.profile, name='profile'),
+    path('group/<slug:slug>/', views.group_posts, name='group_list'),
+]
@@ -0,0 +1,115 @@
+from django.http import Http404, JsonResponse
+
+from core.db_router import read_only
+from core.query_budget import query_budget
+from posts.constants import CURSOR_PARAM
+from posts.models import Group, Post, User
+from posts.utils import CursorPaginator
+
+from .constants import (API_FIELDS, API_PER_PAGE_LIMIT, API_QUERY_BUDGETS,
+                        DETAIL_FIELDS, FIELDS_PARAM, LIST_FIELDS)
+
+
+class InvalidFields(ValueError):
+    """Клиент запросил поля, которых нет в API."""
+
+
+def requested_fields(request, default):
+    raw = request.GET.get(FIELDS_PARAM)
+    if not raw:
+        return default
+    fields = tuple(dict.fromkeys(
+        name.strip() for name in raw.split(',') if name.strip()))
+    unknown = [name for name in fields if name not in API_FIELDS]
+    if unknown or not fields:
+        raise InvalidFields(
+            f'Неизвестные поля: {", ".join(unknown)}. '
+            f'Доступны: {", ".join(API_FIELDS)}.')
+    return fields
+
+
+def project(posts, fields, extra=()):
+    """
+    Один запрос только нужных столбцов: связи попадают в JOIN, а строки
+    приходят словарями, без создания объектов моделей.
+    """
+
+    paths = {API_FIELDS[name] for name in fields} | set(extra)
+    return posts.values(*paths)
+
+
+def serialize(row, fields):
+    return {name: row[API_FIELDS[name]] for name in fields}
+
+
+def page_url(request, cursor):
+    if cursor is None:
+        return None
+    query = request.GET.copy()
+    query[CURSOR_PARAM] = cursor
+    return request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+
+
+def error_response(error):
+    return JsonResponse({'error': str(error)}, status=400)
+
+
+def feed_response(request, posts, exists=None):
+    """
+    Страница ленты по курсору. `exists` проверяет владельца ленты,
+    но только если страница пуста — иначе он заведомо существует.
+    """
+
+    try:
+        fields = requested_fields(request, LIST_FIELDS)
+    except InvalidFields as error:
+        return error_response(error)
+    paginator = CursorPaginator(
+        project(posts, fields, extra=('pub_date', 'id')), API_PER_PAGE_LIMIT)
+    page = paginator.get_cursor_page(request.GET.get(CURSOR_PARAM))
+    if not page.object_list and exists is not None and not exists():
+        raise Http404
+    return JsonResponse({
+        'results': [serialize(row, fields) for row in page.object_list],
+        'next': page_url(request, page.next_cursor()),
+        'previous': page_url(request, page.previous_cursor()),
+    })
+
+
+@read_only
+@query_budget(API_QUERY_BUDGETS['list'])
+def index(request):
+    return feed_response(request, Post.objects.all())
+
+
+@read_only
+@query_budget(API_QUERY_BUDGETS['list'])
+def group_posts(request, slug):
+    return feed_response(
+        request,
+        Post.objects.filter(group__slug=slug),
+        exists=Group.objects.filter(slug=slug).exists,
+    )
+
+
+@read_only
+@query_budget(API_QUERY_BUDGETS['list'])
+def profile(request, username):
+    return feed_response(
+        request,
+        Post.objects.filter(author__username=username),
+        exists=User.objects.filter(username=username).exists,
+    )
+
+
+@read_only
+@query_budget(API_QUERY_BUDGETS['detail'])
+def post_detail(request, post_id):
+    try:
+        fields = requested_fields(request, DETAIL_FIELDS)
+    except InvalidFields as error:
+        return error_response(error)
+    row = project(Post.objects.filter(pk=post_id), fields).first()
+    if row is None:
+        raise Http404
+    return JsonResponse(serialize(row, fields))
@@ -0,0 +1,94 @@
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_out
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils.crypto import constant_time_compare
+
+from .cache import bump_version, get_version, version_key
+
+User = get_user_model()
+
+USER_CACHE_TIMEOUT = 60 * 60
+
+
+def user_version_key(user_id):
+    return version_key('auth_user', user_id)
+
+
+def bump_user(user_id):
+    bump_version(user_version_key(user_id))
+
+
+def session_user_id(request):
+    """id пользователя из сессии, если он вошёл известным бэкендом."""
+
+    session = request.session
+    if session.get(auth.BACKEND_SESSION_KEY) not in (
+            settings.AUTHENTICATION_BACKENDS):
+        return None
+    return session.get(auth.SESSION_KEY)
+
+
+def hash_matches(request, user):
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+    return bool(session_hash) and constant_time_compare(
+        session_hash, user.get_session_auth_hash())
+
+
+def get_cached_user(request):
+    """
+    Пользователь запроса из кэша под версией, которую сбрасывают его
+    сохранение, удаление, смена групп и прав и выход. Промах или
+    несовпадение хэша пароля в сессии — обычный `auth.get_user()`,
+    который при необходимости и сессию сбросит.
+    """
+
+    user_id = session_user_id(request)
+    if user_id is None:
+        return auth.get_user(request)
+    key = f'auth_user:{user_id}:{get_version(user_version_key(user_id))}'
+    user = cache.get(key)
+    if user is not None and hash_matches(request, user):
+        return user
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        cache.set(key, user, USER_CACHE_TIMEOUT)
+    return user
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    bump_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def invalidate_logged_out_user(sender, user, **kwargs):
+    if user is not None:
+        bump_user(user.pk)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def invalidate_user_access(sender, instance, action, reverse, pk_set,
+                           **kwargs):
+    """
+    Группы и права меняются и со стороны пользователя, и со стороны
+    группы или права; во втором случае затронуты пользователи из pk_set,
+    а при очистке — все, кто был связан с объектом до неё.
+    """
+
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        bump_user(instance.pk)
+        return
+    if action == 'pre_clear':
+        pk_set = sender.objects.filter(
+            **{instance._meta.model_name: instance},
+        ).values_list('user_id', flat=True)
+    for user_id in pk_set:
+        bump_user(user_id)
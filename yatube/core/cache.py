@@ -0,0 +1,53 @@
+import time
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+
+VERSION_KEY_PREFIX = 'version'
+
+
+def cache_is_shared(alias='default'):
+    """
+    Общий ли кэш для всех процессов сайта. Локальный кэш у каждого
+    процесса свой: сброс версии в одном из них другие не видят.
+    """
+
+    return not isinstance(caches[alias], LocMemCache)
+
+
+def version_key(*parts):
+    return ':'.join(str(part) for part in (VERSION_KEY_PREFIX,) + parts)
+
+
+def _seed():
+    """
+    Начальное значение версии. Берётся от времени, чтобы после вытеснения
+    ключа из кэша версия не вернулась к уже использованному значению.
+    """
+    return int(time.time() * 1000)
+
+
+def get_versions(keys):
+    """Возвращает версии для ключей одним обращением к кэшу."""
+
+    keys = list(keys)
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _seed(), None)
+            versions[key] = cache.get(key, _seed())
+    return versions
+
+
+def get_version(key):
+    return get_versions([key])[key]
+
+
+def bump_version(key):
+    """Увеличивает версию, делая недействительными все зависимые ключи."""
+
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, _seed(), None)
+        return cache.incr(key)
@@ -0,0 +1,66 @@
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.memcached import PyLibMCCache
+
+from .timing import timed
+
+_missing = object()
+
+
+class TimedCacheMixin:
+    """
+    Учитывает время обращений к кэшу и попадания в метриках запроса.
+    `BaseCache.get_many` читает ключи через `get()`; такие чтения уже
+    учтены самим `get_many` и второй раз не считаются. Объект кэша у
+    каждого потока свой, так что флаг в нём безопасен.
+    """
+
+    _in_get_many = False
+
+    def get(self, key, default=None, version=None):
+        if self._in_get_many:
+            return super().get(key, default, version)
+        with timed('cache') as timings:
+            value = super().get(key, _missing, version)
+        self._count(timings, hits=int(value is not _missing))
+        return default if value is _missing else value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        self._in_get_many = True
+        try:
+            with timed('cache') as timings:
+                values = super().get_many(keys, version)
+        finally:
+            self._in_get_many = False
+        self._count(timings, hits=len(values), total=len(keys))
+        return values
+
+    def set(self, *args, **kwargs):
+        with timed('cache'):
+            return super().set(*args, **kwargs)
+
+    def add(self, *args, **kwargs):
+        with timed('cache'):
+            return super().add(*args, **kwargs)
+
+    def incr(self, *args, **kwargs):
+        with timed('cache'):
+            return super().incr(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with timed('cache'):
+            return super().delete(*args, **kwargs)
+
+    def _count(self, timings, hits, total=1):
+        if timings is None:
+            return
+        timings.cache_hits += hits
+        timings.cache_misses += total - hits
+
+
+class TimedLocMemCache(TimedCacheMixin, LocMemCache):
+    pass
+
+
+class TimedPyLibMCCache(TimedCacheMixin, PyLibMCCache):
+    pass
@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+from .cache import cache_is_shared
+
+CACHED_SESSION_ENGINES = (
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.cached_db',
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Кэш страниц, карточек, лент и кольца главной сбрасывается версиями,
+    и сброс виден только процессам с общим кэшем. С локальным кэшем
+    сайт можно запускать лишь одним процессом.
+    """
+
+    if cache_is_shared():
+        return []
+    return [Error(
+        'Кэш по умолчанию локален для процесса: сброс версий после '
+        'записи не дойдёт до других процессов сайта.',
+        hint='Задайте YATUBE_MEMCACHED или запускайте сайт одним '
+             'процессом.',
+        id='core.E001',
+    )]
+
+
+@register(Tags.security, Tags.caches)
+def check_cached_sessions(app_configs, **kwargs):
+    """
+    Сессии и пользователь из локального кэша переживают выход и смену
+    пароля в другом процессе, поэтому без общего кэша они не кэшируются.
+    """
+
+    cached = (
+        settings.SESSION_ENGINE in CACHED_SESSION_ENGINES
+        or 'core.middleware.CachedAuthenticationMiddleware'
+        in settings.MIDDLEWARE
+    )
+    if not cached or cache_is_shared():
+        return []
+    return [Error(
+        'Сессии или пользователь запроса кэшируются в кэше, локальном '
+        'для процесса: завершённая сессия останется активной в других '
+        'процессах.',
+        hint='Задайте YATUBE_MEMCACHED или используйте сессии в базе и '
+             'AuthenticationMiddleware.',
+        id='core.E002',
+    )]
+
+
+@register(Tags.security, Tags.caches)
+def check_rate_limit_cache(app_configs, **kwargs):
+    """Счётчики лимитов в локальном кэше умножают лимит на число процессов."""
+
+    if not settings.RATE_LIMITS_ENABLED or cache_is_shared():
+        return []
+    return [Error(
+        'Лимиты частоты считаются в кэше, локальном для процесса: каждый '
+        'процесс сайта пропустит свой лимит.',
+        hint='Задайте YATUBE_MEMCACHED или выключите RATE_LIMITS_ENABLED.',
+        id='core.E003',
+    )]
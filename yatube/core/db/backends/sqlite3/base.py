@@ -0,0 +1,114 @@
+import re
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import OperationalError
+from django.db.backends.sqlite3 import base
+
+from core.db.stats import connection_stats
+from core.timing import timed
+
+# Значения по умолчанию; переопределяются ключом PRAGMAS в DATABASES.
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+}
+PRAGMA_RE = re.compile(r'^-?\w+$')
+# Как транзакция берёт блокировку; переопределяется ключом
+# TRANSACTION_MODE в DATABASES. IMMEDIATE берёт блокировку записи в
+# BEGIN: ожидание видно отдельно, а не внутри первой записи, и
+# транзакция не упирается в SQLITE_BUSY при переходе от чтения к записи.
+DEFAULT_TRANSACTION_MODE = 'IMMEDIATE'
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+def is_write(query):
+    return query.lstrip()[:7].upper().startswith(WRITE_PREFIXES)
+
+
+def counting_lock_errors(func, *args):
+    # BEGIN идёт через курсор Django, и ошибка приходит уже обёрнутой.
+    try:
+        return func(*args)
+    except (base.Database.OperationalError, OperationalError) as error:
+        if 'locked' in str(error):
+            connection_stats.record_lock_error()
+        raise
+
+
+def timed_write(func, *args):
+    """
+    Выполняет запись, учитывая её время в статистике процесса и в
+    метриках запроса. Вне транзакции в него входит и ожидание
+    блокировки.
+    """
+
+    started = time.perf_counter()
+    try:
+        with timed('write'):
+            return counting_lock_errors(func, *args)
+    finally:
+        connection_stats.record_write(time.perf_counter() - started)
+
+
+class TimedCursorWrapper(base.SQLiteCursorWrapper):
+    def execute(self, query, params=None):
+        if not is_write(query):
+            return super().execute(query, params)
+        return timed_write(super().execute, query, params)
+
+    def executemany(self, query, param_list):
+        return timed_write(super().executemany, query, param_list)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite-бэкенд, который при открытии соединения применяет PRAGMA
+    (WAL, synchronous, mmap, кэш страниц, ожидание блокировки), начинает
+    транзакции с BEGIN IMMEDIATE и ведёт статистику открытий соединений,
+    времени записей и ожидания блокировки.
+    """
+
+    def pragmas(self):
+        pragmas = {**DEFAULT_PRAGMAS, **self.settings_dict.get('PRAGMAS', {})}
+        for name, value in pragmas.items():
+            if not (PRAGMA_RE.match(name) and PRAGMA_RE.match(str(value))):
+                raise ImproperlyConfigured(
+                    f'Недопустимая PRAGMA {name} = {value!r}.')
+        return pragmas
+
+    def transaction_mode(self):
+        mode = self.settings_dict.get(
+            'TRANSACTION_MODE', DEFAULT_TRANSACTION_MODE)
+        if mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f'Недопустимый TRANSACTION_MODE {mode!r}.')
+        return mode
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas().items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        connection_stats.record_open(self.alias)
+        return conn
+
+    def create_cursor(self, name=None):
+        return self.connection.cursor(factory=TimedCursorWrapper)
+
+    def _start_transaction_under_autocommit(self):
+        started = time.perf_counter()
+        try:
+            with timed('lock'):
+                counting_lock_errors(
+                    self.cursor().execute, f'BEGIN {self.transaction_mode()}')
+        finally:
+            connection_stats.record_lock_wait(time.perf_counter() - started)
+
+    def _commit(self):
+        if self.connection is None:
+            return None
+        return timed_write(super()._commit)
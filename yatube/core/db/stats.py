@@ -0,0 +1,62 @@
+import threading
+
+
+class ConnectionStats:
+    """
+    Счётчики уровня процесса: сколько соединений открыто, сколько
+    времени заняли записи и сколько транзакции ждали блокировку записи.
+    Транзакция берёт блокировку сразу, в BEGIN IMMEDIATE, и её записи
+    уже не ждут; у записи вне транзакции ожидание входит в её время.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._opens = {}
+            self._writes = 0
+            self._write_seconds = 0.0
+            self._max_write_seconds = 0.0
+            self._lock_waits = 0
+            self._lock_wait_seconds = 0.0
+            self._max_lock_wait_seconds = 0.0
+            self._lock_errors = 0
+
+    def record_open(self, alias):
+        with self._lock:
+            self._opens[alias] = self._opens.get(alias, 0) + 1
+
+    def record_write(self, seconds):
+        with self._lock:
+            self._writes += 1
+            self._write_seconds += seconds
+            self._max_write_seconds = max(self._max_write_seconds, seconds)
+
+    def record_lock_wait(self, seconds):
+        with self._lock:
+            self._lock_waits += 1
+            self._lock_wait_seconds += seconds
+            self._max_lock_wait_seconds = max(
+                self._max_lock_wait_seconds, seconds)
+
+    def record_lock_error(self):
+        with self._lock:
+            self._lock_errors += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'opens': dict(self._opens),
+                'writes': self._writes,
+                'write_seconds': self._write_seconds,
+                'max_write_seconds': self._max_write_seconds,
+                'lock_waits': self._lock_waits,
+                'lock_wait_seconds': self._lock_wait_seconds,
+                'max_lock_wait_seconds': self._max_lock_wait_seconds,
+                'lock_errors': self._lock_errors,
+            }
+
+
+connection_stats = ConnectionStats()
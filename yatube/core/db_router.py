@@ -0,0 +1,103 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.db import connections
+
+PRIMARY_DB_ALIAS = 'default'
+REPLICA_DB_ALIAS = 'replica'
+# Сессии и пользователи читаются лениво, уже после включения реплики;
+# с отстающей реплики только что вошедший пользователь выглядел бы
+# вышедшим.
+PRIMARY_ONLY_APPS = frozenset(('sessions', 'auth'))
+
+_use_replica = ContextVar('use_replica', default=False)
+
+
+def read_only(view):
+    """Помечает view, чтения которой можно отдать реплике."""
+
+    view.read_only = True
+    return view
+
+
+def use_replica():
+    return _use_replica.get()
+
+
+def begin_routing():
+    """Начинает запрос с чтений из основной базы; возвращает токен."""
+
+    return _use_replica.set(False)
+
+
+def enable_replica_reads():
+    _use_replica.set(True)
+
+
+def end_routing(token):
+    _use_replica.reset(token)
+
+
+@contextmanager
+def replica_reads():
+    """Направляет чтения внутри блока `with` на реплику."""
+
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Направляет чтения внутри блока `with` в основную базу."""
+
+    token = _use_replica.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def fills_cache(func):
+    """
+    Чтения функции, результат которой попадает в кэш, идут в основную
+    базу. Сигналы записи уже сбросили версии кэша, и данные отстающей
+    реплики легли бы под новую версию и жили бы до её следующего сброса.
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with primary_reads():
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+    """
+    Все записи идут в основную базу. Чтения уходят на реплику, только
+    если она настроена и текущий запрос помечен как читающий
+    (см. `ReplicaRoutingMiddleware`); иначе — тоже в основную базу.
+    Сессии и пользователи всегда читаются из основной базы.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return PRIMARY_DB_ALIAS
+        if use_replica() and REPLICA_DB_ALIAS in connections:
+            return REPLICA_DB_ALIAS
+        return PRIMARY_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплика — копия основной базы, объекты из них можно связывать.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема реплики приходит вместе с данными из основной базы.
+        return db == PRIMARY_DB_ALIAS
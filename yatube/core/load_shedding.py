@@ -0,0 +1,97 @@
+import threading
+import time
+
+from django.conf import settings
+
+# Вес нового ответа в скользящем среднем задержки.
+LATENCY_ALPHA = 0.2
+# Переопределяются ключами settings.LOAD_SHEDDING. Запросы из
+# RATE_LIMITS получают 503, когда параллельных запросов больше
+# SHED_IN_FLIGHT, средняя задержка выше MAX_LATENCY_MS или ожидание
+# в очереди прокси (заголовок QUEUE_HEADER) выше MAX_QUEUE_MS; все
+# запросы — при MAX_IN_FLIGHT. Средняя задержка забывается через
+# LATENCY_TTL секунд без ответов.
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+    'MAX_IN_FLIGHT': 64,
+    'SHED_IN_FLIGHT': 16,
+    'MAX_LATENCY_MS': 1000,
+    'MAX_QUEUE_MS': 500,
+    'QUEUE_HEADER': 'X-Request-Start',
+    'RETRY_AFTER': 5,
+    'LATENCY_TTL': 10,
+}
+
+
+def shedding_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'LOAD_SHEDDING', {})}
+
+
+def queue_ms(request, header, now):
+    """
+    Сколько запрос ждал воркера, по метке прокси вида `t=1700000000.123`
+    (nginx, в секундах) или `t=1700000000123` (мс, мкс). None, если
+    заголовка нет или он не разбирается.
+    """
+
+    raw = request.META.get('HTTP_' + header.upper().replace('-', '_'))
+    if not raw:
+        return None
+    try:
+        stamp = float(raw[2:] if raw.startswith('t=') else raw)
+    except ValueError:
+        return None
+    while stamp > now * 100:
+        stamp /= 1000
+    return max(now - stamp, 0) * 1000
+
+
+class LoadMonitor:
+    """
+    Нагрузка процесса: сколько запросов выполняется сейчас и скользящее
+    среднее их задержки. Среднее забывается через `ttl` секунд без
+    ответов, чтобы отсечение не держалось само собой.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.latency_ms = 0.0
+        self.updated = 0.0
+
+    def start(self):
+        with self.lock:
+            self.in_flight += 1
+            return self.in_flight
+
+    def finish(self, elapsed_ms=None):
+        with self.lock:
+            self.in_flight -= 1
+            if elapsed_ms is None:
+                return
+            self.latency_ms += LATENCY_ALPHA * (elapsed_ms - self.latency_ms)
+            self.updated = time.monotonic()
+
+    def current_latency_ms(self, ttl):
+        if time.monotonic() - self.updated > ttl:
+            return 0.0
+        return self.latency_ms
+
+
+monitor = LoadMonitor()
+
+
+def overloaded(in_flight, request, options):
+    """
+    Перегружен ли процесс для дорогих запросов: слишком много
+    параллельных, велика средняя задержка или ожидание в очереди
+    перед воркером.
+    """
+
+    waited = queue_ms(request, options['QUEUE_HEADER'], time.time())
+    return (
+        in_flight > options['SHED_IN_FLIGHT']
+        or monitor.current_latency_ms(options['LATENCY_TTL'])
+        > options['MAX_LATENCY_MS']
+        or (waited is not None and waited > options['MAX_QUEUE_MS'])
+    )
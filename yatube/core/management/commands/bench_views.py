@@ -0,0 +1,156 @@
+import json
+import math
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from about import urls as about_urls
+from core.query_budget import QueryCounter
+from posts import urls as posts_urls
+from posts.models import Group, Post
+
+User = get_user_model()
+
+LOGIN_REQUIRED = {'posts:post_create', 'posts:post_edit'}
+# Потоковые выгрузки для персонала — не страницы, их задержку не меряем.
+SKIPPED = {'posts:profile_export', 'posts:group_export'}
+
+
+def percentile(values, share):
+    """Перцентиль методом ближайшего ранга."""
+
+    ordered = sorted(values)
+    rank = max(math.ceil(share * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет p50/p95/p99 времени ответа, число SQL-запросов и размер '
+        'ответа для каждого URL из posts/urls.py и about/urls.py. '
+        'Результат пишется в JSON для сравнения прогонов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument(
+            '--as', dest='modes', choices=('anonymous', 'user', 'both'),
+            default='both',
+            help='От чьего имени запрашивать публичные страницы.',
+        )
+        parser.add_argument(
+            '--output', help='Файл для JSON; по умолчанию stdout.')
+
+    def handle(self, *args, iterations, warmup, modes, output, **options):
+        author = (
+            User.objects.annotate(total=Count('posts'))
+            .filter(total__gt=0).order_by('-total').first()
+        )
+        if author is None:
+            raise CommandError('В базе нет постов, сначала запустите '
+                               'seed_data.')
+        self.targets = self.build_targets(author)
+        clients = self.build_clients(author, modes)
+
+        results = []
+        for name, url in self.iter_urls():
+            for mode, client in clients.items():
+                if mode == 'anonymous' and name in LOGIN_REQUIRED:
+                    continue
+                results.append(self.measure(
+                    client, name, url, mode, iterations, warmup))
+
+        report = {
+            'created': timezone.now().isoformat(),
+            'iterations': iterations,
+            'warmup': warmup,
+            'dataset': {
+                'users': User.objects.count(),
+                'groups': Group.objects.count(),
+                'posts': Post.objects.count(),
+            },
+            'results': results,
+        }
+        payload = json.dumps(report, ensure_ascii=False, indent=2)
+        if output:
+            with open(output, 'w', encoding='utf-8') as file:
+                file.write(payload)
+        else:
+            self.stdout.write(payload)
+
+    def build_targets(self, author):
+        """Аргументы URL: самые тяжёлые автор, группа и пост автора."""
+
+        group = Group.objects.order_by('-posts_count').first()
+        post = Post.objects.filter(author=author).first()
+        profile = {'username': author.username}
+        group = {'slug': group.slug} if group else None
+        return {
+            'posts:profile': profile,
+            'posts:profile_rss': profile,
+            'posts:profile_atom': profile,
+            'posts:post_detail': {'post_id': post.pk},
+            'posts:post_edit': {'post_id': post.pk},
+            'posts:group_list': group,
+            'posts:group_rss': group,
+            'posts:group_atom': group,
+        }
+
+    def build_clients(self, author, modes):
+        clients = {}
+        if modes in ('anonymous', 'both'):
+            clients['anonymous'] = Client()
+        if modes in ('user', 'both'):
+            clients['user'] = Client()
+            clients['user'].force_login(author)
+        return clients
+
+    def iter_urls(self):
+        for module in (posts_urls, about_urls):
+            for pattern in module.urlpatterns:
+                name = f'{module.app_name}:{pattern.name}'
+                if name in SKIPPED:
+                    continue
+                kwargs = self.targets.get(name, {})
+                if kwargs is None:
+                    self.stderr.write(f'Пропускаю {name}: нет данных')
+                    continue
+                yield name, reverse(name, kwargs=kwargs)
+
+    def measure(self, client, name, url, mode, iterations, warmup):
+        for _ in range(warmup):
+            client.get(url)
+        timings, queries, sizes = [], [], []
+        for _ in range(iterations):
+            with QueryCounter() as counter:
+                started = time.perf_counter()
+                response = client.get(url)
+                elapsed = time.perf_counter() - started
+            timings.append(elapsed * 1000)
+            queries.append(counter.count)
+            sizes.append(len(response.content))
+        result = {
+            'name': name,
+            'url': url,
+            'as': mode,
+            'status': response.status_code,
+            'p50_ms': round(percentile(timings, 0.50), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'p99_ms': round(percentile(timings, 0.99), 3),
+            'mean_ms': round(statistics.mean(timings), 3),
+            'queries': max(queries),
+            'bytes': max(sizes),
+        }
+        self.stderr.write(
+            f"{name:<20} {mode:<9} p50={result['p50_ms']:>8.2f} "
+            f"p95={result['p95_ms']:>8.2f} p99={result['p99_ms']:>8.2f} мс "
+            f"запросов={result['queries']:<3} байт={result['bytes']}"
+        )
+        return result
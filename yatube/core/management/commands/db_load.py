@@ -0,0 +1,114 @@
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from core.db.stats import connection_stats
+from posts.models import Post
+
+from .bench_views import percentile
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Параллельно читает ленту и правит посты из нескольких потоков, '
+        'затем печатает задержки, число открытых соединений, время '
+        'записей, ожидание блокировки записи в начале транзакций и '
+        'число ошибок блокировки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument(
+            '--duration', type=float, default=10.0,
+            help='Длительность нагрузки в секундах.',
+        )
+
+    def handle(self, *args, readers, writers, duration, **options):
+        author = (
+            User.objects.annotate(total=Count('posts'))
+            .filter(total__gt=0).order_by('-total').first()
+        )
+        if author is None:
+            raise CommandError('В базе нет постов, сначала запустите '
+                               'seed_data.')
+        post = Post.objects.filter(author=author).first()
+        self.targets = {
+            'read': (reverse('posts:index'), None),
+            'write': (
+                reverse('posts:post_edit', args=[post.pk]),
+                {'text': post.text, 'group': post.group_id or ''},
+            ),
+        }
+        self.timings = {'read': [], 'write': []}
+        self.errors = 0
+        self.lock = threading.Lock()
+        connection_stats.reset()
+
+        deadline = time.monotonic() + duration
+        threads = [
+            threading.Thread(target=self.work, args=(kind, author, deadline))
+            for kind, count in (('read', readers), ('write', writers))
+            for _ in range(count)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.report(duration)
+
+    def work(self, kind, author, deadline):
+        # Клиент от имени автора: кэш анонимных страниц не скрывает базу.
+        client = Client()
+        client.force_login(author)
+        url, data = self.targets[kind]
+        timings = []
+        errors = 0
+        try:
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                if data is None:
+                    response = client.get(url)
+                else:
+                    response = client.post(url, data)
+                timings.append((time.perf_counter() - started) * 1000)
+                errors += response.status_code >= 400
+        finally:
+            connections.close_all()
+        with self.lock:
+            self.timings[kind].extend(timings)
+            self.errors += errors
+
+    def report(self, duration):
+        for kind, timings in self.timings.items():
+            if not timings:
+                continue
+            self.stdout.write(
+                f'{kind:<6} запросов={len(timings):<6} '
+                f'в секунду={len(timings) / duration:>8.1f} '
+                f'p50={percentile(timings, 0.50):>8.2f} '
+                f'p95={percentile(timings, 0.95):>8.2f} '
+                f'p99={percentile(timings, 0.99):>8.2f} мс'
+            )
+        stats = connection_stats.snapshot()
+        writes = max(stats['writes'], 1)
+        waits = max(stats['lock_waits'], 1)
+        self.stdout.write(
+            f"Открыто соединений: {stats['opens']}\n"
+            f"Записей: {stats['writes']}, время в среднем "
+            f"{stats['write_seconds'] / writes * 1000:.2f} мс, максимум "
+            f"{stats['max_write_seconds'] * 1000:.2f} мс\n"
+            f"Транзакций: {stats['lock_waits']}, ожидание блокировки в "
+            f"среднем {stats['lock_wait_seconds'] / waits * 1000:.2f} мс, "
+            f"максимум {stats['max_lock_wait_seconds'] * 1000:.2f} мс\n"
+            f"Ошибок блокировки: {stats['lock_errors']}, "
+            f"ответов с ошибкой: {self.errors}"
+        )
@@ -0,0 +1,43 @@
+import glob
+import os
+import pstats
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.profiling import PROFILE_SUFFIX, profiling_settings, url_name_dir
+
+SORT_KEYS = ('cumulative', 'tottime', 'ncalls')
+
+
+class Command(BaseCommand):
+    help = (
+        'Сводит сохранённые ProfilingMiddleware профили по именам URL '
+        'и печатает топ самых дорогих функций.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument(
+            '--url-name', help='Только этот view, например posts:profile.')
+        parser.add_argument(
+            '--sort', choices=SORT_KEYS, default='cumulative')
+        parser.add_argument(
+            '--dir', help='Каталог профилей; по умолчанию PROFILING["DIR"].')
+
+    def handle(self, *args, top, url_name, sort, **options):
+        directory = options['dir'] or profiling_settings()['DIR']
+        if not directory or not os.path.isdir(directory):
+            raise CommandError(f'Каталог профилей не найден: {directory}')
+        names = sorted(os.listdir(directory))
+        if url_name:
+            names = [url_name_dir(url_name)]
+
+        for name in names:
+            files = sorted(glob.glob(
+                os.path.join(directory, name, f'*{PROFILE_SUFFIX}')))
+            if not files:
+                continue
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{name.replace(".", ":", 1)}: профилей {len(files)}'))
+            stats = pstats.Stats(*files, stream=self.stdout)
+            stats.strip_dirs().sort_stats(sort).print_stats(top)
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.db_router import PRIMARY_DB_ALIAS, REPLICA_DB_ALIAS
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в файл реплики через backup API. '
+        'Заменяет репликацию при локальной проверке маршрутизации чтений.'
+    )
+
+    def handle(self, *args, **options):
+        if REPLICA_DB_ALIAS not in connections:
+            raise CommandError(
+                'Реплика не настроена: задайте YATUBE_REPLICA_DB.')
+        primary = connections[PRIMARY_DB_ALIAS]
+        replica = connections[REPLICA_DB_ALIAS]
+        if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+            raise CommandError('Команда поддерживает только SQLite.')
+
+        started = time.perf_counter()
+        primary.ensure_connection()
+        replica.ensure_connection()
+        primary.connection.backup(replica.connection)
+        self.stdout.write(self.style.SUCCESS(
+            f'Реплика обновлена за {time.perf_counter() - started:.2f} с.'))
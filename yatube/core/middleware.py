@@ -0,0 +1,239 @@
+import json
+import logging
+import math
+import time
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.http import HttpResponse
+from django.utils.functional import SimpleLazyObject
+
+from .auth import get_cached_user
+
+from .db_router import begin_routing, enable_replica_reads, end_routing
+from .load_shedding import monitor, overloaded, shedding_settings
+from .profiling import (profiling_settings, save_profile, should_profile,
+                        start_profiler)
+from .query_budget import QueryCounter, check_query_budget
+from .ratelimit import check_rate_limits
+from .timing import RequestTimings
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+REPLICA_STICKY_COOKIE = 'db_primary'
+
+timing_logger = logging.getLogger('yatube.timing')
+
+
+def retry_later(status, retry_after, message):
+    """Короткий текстовый ответ без шаблонов и запросов к базе."""
+
+    response = HttpResponse(
+        message, status=status, content_type='text/plain; charset=utf-8')
+    response['Retry-After'] = str(max(math.ceil(retry_after), 1))
+    return response
+
+
+class LoadSheddingMiddleware:
+    """
+    Быстрый 503 вместо очереди к перегруженному процессу. Запросы
+    к endpoint'ам из RATE_LIMITS, меняющие данные (запись, вход,
+    регистрация — всё, что упирается в хэширование паролей или запись),
+    отсекаются уже при признаках перегрузки; остальные — только когда
+    параллельных запросов больше `MAX_IN_FLIGHT`. Так чтение не ждёт
+    всплеска записи.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        options = shedding_settings()
+        if not options['ENABLED']:
+            return self.get_response(request)
+        request.in_flight = monitor.start()
+        started = time.perf_counter()
+        request.shed = request.in_flight > options['MAX_IN_FLIGHT']
+        try:
+            if request.shed:
+                return self.shed(options)
+            return self.get_response(request)
+        finally:
+            # Отсечённые ответы мгновенны и не должны занижать задержку.
+            monitor.finish(
+                None if request.shed
+                else (time.perf_counter() - started) * 1000)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        options = shedding_settings()
+        if (not options['ENABLED'] or request.method in SAFE_METHODS
+                or request.resolver_match.view_name not in getattr(
+                    settings, 'RATE_LIMITS', {})):
+            return None
+        if overloaded(request.in_flight, request, options):
+            request.shed = True
+            return self.shed(options)
+        return None
+
+    @staticmethod
+    def shed(options):
+        return retry_later(
+            503, options['RETRY_AFTER'], 'Сервер перегружен, повторите позже.')
+
+
+class RateLimitMiddleware:
+    """
+    Ограничивает частоту запросов по правилам `RATE_LIMITS` для имени
+    URL: ключ — endpoint и пользователь или IP, состояние — в кэше.
+    Превышение — 429 с Retry-After до того, как view начнёт работу.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        retry_after = check_rate_limits(
+            request, request.resolver_match.view_name)
+        if retry_after is None:
+            return None
+        return retry_later(
+            429, retry_after, 'Слишком много запросов, повторите позже.')
+
+
+class QueryBudgetMiddleware:
+    """
+    Считает SQL-запросы за весь запрос и сверяет их с бюджетом,
+    объявленным у view декоратором `query_budget`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.query_budget = None
+        with QueryCounter() as counter:
+            response = self.get_response(request)
+        if request.resolver_match is not None:
+            check_query_budget(
+                request.resolver_match.view_name,
+                request.query_budget,
+                counter.count,
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = getattr(view_func, 'query_budget', None)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Отдаёт чтения реплике для GET-запросов к view, помеченным `read_only`.
+
+    После любого изменяющего запроса (создание и правка постов, вход,
+    регистрация, админка) ставит короткоживущую куку: пока она есть,
+    пользователь читает из основной базы и сразу видит свои изменения,
+    даже если реплика отстаёт. Страницы и кольцо, которые кладутся
+    в кэш, читаются из основной базы (см. `fills_cache` и
+    `posts.cache.cache_anonymous_page`).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = begin_routing()
+        try:
+            response = self.get_response(request)
+        finally:
+            end_routing(token)
+        if request.method not in SAFE_METHODS:
+            response.set_cookie(
+                REPLICA_STICKY_COOKIE,
+                '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            getattr(view_func, 'read_only', False)
+            and request.method in SAFE_METHODS
+            and REPLICA_STICKY_COOKIE not in request.COOKIES
+        ):
+            enable_replica_reads()
+
+
+class ProfilingMiddleware:
+    """
+    Снимает cProfile с выборки запросов (`PROFILING['SAMPLE_RATE']`) и
+    с запросов, пришедших с токеном в заголовке `PROFILING['HEADER']`.
+    Профили складываются в `PROFILING['DIR']` по имени URL, не больше
+    `PROFILING['MAX_PROFILES']` на view; сводку строит команда
+    `profile_report`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        options = profiling_settings()
+        if not options['DIR'] or not should_profile(request, options):
+            return self.get_response(request)
+        profiler = start_profiler()
+        if profiler is None:
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        if request.resolver_match is not None:
+            save_profile(
+                profiler, options['DIR'], request.resolver_match.view_name,
+                options['MAX_PROFILES'])
+        return response
+
+
+class ServerTimingMiddleware:
+    """
+    Отдаёт в заголовке Server-Timing время SQL (и число запросов),
+    записей, ожидания блокировки записи, рендера шаблонов,
+    контекст-процессоров и кэша, а также пишет те же числа одной
+    JSON-строкой в лог `yatube.timing`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        started = time.perf_counter()
+        with timings.collect():
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+        response['Server-Timing'] = timings.header(total)
+        match = request.resolver_match
+        timing_logger.info(json.dumps({
+            'view': match.view_name if match else None,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 3),
+            **timings.as_dict(),
+        }, ensure_ascii=False))
+        return response
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """
+    `AuthenticationMiddleware`, который берёт пользователя из кэша:
+    запрос с попаданием не выполняет SQL ни для сессии, ни для
+    пользователя.
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_cached_user(request))
@@ -0,0 +1,78 @@
+import cProfile
+import os
+import random
+import time
+
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+
+PROFILE_SUFFIX = '.prof'
+# Переопределяются ключами settings.PROFILING. Профилируется доля
+# SAMPLE_RATE запросов и всякий запрос с токеном TOKEN в заголовке
+# HEADER; профили пишутся в DIR (без него профилирование выключено),
+# не больше MAX_PROFILES последних на view.
+DEFAULT_SETTINGS = {
+    'SAMPLE_RATE': 0.0,
+    'HEADER': 'X-Profile',
+    'TOKEN': None,
+    'DIR': None,
+    'MAX_PROFILES': 100,
+}
+
+
+def profiling_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'PROFILING', {})}
+
+
+def should_profile(request, options):
+    """
+    Профилируем случайную долю запросов либо запросы с заголовком,
+    содержащим секретный токен.
+    """
+
+    token = options['TOKEN']
+    header = request.META.get(
+        'HTTP_' + options['HEADER'].upper().replace('-', '_'))
+    if token and header and constant_time_compare(header, token):
+        return True
+    rate = options['SAMPLE_RATE']
+    return rate > 0 and random.random() < rate
+
+
+def url_name_dir(url_name):
+    """Каталог профилей view: `posts:index` -> `posts.index`."""
+
+    return url_name.replace(':', '.')
+
+
+def prune_profiles(path, keep):
+    """Оставляет в каталоге view только `keep` последних профилей."""
+
+    # Имя начинается с time_ns, поэтому порядок имён — порядок времени.
+    names = sorted(
+        name for name in os.listdir(path) if name.endswith(PROFILE_SUFFIX))
+    for name in names[:max(len(names) - keep, 0)]:
+        try:
+            os.remove(os.path.join(path, name))
+        except FileNotFoundError:
+            # Его уже удалил параллельный запрос.
+            pass
+
+
+def save_profile(profiler, directory, url_name, keep):
+    path = os.path.join(directory, url_name_dir(url_name))
+    os.makedirs(path, exist_ok=True)
+    name = f'{time.time_ns()}-{os.getpid()}{PROFILE_SUFFIX}'
+    profiler.dump_stats(os.path.join(path, name))
+    prune_profiles(path, keep)
+
+
+def start_profiler():
+    """Запускает профилировщик; None, если в потоке уже идёт профилирование."""
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        return None
+    return profiler
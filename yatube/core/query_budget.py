@@ -0,0 +1,58 @@
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('yatube.query_budget')
+
+
+class QueryBudgetExceeded(Exception):
+    """View выполнила больше SQL-запросов, чем ей разрешено."""
+
+
+def query_budget(max_queries):
+    """Объявляет для view максимальное число SQL-запросов за запрос."""
+
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+
+    return decorator
+
+
+class QueryCounter:
+    """Считает SQL-запросы ко всем базам внутри блока `with`."""
+
+    def __init__(self):
+        self.count = 0
+        self._stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+
+def check_query_budget(view_name, budget, count):
+    """
+    Сообщает о превышении бюджета: в строгом режиме (тесты) бросает
+    исключение, иначе пишет предупреждение в лог.
+    """
+
+    if budget is None or count <= budget:
+        return
+    message = (
+        f'{view_name}: выполнено {count} SQL-запросов при бюджете {budget}'
+    )
+    if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
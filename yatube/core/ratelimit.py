@@ -0,0 +1,134 @@
+import math
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """'10/m' -> (10, 60): число запросов и период в секундах."""
+
+    count, period = rate.split('/')
+    return int(count), PERIODS[period]
+
+
+def client_ip(request):
+    """
+    IP клиента. За прокси REMOTE_ADDR — адрес самого прокси, поэтому
+    адрес берётся из заголовка CLIENT_IP_HEADER. Каждый из
+    TRUSTED_PROXY_COUNT доверенных прокси дописывает адрес справа, так
+    что клиент стоит на этом месте с конца; левее — то, что прислал сам
+    клиент, и этому верить нельзя. Если адресов меньше, запрос прошёл
+    мимо прокси, и остаётся REMOTE_ADDR.
+    """
+
+    header = getattr(settings, 'CLIENT_IP_HEADER', None)
+    if header:
+        raw = request.META.get('HTTP_' + header.upper().replace('-', '_'))
+        addresses = [
+            address.strip() for address in (raw or '').split(',')
+            if address.strip()
+        ]
+        count = getattr(settings, 'TRUSTED_PROXY_COUNT', 1)
+        if count and len(addresses) >= count:
+            return addresses[-count]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def limit_key(request, view_name, rule):
+    """
+    Ключ счётчика: endpoint и пользователь или IP. Анонимный
+    пользователь в правиле по пользователю считается по IP.
+    """
+
+    user = getattr(request, 'user', None)
+    if rule['key'] == 'user' and user is not None and user.is_authenticated:
+        ident = f'user:{user.pk}'
+    else:
+        ident = f'ip:{client_ip(request)}'
+    return f'ratelimit:{view_name}:{rule["key"]}:{ident}'
+
+
+def sliding_window(key, limit, period, now):
+    """
+    Скользящее окно из двух счётчиков фиксированных окон: прошлое окно
+    учитывается с весом оставшейся в нём доли. Одно `get_many`, а запись
+    через атомарный `incr`. Возвращает секунды до повтора или None.
+    """
+
+    window = int(now // period)
+    current = f'{key}:{window}'
+    previous = f'{key}:{window - 1}'
+    counts = cache.get_many([current, previous])
+    elapsed = now / period - window
+    used = counts.get(previous, 0) * (1 - elapsed) + counts.get(current, 0)
+    if used >= limit:
+        return period * (1 - elapsed)
+    cache.add(current, 0, period * 2)
+    try:
+        cache.incr(current)
+    except ValueError:
+        # Ключ вытеснен между add и incr.
+        cache.set(current, 1, period * 2)
+    return None
+
+
+def token_bucket(key, limit, period, now, burst=None):
+    """
+    Корзина токенов в форме GCRA: в кэше одно число — теоретическое
+    время следующего запроса в мс. Корзина на `burst` запросов
+    пополняется на `limit` за `period`. Запрос сдвигает это время
+    атомарным `incr`, отказ возвращает сдвиг. Ключ живёт, пока время
+    не прошло, поэтому без ключа корзина полна. Возвращает секунды до
+    повтора или None.
+    """
+
+    interval = round(period / limit * 1000)
+    capacity = (burst or limit) * interval
+    now_ms = round(now * 1000)
+    if cache.add(key, now_ms + interval, math.ceil(interval / 1000)):
+        return None
+    try:
+        arrival = cache.incr(key, interval)
+    except ValueError:
+        # Ключ истёк между add и incr: корзина снова полна.
+        cache.add(key, now_ms + interval, math.ceil(interval / 1000))
+        return None
+    # Ключ мог истечь на долю секунды позже своего времени.
+    arrival = max(arrival, now_ms + interval)
+    if arrival - now_ms > capacity:
+        cache.decr(key, interval)
+        return (arrival - now_ms - capacity) / 1000
+    cache.touch(key, math.ceil((arrival - now_ms) / 1000))
+    return None
+
+
+ALGORITHMS = {
+    'sliding': sliding_window,
+    'bucket': token_bucket,
+}
+
+
+def check_rate_limits(request, view_name):
+    """Секунды до повтора, если запрос превышает правило, иначе None."""
+
+    if not getattr(settings, 'RATE_LIMITS_ENABLED', True):
+        return None
+    rules = getattr(settings, 'RATE_LIMITS', {}).get(view_name, ())
+    now = time.time()
+    for rule in rules:
+        if request.method not in rule.get('methods', ('POST',)):
+            continue
+        limit, period = parse_rate(rule['rate'])
+        algorithm = rule.get('algorithm', 'sliding')
+        extra = {'burst': rule['burst']} if 'burst' in rule else {}
+        retry_after = ALGORITHMS[algorithm](
+            limit_key(request, view_name, rule), limit, period, now,
+            **extra)
+        if retry_after is not None:
+            return retry_after
+    return None
@@ -0,0 +1,31 @@
+from django.template.backends.django import DjangoTemplates, Template
+
+from .timing import timed, timed_function
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        with timed('tpl'):
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    Бэкенд шаблонов Django, который меряет время рендера (вместе с
+    включёнными через `{% include %}` частями) и каждого
+    контекст-процессора для Server-Timing.
+    """
+
+    def __init__(self, params):
+        super().__init__(params)
+        self.engine.template_context_processors = tuple(
+            timed_function('ctx', processor)
+            for processor in self.engine.template_context_processors
+        )
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
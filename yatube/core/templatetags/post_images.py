@@ -0,0 +1,40 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+
+from posts.thumbnails import placeholder_size, post_thumbnails
+
+register = template.Library()
+
+# Прозрачный GIF 1×1: место под картинку, пока нет миниатюр.
+PLACEHOLDER_SRC = (
+    'data:image/gif;base64,'
+    'R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7'
+)
+
+
+@register.simple_tag
+def post_image(post, size):
+    """
+    Картинка поста размера `size` из POST_IMAGE_SIZES: srcset готовых
+    миниатюр с ленивой загрузкой или заглушка того же размера, пока
+    пул процессов их не сделал. Миниатюры ищутся только в хранилище
+    ключей, без обращений к файлам.
+    """
+
+    if not post.image:
+        return ''
+    thumbnails = post_thumbnails(post, size)
+    if thumbnails is None:
+        width, height = placeholder_size(size)
+        attrs = {'src': PLACEHOLDER_SRC, 'width': width, 'height': height}
+    else:
+        first, second = thumbnails
+        attrs = {
+            'src': first.url,
+            'srcset': f'{first.url} 1x, {second.url} 2x',
+            'width': first.width,
+            'height': first.height,
+        }
+    return format_html(
+        '<img{} alt="" loading="lazy" decoding="async">', flatatt(attrs))
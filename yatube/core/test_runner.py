@@ -0,0 +1,22 @@
+import logging
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class QueryBudgetTestRunner(DiscoverRunner):
+    """
+    Тест-раннер, в котором превышение бюджета запросов роняет тест,
+    а построчные логи таймингов запросов и задач не засоряют вывод.
+    Лимиты частоты и отсечение нагрузки выключены: тесты отправляют
+    формы подряд; их тесты включают их сами.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        settings.QUERY_BUDGET_STRICT = True
+        settings.RATE_LIMITS_ENABLED = False
+        settings.LOAD_SHEDDING = {
+            **getattr(settings, 'LOAD_SHEDDING', {}), 'ENABLED': False}
+        for name in ('yatube.timing', 'yatube.tasks'):
+            logging.getLogger(name).setLevel(logging.WARNING)
@@ -0,0 +1,100 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group as UserGroup
+from django.core.cache import cache
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from core.auth import user_version_key
+from core.cache import get_version
+from core.checks import check_cached_sessions
+from posts.tests.utils import AUTH_MIDDLEWARE, CACHED_SESSIONS
+
+User = get_user_model()
+
+
+class CachedSessionsCheckTests(SimpleTestCase):
+    def test_local_cache_keeps_sessions_in_db(self):
+        """Тестируем, что без общего кэша сессии и пользователь не в кэше."""
+
+        self.assertEqual(
+            settings.SESSION_ENGINE, 'django.contrib.sessions.backends.db')
+        self.assertIn(AUTH_MIDDLEWARE, settings.MIDDLEWARE)
+        self.assertListEqual(check_cached_sessions(None), [])
+        with override_settings(**CACHED_SESSIONS):
+            self.assertListEqual(
+                [error.id for error in check_cached_sessions(None)],
+                ['core.E002'])
+
+
+@override_settings(**CACHED_SESSIONS)
+class CachedAuthenticationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='test_user', password='old-password-123')
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.get(pk=CachedAuthenticationTests.user.pk)
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.url = reverse('about:author')
+
+    def get_page(self):
+        return self.authorized_client.get(self.url)
+
+    def test_cached_user_needs_no_queries(self):
+        """Тестируем, что после прогрева сессия и пользователь без SQL."""
+
+        self.get_page()
+        with self.assertNumQueries(0):
+            response = self.get_page()
+        self.assertContains(response, 'Пользователь: test_user')
+
+    def test_user_edit_invalidates_cache(self):
+        """Тестируем, что правка пользователя сразу видна в шапке."""
+
+        self.get_page()
+        self.user.username = 'renamed_user'
+        self.user.save()
+        with self.assertNumQueries(1):
+            response = self.get_page()
+        self.assertContains(response, 'Пользователь: renamed_user')
+
+    def test_password_change_logs_out(self):
+        """Тестируем, что смена пароля завершает закэшированную сессию."""
+
+        self.get_page()
+        self.user.set_password('new-password-456')
+        self.user.save()
+        response = self.get_page()
+        self.assertFalse(response.context['user'].is_authenticated)
+
+    def test_logout_invalidates_cache(self):
+        """Тестируем, что выход сбрасывает версию пользователя."""
+
+        self.get_page()
+        version = get_version(user_version_key(self.user.pk))
+        self.authorized_client.get(reverse('users:logout'))
+        self.assertNotEqual(
+            get_version(user_version_key(self.user.pk)), version)
+        response = self.get_page()
+        self.assertFalse(response.context['user'].is_authenticated)
+
+    def test_group_changes_invalidate_cache(self):
+        """Тестируем сброс при смене групп с обеих сторон связи."""
+
+        group = UserGroup.objects.create(name='editors')
+        changes = (
+            lambda: self.user.groups.add(group),
+            lambda: group.user_set.remove(self.user),
+            lambda: group.user_set.add(self.user),
+            lambda: group.user_set.clear(),
+        )
+        for change in changes:
+            version = get_version(user_version_key(self.user.pk))
+            change()
+            self.assertNotEqual(
+                get_version(user_version_key(self.user.pk)), version)
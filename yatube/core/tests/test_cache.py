@@ -0,0 +1,52 @@
+import os
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from core.cache import bump_version, cache_is_shared, get_version
+from core.checks import check_shared_cache
+
+# Адреса memcached для проверки общего кэша, как в YATUBE_MEMCACHED.
+TEST_MEMCACHED = os.environ.get('YATUBE_TEST_MEMCACHED')
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    def test_local_cache_fails_deploy_check(self):
+        """Тестируем ошибку проверки при кэше, локальном для процесса."""
+
+        errors = check_shared_cache(None)
+        self.assertListEqual([error.id for error in errors], ['core.E001'])
+        with override_settings(CACHES={'default': {
+                'BACKEND': 'core.cache_backends.TimedPyLibMCCache',
+                'LOCATION': '127.0.0.1:11211'}}):
+            self.assertListEqual(check_shared_cache(None), [])
+
+
+@skipUnless(TEST_MEMCACHED, 'YATUBE_TEST_MEMCACHED не задан')
+@override_settings(CACHES={'default': {
+    'BACKEND': 'core.cache_backends.TimedPyLibMCCache',
+    'LOCATION': (TEST_MEMCACHED or '').split(','),
+    'KEY_PREFIX': 'yatube-test',
+}})
+class SharedCacheBackendTests(SimpleTestCase):
+    """Общий кэш проверяется на memcached из YATUBE_TEST_MEMCACHED."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_counters_and_versions(self):
+        """Тестируем операции, на которых держатся версии и лимиты."""
+
+        self.assertTrue(cache_is_shared())
+        self.assertTrue(cache.add('counter', 10, 60))
+        self.assertFalse(cache.add('counter', 0, 60))
+        self.assertEqual(cache.incr('counter', 5), 15)
+        self.assertEqual(cache.decr('counter', 5), 10)
+        self.assertTrue(cache.touch('counter', 60))
+        with self.assertRaises(ValueError):
+            cache.incr('missing')
+        version = get_version('version:test')
+        self.assertEqual(bump_version('version:test'), version + 1)
+        self.assertDictEqual(
+            cache.get_many(['counter', 'missing']), {'counter': 10})
@@ -0,0 +1,103 @@
+import os
+import tempfile
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, TestCase
+
+from core.db.backends.sqlite3.base import DEFAULT_PRAGMAS, DatabaseWrapper
+from core.db.stats import connection_stats
+from core.timing import RequestTimings
+from posts.models import Post, User
+
+
+def make_wrapper(name=':memory:', **pragmas):
+    settings_dict = {
+        **connection.settings_dict,
+        'NAME': name,
+        'PRAGMAS': pragmas,
+    }
+    return DatabaseWrapper(settings_dict, alias='pragma_test')
+
+
+class PragmaTests(SimpleTestCase):
+    def test_pragmas_are_applied_on_connect(self):
+        wrapper = make_wrapper(busy_timeout=1234, cache_size=-2000)
+        opens = connection_stats.snapshot()['opens'].get('pragma_test', 0)
+        try:
+            with wrapper.cursor() as cursor:
+                cursor.execute('PRAGMA busy_timeout')
+                self.assertEqual(cursor.fetchone()[0], 1234)
+                cursor.execute('PRAGMA cache_size')
+                self.assertEqual(cursor.fetchone()[0], -2000)
+        finally:
+            wrapper.close()
+        self.assertEqual(
+            connection_stats.snapshot()['opens']['pragma_test'], opens + 1)
+
+    def test_defaults_fill_missing_pragmas(self):
+        """Тестируем, что ключ PRAGMAS переопределяет только свои значения."""
+
+        pragmas = make_wrapper(busy_timeout=1234).pragmas()
+        self.assertEqual(pragmas['busy_timeout'], 1234)
+        self.assertEqual(pragmas['journal_mode'], 'WAL')
+        self.assertDictEqual(
+            DatabaseWrapper(
+                {**connection.settings_dict, 'PRAGMAS': {}}).pragmas(),
+            DEFAULT_PRAGMAS)
+
+    def test_unsafe_pragma_is_rejected(self):
+        wrapper = make_wrapper(journal_mode='WAL; DROP TABLE posts_post')
+        with self.assertRaises(ImproperlyConfigured):
+            wrapper.pragmas()
+
+
+class WriteStatsTests(TestCase):
+    def test_writes_are_timed(self):
+        user = User.objects.create_user(username='stats')
+        before = connection_stats.snapshot()['writes']
+        Post.objects.filter(author=user).count()
+        self.assertEqual(connection_stats.snapshot()['writes'], before)
+        Post.objects.create(author=user, text='запись')
+        self.assertGreater(connection_stats.snapshot()['writes'], before)
+
+
+class LockWaitTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.name = os.path.join(directory.name, 'lock.sqlite3')
+
+    def begin(self, wrapper):
+        wrapper.ensure_connection()
+        self.addCleanup(wrapper.close)
+        wrapper._start_transaction_under_autocommit()
+
+    def test_transaction_waits_for_write_lock_in_begin(self):
+        """
+        Тестируем, что транзакция берёт блокировку записи в BEGIN и
+        ожидание учитывается отдельно от записей.
+        """
+
+        holder = make_wrapper(self.name)
+        before = connection_stats.snapshot()
+        with RequestTimings().collect() as timings:
+            self.begin(holder)
+        self.assertEqual(timings.counts['lock'], 1)
+        self.assertEqual(
+            connection_stats.snapshot()['lock_waits'],
+            before['lock_waits'] + 1)
+
+        waiter = make_wrapper(self.name, busy_timeout=50)
+        with self.assertRaises(OperationalError):
+            self.begin(waiter)
+        stats = connection_stats.snapshot()
+        self.assertEqual(stats['lock_errors'], before['lock_errors'] + 1)
+        self.assertGreaterEqual(stats['max_lock_wait_seconds'], 0.05)
+        self.assertEqual(stats['writes'], before['writes'])
+
+    def test_unknown_transaction_mode_is_rejected(self):
+        wrapper = DatabaseWrapper(
+            {**connection.settings_dict, 'TRANSACTION_MODE': 'LAZY'})
+        with self.assertRaises(ImproperlyConfigured):
+            wrapper.transaction_mode()
@@ -0,0 +1,55 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def profiles(self, url_name):
+        path = os.path.join(self.directory, url_name)
+        return os.listdir(path) if os.path.isdir(path) else []
+
+    def test_requests_are_profiled_by_header_token(self):
+        """Тестируем, что профиль снимается только с верным токеном."""
+
+        options = {'SAMPLE_RATE': 0, 'TOKEN': 'secret', 'DIR': self.directory}
+        with override_settings(PROFILING=options):
+            self.client.get(reverse('about:tech'), HTTP_X_PROFILE='wrong')
+            self.assertEqual(self.profiles('about.tech'), [])
+            self.client.get(reverse('about:tech'), HTTP_X_PROFILE='secret')
+            self.assertEqual(len(self.profiles('about.tech')), 1)
+
+    def test_sampled_profiles_are_reported(self):
+        options = {'SAMPLE_RATE': 1, 'DIR': self.directory}
+        with override_settings(PROFILING=options):
+            self.client.get(reverse('posts:index'))
+            self.client.get(reverse('posts:index'))
+        self.assertEqual(len(self.profiles('posts.index')), 2)
+
+        out = StringIO()
+        call_command(
+            'profile_report', dir=self.directory, url_name='posts:index',
+            top=5, stdout=out,
+        )
+        self.assertIn('posts:index: профилей 2', out.getvalue())
+        self.assertIn('function calls', out.getvalue())
+
+    def test_old_profiles_are_pruned(self):
+        """Тестируем, что для view хранятся только последние профили."""
+
+        options = {'SAMPLE_RATE': 1, 'DIR': self.directory, 'MAX_PROFILES': 2}
+        with override_settings(PROFILING=options):
+            for _ in range(4):
+                self.client.get(reverse('about:tech'))
+                newest = max(self.profiles('about.tech'))
+        profiles = self.profiles('about.tech')
+        self.assertEqual(len(profiles), 2)
+        self.assertIn(newest, profiles)
@@ -0,0 +1,195 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase
+from django.test import override_settings
+from django.urls import reverse
+
+from core.checks import check_rate_limit_cache
+from core.load_shedding import DEFAULT_SETTINGS, monitor, queue_ms
+from core.ratelimit import client_ip, sliding_window, token_bucket
+
+User = get_user_model()
+
+CREATE_LIMIT = {
+    'posts:post_create': (
+        {'key': 'user', 'rate': '2/m', 'algorithm': 'bucket'},
+    ),
+    'users:login': (
+        {'key': 'ip', 'rate': '2/m', 'algorithm': 'sliding'},
+    ),
+}
+SHEDDING = {'ENABLED': True, 'MAX_QUEUE_MS': 100}
+
+
+class RateLimitAlgorithmTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_sliding_window(self):
+        """Тестируем скользящее окно с учётом доли прошлого окна."""
+
+        start = 600.0
+        for _ in range(3):
+            self.assertIsNone(sliding_window('test', 3, 60, start))
+        self.assertAlmostEqual(sliding_window('test', 3, 60, start), 60)
+        # Середина следующего окна: от прошлого учитывается 3 * 1/2.
+        for _ in range(2):
+            self.assertIsNone(sliding_window('test', 3, 60, start + 90))
+        self.assertIsNotNone(sliding_window('test', 3, 60, start + 90))
+
+    def test_token_bucket(self):
+        """Тестируем корзину токенов: всплеск и пополнение."""
+
+        now = 1000.0
+        for _ in range(2):
+            self.assertIsNone(token_bucket('test', 60, 60, now, burst=2))
+        self.assertAlmostEqual(
+            token_bucket('test', 60, 60, now, burst=2), 1)
+        self.assertIsNone(token_bucket('test', 60, 60, now + 1, burst=2))
+
+    def test_token_bucket_survives_evicted_key(self):
+        """Тестируем, что вытесненный ключ корзины снова её наполняет."""
+
+        self.assertIsNone(token_bucket('test', 1, 60, 1000.0))
+        self.assertIsNotNone(token_bucket('test', 1, 60, 1000.0))
+        cache.delete('test')
+        self.assertIsNone(token_bucket('test', 1, 60, 1000.0))
+
+    @override_settings(CLIENT_IP_HEADER='X-Forwarded-For',
+                       TRUSTED_PROXY_COUNT=2)
+    def test_client_ip_from_trusted_proxies(self):
+        """Тестируем выбор адреса клиента из заголовка доверенных прокси."""
+
+        cases = {
+            'подделка слева': ('6.6.6.6, 1.2.3.4, 10.0.0.1', '1.2.3.4'),
+            'без подделки': ('1.2.3.4,10.0.0.1', '1.2.3.4'),
+            'мимо прокси': ('10.0.0.1', '127.0.0.1'),
+            'без заголовка': (None, '127.0.0.1'),
+        }
+        for case, (header, ip) in cases.items():
+            with self.subTest(case=case):
+                extra = {} if header is None else {
+                    'HTTP_X_FORWARDED_FOR': header}
+                request = RequestFactory().get('/', **extra)
+                self.assertEqual(client_ip(request), ip)
+
+    def test_local_cache_fails_check_when_enabled(self):
+        """Тестируем ошибку проверки для лимитов в локальном кэше."""
+
+        self.assertListEqual(check_rate_limit_cache(None), [])
+        with override_settings(RATE_LIMITS_ENABLED=True):
+            errors = check_rate_limit_cache(None)
+        self.assertListEqual([error.id for error in errors], ['core.E003'])
+
+    def test_queue_time_header_units(self):
+        """Тестируем разбор метки очереди в секундах, мс и мкс."""
+
+        now = time.time()
+        for header in (
+            f't={now - 0.25:.3f}',
+            f't={int((now - 0.25) * 1000)}',
+            f'{int((now - 0.25) * 1000000)}',
+        ):
+            with self.subTest(header=header):
+                request = RequestFactory().get(
+                    '/', HTTP_X_REQUEST_START=header)
+                self.assertAlmostEqual(
+                    queue_ms(request, 'X-Request-Start', now), 250, delta=2)
+
+
+@override_settings(RATE_LIMITS_ENABLED=True, RATE_LIMITS=CREATE_LIMIT)
+class RateLimitMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        cls.other = User.objects.create_user(username='other_user')
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('posts:post_create')
+
+    def client_for(self, user):
+        client = Client()
+        client.force_login(user)
+        return client
+
+    def test_post_create_limited_per_user(self):
+        """Тестируем 429 для автора сверх лимита и лимит по пользователю."""
+
+        client = self.client_for(self.user)
+        for i in range(2):
+            response = client.post(self.url, {'text': f'Пост {i}'})
+            self.assertEqual(response.status_code, 302)
+        response = client.post(self.url, {'text': 'Лишний пост'})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        self.assertEqual(client.get(self.url).status_code, 200)
+        response = self.client_for(self.other).post(
+            self.url, {'text': 'Пост другого автора'})
+        self.assertEqual(response.status_code, 302)
+
+    def test_login_limited_per_ip(self):
+        """Тестируем лимит входа по IP."""
+
+        url = reverse('users:login')
+        data = {'username': 'test_user', 'password': 'wrong'}
+        for _ in range(2):
+            self.assertEqual(self.client.post(url, data).status_code, 200)
+        self.assertEqual(self.client.post(url, data).status_code, 429)
+        response = self.client.post(url, data, REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(LOAD_SHEDDING=SHEDDING)
+class LoadSheddingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+
+    def setUp(self):
+        cache.clear()
+        monitor.latency_ms = 0.0
+        monitor.updated = 0.0
+        self.authorized_client = Client()
+        self.authorized_client.force_login(LoadSheddingTests.user)
+        self.url = reverse('posts:post_create')
+
+    def tearDown(self):
+        monitor.latency_ms = 0.0
+        monitor.updated = 0.0
+
+    def test_queued_writes_are_shed_but_reads_are_served(self):
+        """Тестируем 503 для записи, долго ждавшей в очереди прокси."""
+
+        header = {'HTTP_X_REQUEST_START': f't={time.time() - 1:.3f}'}
+        response = self.authorized_client.post(
+            self.url, {'text': 'Пост'}, **header)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '5')
+        response = self.authorized_client.get(
+            reverse('posts:index'), **header)
+        self.assertEqual(response.status_code, 200)
+
+    def test_high_latency_sheds_writes_until_it_expires(self):
+        """Тестируем отсечение записи при высокой средней задержке."""
+
+        monitor.latency_ms = 5000.0
+        monitor.updated = time.monotonic()
+        response = self.authorized_client.post(self.url, {'text': 'Пост'})
+        self.assertEqual(response.status_code, 503)
+        monitor.updated = (
+            time.monotonic() - DEFAULT_SETTINGS['LATENCY_TTL'] - 1)
+        response = self.authorized_client.post(self.url, {'text': 'Пост'})
+        self.assertEqual(response.status_code, 302)
+
+    @override_settings(LOAD_SHEDDING={**SHEDDING, 'MAX_IN_FLIGHT': 0})
+    def test_too_many_requests_in_flight_sheds_everything(self):
+        """Тестируем 503 для любых запросов сверх MAX_IN_FLIGHT."""
+
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(monitor.in_flight, 0)
@@ -0,0 +1,78 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, SimpleTestCase, TestCase
+from django.urls import reverse
+
+from core.cache_backends import TimedLocMemCache
+from core.timing import RequestTimings
+from posts.models import Post
+
+User = get_user_model()
+
+
+class ServerTimingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='test_user')
+        Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(ServerTimingTests.user)
+
+    def test_header_and_log_have_breakdown(self):
+        """Тестируем разбивку времени в заголовке и в логе."""
+
+        with self.assertLogs('yatube.timing', 'INFO') as logs:
+            response = self.authorized_client.get(reverse('posts:index'))
+        header = response['Server-Timing']
+        for metric in ('sql', 'tpl', 'ctx', 'cache', 'write', 'lock', 'total'):
+            with self.subTest(metric=metric):
+                self.assertIn(f'{metric};dur=', header)
+
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record['view'], 'posts:index')
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['sql_queries'], 0)
+        self.assertIn(f'{record["sql_queries"]} queries', header)
+        self.assertGreater(record['ms']['tpl'], 0)
+        self.assertGreater(record['ms']['ctx'], 0)
+        self.assertGreater(record['cache_hits'] + record['cache_misses'], 0)
+
+    def test_writes_are_logged(self):
+        """Тестируем время записей запроса в логе."""
+
+        with self.assertLogs('yatube.timing', 'INFO') as logs:
+            self.authorized_client.post(
+                reverse('posts:post_create'), {'text': 'Новый пост'})
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertGreater(record['ms']['write'], 0)
+        self.assertIn('lock', record['ms'])
+
+    def test_cached_page_counts_cache_hit(self):
+        url = reverse('about:tech')
+        self.client.get(reverse('posts:index'))
+        with self.assertLogs('yatube.timing', 'INFO') as logs:
+            self.client.get(reverse('posts:index'))
+            self.client.get(url)
+        index, about = [json.loads(r.getMessage()) for r in logs.records]
+        self.assertGreater(index['cache_hits'], 0)
+        self.assertEqual(index['ms']['tpl'], 0)
+        self.assertEqual(about['view'], 'about:tech')
+
+
+class TimedCacheTests(SimpleTestCase):
+    def test_get_many_is_counted_once(self):
+        """Тестируем, что чтения внутри get_many не считаются дважды."""
+
+        backend = TimedLocMemCache('timing-test', {})
+        backend.set('a', 1)
+        with RequestTimings().collect() as timings:
+            self.assertDictEqual(backend.get_many(['a', 'b']), {'a': 1})
+            backend.get('a')
+        self.assertEqual(timings.cache_hits, 2)
+        self.assertEqual(timings.cache_misses, 1)
+        self.assertEqual(timings.counts['cache'], 2)
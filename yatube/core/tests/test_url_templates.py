@@ -0,0 +1,71 @@
+from django.template import Context, Template
+from django.test import SimpleTestCase
+from django.urls import NoReverseMatch, reverse, set_script_prefix
+
+from core.url_templates import fast_reverse
+from posts.models import Group, Post
+
+CASES = (
+    ('posts:index', ()),
+    ('posts:post_detail', (42,)),
+    ('posts:post_detail', ('42',)),
+    ('posts:post_edit', (7,)),
+    ('posts:group_list', ('test-slug_2',)),
+    ('posts:profile', ('test_user',)),
+    ('posts:profile', ('user.name+tag@example',)),
+    ('posts:profile', ('пользователь',)),
+    ('posts:profile', ('a b?c#d%e',)),
+    ('api:post_detail', (3,)),
+)
+
+
+class FastReverseTests(SimpleTestCase):
+    def tearDown(self):
+        set_script_prefix('/')
+
+    def test_matches_reverse(self):
+        """Тестируем, что fast_reverse совпадает с reverse()."""
+
+        for prefix in ('/', '/my app/'):
+            set_script_prefix(prefix)
+            for viewname, args in CASES:
+                with self.subTest(prefix=prefix, viewname=viewname, args=args):
+                    self.assertEqual(
+                        fast_reverse(viewname, *args),
+                        reverse(viewname, args=args),
+                    )
+
+    def test_invalid_arguments_raise_like_reverse(self):
+        """Тестируем, что неподходящие аргументы дают NoReverseMatch."""
+
+        cases = (
+            ('posts:group_list', ('не слаг',)),
+            ('posts:post_detail', ('abc',)),
+            ('posts:profile', ('a/b',)),
+            ('posts:post_detail', ()),
+        )
+        for viewname, args in cases:
+            with self.subTest(viewname=viewname, args=args):
+                with self.assertRaises(NoReverseMatch):
+                    fast_reverse(viewname, *args)
+
+    def test_template_tag_matches_url_tag(self):
+        """Тестируем, что {% fast_url %} выводит то же, что {% url %}."""
+
+        context = Context({'username': '<user>&'})
+        fast = Template(
+            "{% load fast_urls %}{% fast_url 'posts:profile' username %}")
+        slow = Template("{% url 'posts:profile' username %}")
+        self.assertEqual(fast.render(context), slow.render(context))
+
+    def test_model_urls(self):
+        """Тестируем get_absolute_url поста и группы."""
+
+        self.assertEqual(
+            Post(pk=5).get_absolute_url(),
+            reverse('posts:post_detail', args=[5]),
+        )
+        self.assertEqual(
+            Group(slug='test_slug').get_absolute_url(),
+            reverse('posts:group_list', args=['test_slug']),
+        )
@@ -0,0 +1,115 @@
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.db import connections
+
+_current = ContextVar('request_timings', default=None)
+
+# Метрика -> описание для Server-Timing; заголовки HTTP в latin-1,
+# поэтому описания латиницей.
+METRICS = {
+    'sql': 'SQL',
+    'tpl': 'Templates',
+    'ctx': 'Context processors',
+    'cache': 'Cache',
+    # Записи с коммитами и ожидание блокировки в BEGIN IMMEDIATE; их
+    # запросы входят и в sql.
+    'write': 'DB writes',
+    'lock': 'DB write lock wait',
+}
+
+
+class RequestTimings:
+    """Суммарное время и число событий по метрикам одного запроса."""
+
+    def __init__(self):
+        self.seconds = dict.fromkeys(METRICS, 0.0)
+        self.counts = dict.fromkeys(METRICS, 0)
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def add(self, metric, seconds):
+        self.seconds[metric] += seconds
+        self.counts[metric] += 1
+
+    def __call__(self, execute, sql, params, many, context):
+        """Обёртка `execute_wrapper`: время каждого SQL-запроса."""
+
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.add('sql', time.perf_counter() - started)
+
+    @contextmanager
+    def collect(self):
+        token = _current.set(self)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(self))
+                yield self
+        finally:
+            _current.reset(token)
+
+    def as_dict(self):
+        """
+        Миллисекунды по метрикам. Контекст-процессоры выполняются внутри
+        рендера шаблона, поэтому из `tpl` их время вычитается.
+        """
+
+        ms = {
+            metric: round(seconds * 1000, 3)
+            for metric, seconds in self.seconds.items()
+        }
+        ms['tpl'] = round(max(ms['tpl'] - ms['ctx'], 0), 3)
+        return {
+            'ms': ms,
+            'sql_queries': self.counts['sql'],
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+        }
+
+    def header(self, total_seconds):
+        data = self.as_dict()
+        descriptions = {
+            'sql': f'{data["sql_queries"]} queries',
+            'cache': f'{self.cache_hits} hits, {self.cache_misses} misses',
+        }
+        parts = []
+        for metric, title in METRICS.items():
+            desc = descriptions.get(metric, title)
+            parts.append(
+                f'{metric};dur={data["ms"][metric]};desc="{desc}"')
+        parts.append(f'total;dur={round(total_seconds * 1000, 3)}')
+        return ', '.join(parts)
+
+
+def current_timings():
+    return _current.get()
+
+
+@contextmanager
+def timed(metric):
+    """Добавляет время блока к метрике текущего запроса, если он идёт."""
+
+    timings = _current.get()
+    if timings is None:
+        yield None
+        return
+    started = time.perf_counter()
+    try:
+        yield timings
+    finally:
+        timings.add(metric, time.perf_counter() - started)
+
+
+def timed_function(metric, func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with timed(metric):
+            return func(*args, **kwargs)
+
+    return wrapper
@@ -1,6 +1,186 @@
+import datetime
+import hashlib
+
+from django import forms
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection, router, transaction
+from django.db.models import Max, Min, QuerySet
+from django.forms.utils import flatatt
+from django.utils import timezone
+from django.utils.functional import cached_property
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from .constants import ADMIN_COUNT_CACHE_TIMEOUT, CURSOR_PARAM
+from .fts import FTS_TABLE
+from .models import RENDERED_TEXT_FIELDS, Group, Post
+from .search import build_match_query
+from .utils import CursorPaginator
+
+DRILL_DOWN_KINDS = ('year', 'month', 'day')
+
+
+def local(moment):
+    return timezone.localtime(moment) if timezone.is_aware(moment) else moment
+
+
+def period_start(day, kind):
+    if kind == 'year':
+        return day.replace(month=1, day=1)
+    if kind == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_period(day, kind):
+    if kind == 'year':
+        return day.replace(year=day.year + 1)
+    if kind == 'month':
+        return (day.replace(day=28) + datetime.timedelta(days=4)).replace(
+            day=1)
+    return day + datetime.timedelta(days=1)
+
+
+def day_start(day):
+    """Начало дня в текущем часовом поясе."""
+
+    moment = datetime.datetime.combine(day, datetime.time())
+    return timezone.make_aware(moment) if settings.USE_TZ else moment
+
+
+class PostAdminQuerySet(QuerySet):
+    def aggregate(self, *args, **kwargs):
+        """
+        `date_hierarchy` спрашивает границы дат одним запросом
+        min/max, а с двумя агрегатами SQLite читает весь индекс.
+        Каждая граница отдельно — один шаг по индексу.
+        """
+
+        first, last = kwargs.get('first'), kwargs.get('last')
+        if (args or set(kwargs) != {'first', 'last'}
+                or not isinstance(first, Min) or not isinstance(last, Max)
+                or first.source_expressions != last.source_expressions):
+            return super().aggregate(*args, **kwargs)
+        field_name = first.source_expressions[0].name
+        values = self.values_list(field_name, flat=True)
+        return {
+            'first': values.order_by(field_name).first(),
+            'last': values.order_by(f'-{field_name}').first(),
+        }
+
+    def dates(self, field_name, kind, order='ASC'):
+        """
+        Даты для `date_hierarchy` без DISTINCT по всей выборке: границы
+        берутся как min/max по индексу, а каждый период между ними
+        проверяется `exists()` по диапазону того же индекса.
+        """
+
+        if kind not in DRILL_DOWN_KINDS:
+            return super().dates(field_name, kind, order)
+        bounds = self.aggregate(first=Min(field_name), last=Max(field_name))
+        if bounds['first'] is None:
+            return []
+        day = period_start(local(bounds['first']).date(), kind)
+        last = local(bounds['last']).date()
+        found = []
+        while day <= last:
+            following = next_period(day, kind)
+            if self.filter(**{
+                f'{field_name}__gte': day_start(day),
+                f'{field_name}__lt': day_start(following),
+            }).exists():
+                found.append(day)
+            day = following
+        return found if order == 'ASC' else found[::-1]
+
+
+class SharedOptionsSelect(forms.Select):
+    """
+    Select для `list_editable`: варианты рендерятся в HTML один раз на
+    список, а не шаблоном виджета в каждой строке. Копии виджета
+    в формах строк делят один кэш.
+    """
 
-from .models import Group, Post
+    def __init__(self, attrs=None, choices=()):
+        super().__init__(attrs, choices)
+        self.rendered = {}
+
+    def options_html(self):
+        if 'options' not in self.rendered:
+            self.rendered['options'] = [
+                (str(value), format_html(
+                    '<option value="{}">{}</option>', value, label))
+                for value, label in self.choices
+            ]
+        return self.rendered['options']
+
+    def render(self, name, value, attrs=None, renderer=None):
+        selected = set(self.format_value(value))
+        options = (
+            html.replace('<option ', '<option selected ', 1)
+            if option_value in selected else html
+            for option_value, html in self.options_html()
+        )
+        attrs = self.build_attrs(self.attrs, attrs)
+        return format_html(
+            '<select name="{}"{}>{}</select>',
+            name, flatatt(attrs), mark_safe(''.join(options)),
+        )
+
+
+class CachedCountPaginator(Paginator):
+    """Запоминает COUNT(*) выборки в кэше: число строк приблизительное."""
+
+    @cached_property
+    def count(self):
+        query = str(self.object_list.query).encode()
+        key = f'admin_count:{hashlib.md5(query).hexdigest()}'
+        count = cache.get(key)
+        if count is None:
+            count = super().count
+            cache.set(key, count, ADMIN_COUNT_CACHE_TIMEOUT)
+        return count
+
+
+class PostChangeList(ChangeList):
+    """
+    Список постов с keyset-пагинацией: при сортировке по умолчанию
+    страница выбирается по курсору, без OFFSET. Номера страниц (`?p=`)
+    и сортировка по столбцам работают как обычно.
+    """
+
+    def get_filters_params(self, params=None):
+        params = super().get_filters_params(params)
+        params.pop(CURSOR_PARAM, None)
+        return params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Курсор имеет смысл только для текущих фильтров и сортировки.
+        remove = list(remove or []) + [CURSOR_PARAM]
+        return super().get_query_string(new_params, remove)
+
+    def get_results(self, request):
+        super().get_results(request)
+        self.cursor_page = None
+        if (ORDER_VAR in self.params or self.page_num
+                or self.show_all or not self.multi_page):
+            return
+        # Ключи страницы читаются по индексу ленты, строки целиком —
+        # затем по первичному ключу.
+        keys = self.queryset.select_related(None).only('id', 'pub_date')
+        page = CursorPaginator(keys, self.list_per_page).get_cursor_page(
+            request.GET.get(CURSOR_PARAM))
+        self.cursor_page = page
+        self.result_list = self.queryset.filter(
+            pk__in=[post.pk for post in page])
+        self.next_url = page.has_next() and self.get_query_string(
+            {CURSOR_PARAM: page.next_cursor()})
+        self.previous_url = page.has_previous() and self.get_query_string(
+            {CURSOR_PARAM: page.previous_cursor()})
 
 
 @admin.register(Post)
@@ -9,9 +189,67 @@ class PostAdmin(admin.ModelAdmin):
 
     list_display = ('pk', 'text', 'pub_date', 'author', 'group')
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
+    date_hierarchy = 'pub_date'
+    raw_id_fields = ('author',)
+    paginator = CachedCountPaginator
+    show_full_result_count = False
     empty_value_display = '-пусто-'
 
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request).defer(
+            *RENDERED_TEXT_FIELDS)
+        return PostAdminQuerySet(
+            model=queryset.model, query=queryset.query, using=queryset._db)
+
+    def get_changelist(self, request, **kwargs):
+        return PostChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск по тексту через FTS5 вместо LIKE, если он доступен."""
+
+        if not search_term or connection.vendor != 'sqlite':
+            return super().get_search_results(
+                request, queryset, search_term)
+        match = build_match_query(search_term)
+        if not match:
+            return queryset, False
+        # Не pk__in=RawSQL(...): Django берёт подзапрос в двойные скобки,
+        # и SQLite считает его скалярным — совпадёт одна строка.
+        table = Post._meta.db_table
+        return queryset.extra(
+            where=[
+                f'"{table}"."id" IN (SELECT rowid FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s)',
+            ],
+            params=[match],
+        ), False
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        field = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        if db_field.name == 'group':
+            # Один запрос групп на весь список, а не на каждую строку.
+            if not hasattr(request, '_group_choices'):
+                request._group_choices = list(iter(field.choices))
+            field.choices = request._group_choices
+            field.widget = SharedOptionsSelect(choices=field.choices)
+        return field
+
+    def save_model(self, request, obj, form, change):
+        if change and form.changed_data:
+            obj.save(update_fields=form.changed_data)
+        else:
+            obj.save()
+
+    def changelist_view(self, request, extra_context=None):
+        """Правки `list_editable` сохраняются одной транзакцией."""
+
+        if request.method != 'POST':
+            return super().changelist_view(request, extra_context)
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            return super().changelist_view(request, extra_context)
+
 
 admin.site.register(Group)
@@ -0,0 +1,176 @@
+import hashlib
+import math
+import time
+from datetime import datetime, timezone
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+
+from core.cache import bump_version, get_version, get_versions, version_key
+from core.db_router import primary_reads, use_replica
+
+from .constants import (CURSOR_PARAM, PAGE_CACHE_TIMEOUT, PAGE_PARAM,
+                        POST_CARD_CACHE_TIMEOUT, REPLICA_CARD_CACHE_TIMEOUT)
+
+AUTHOR_NAME_FIELDS = frozenset(('username', 'first_name', 'last_name'))
+
+
+def post_card_key(post_id):
+    return version_key('post_card', post_id)
+
+
+def group_card_key(group_id):
+    return version_key('group_card', group_id)
+
+
+def author_card_key(author_id):
+    return version_key('author_card', author_id)
+
+
+def attach_card_versions(posts):
+    """
+    Проставляет каждому посту `card_version` — составную версию поста,
+    его группы и автора — для ключа фрагментного кэша карточки.
+    Все версии страницы читаются одним `get_many`.
+    """
+
+    posts = list(posts)
+    keys = set()
+    for post in posts:
+        keys.add(post_card_key(post.pk))
+        keys.add(author_card_key(post.author_id))
+        if post.group_id is not None:
+            keys.add(group_card_key(post.group_id))
+    versions = get_versions(keys)
+    for post in posts:
+        post.card_version = '.'.join(str(part) for part in (
+            versions[post_card_key(post.pk)],
+            versions[author_card_key(post.author_id)],
+            versions.get(group_card_key(post.group_id), 0),
+        ))
+    return posts
+
+
+def card_timeout():
+    """
+    Срок жизни карточек, которые рендерит текущий запрос. Сброс версии
+    карточки опережает реплику, и карточка из её данных могла бы жить
+    под новой версией сутки.
+    """
+
+    if use_replica():
+        return REPLICA_CARD_CACHE_TIMEOUT
+    return POST_CARD_CACHE_TIMEOUT
+
+
+def bump_post_card(post_id):
+    bump_version(post_card_key(post_id))
+
+
+def bump_group_cards(group_id):
+    bump_version(group_card_key(group_id))
+
+
+def bump_author_cards(author_id):
+    bump_version(author_card_key(author_id))
+
+
+def index_feed_key():
+    return version_key('feed', 'index')
+
+
+def group_feed_key(slug):
+    return version_key('feed', 'group', slug)
+
+
+def profile_feed_key(username):
+    return version_key('feed', 'profile', username)
+
+
+def changed_at_key(feed_key):
+    return f'changed_at:{feed_key}'
+
+
+def _now_stamp():
+    # Вверх до секунды: Last-Modified с точностью до секунды не должен
+    # оказаться раньше изменения.
+    return math.ceil(time.time())
+
+
+def bump_feeds(group_slugs=(), usernames=(), index=True):
+    """
+    Сбрасывает закэшированные страницы только затронутых лент и
+    запоминает время их изменения для Last-Modified: удаление поста,
+    его перенос и переименование автора не меняют `updated` постов,
+    которые остались в ленте.
+    """
+
+    keys = {group_feed_key(slug) for slug in group_slugs}
+    keys |= {profile_feed_key(username) for username in usernames}
+    if index:
+        keys.add(index_feed_key())
+    for key in keys:
+        bump_version(key)
+    stamp = _now_stamp()
+    cache.set_many({changed_at_key(key): stamp for key in keys}, None)
+
+
+def feeds_changed_at(feed_keys):
+    """
+    Когда ленты в последний раз менялись. Для ленты без отметки (она
+    вытеснена из кэша) изменением считается текущий момент.
+    """
+
+    keys = [changed_at_key(key) for key in feed_keys]
+    stamps = cache.get_many(keys)
+    for key in keys:
+        if key not in stamps:
+            cache.add(key, _now_stamp(), None)
+            stamps[key] = cache.get(key, _now_stamp())
+    return datetime.fromtimestamp(max(stamps.values()), timezone.utc)
+
+
+def page_cache_key(feed_key, request):
+    """
+    Ключ страницы ленты: из строки запроса берутся только параметры,
+    которые читает view, чтобы посторонние не плодили копии страницы.
+    """
+
+    version = get_version(feed_key)
+    params = urlencode([
+        (name, request.GET[name])
+        for name in (PAGE_PARAM, CURSOR_PARAM) if name in request.GET
+    ])
+    path = hashlib.md5(f'{request.path}?{params}'.encode()).hexdigest()
+    return f'page:{feed_key}:{version}:{path}'
+
+
+def cache_anonymous_page(feed_key_func):
+    """
+    Кэширует страницу ленты целиком для анонимных GET-запросов.
+
+    `feed_key_func` получает именованные аргументы view и возвращает
+    ключ версии ленты; её сброс делает недействительными все страницы
+    ленты. Авторизованные пользователи кэш обходят: шапка сайта у них
+    своя. Страница для кэша читается из основной базы: версия ленты
+    сбрасывается раньше, чем изменение доходит до реплики.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+            key = page_cache_key(feed_key_func(**kwargs), request)
+            response = cache.get(key)
+            if response is None:
+                with primary_reads():
+                    response = view(request, *args, **kwargs)
+                if response.status_code == 200 and not response.cookies:
+                    cache.set(key, response, PAGE_CACHE_TIMEOUT)
+            return response
+
+        return wrapper
+
+    return decorator
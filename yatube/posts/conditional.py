@@ -0,0 +1,112 @@
+import hashlib
+
+from django.db.models import Max, Subquery
+from django.views.decorators.http import condition
+
+from core.cache import get_versions
+
+from . import ring
+from .cache import (feeds_changed_at, group_feed_key, index_feed_key,
+                    profile_feed_key)
+from .models import Group, Post, User
+
+
+def make_etag(*parts):
+    return hashlib.md5(
+        ':'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def max_updated(posts):
+    return posts.aggregate(last=Max('updated'))['last']
+
+
+def feed_condition(feed_key_func, last_modified_func):
+    """
+    Условный GET для ленты: отвечает 304, не выбирая строк страницы и не
+    рендеря шаблон.
+
+    Last-Modified — позднейшее из максимального `updated` постов ленты
+    (читается по индексу, для главной — из кольца новых постов) и
+    времени её изменения, которое сигналы отмечают и при удалениях,
+    переносах и переименованиях. ETag добавляет к нему версию ленты,
+    пользователя (у него своя шапка) и адрес страницы.
+    """
+
+    def last_modified(request, **kwargs):
+        if not hasattr(request, '_feed_last_modified'):
+            request._feed_last_modified = max(filter(None, (
+                last_modified_func(**kwargs),
+                feeds_changed_at([feed_key_func(**kwargs)]),
+            )))
+        return request._feed_last_modified
+
+    def etag(request, **kwargs):
+        last = last_modified(request, **kwargs)
+        key = feed_key_func(**kwargs)
+        return make_etag(
+            get_versions([key])[key], request.user.pk,
+            request.get_full_path(), last.timestamp(),
+        )
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+def group_last_modified(slug):
+    # Подзапрос вместо JOIN: max(updated) берётся одним поиском по индексу.
+    return max_updated(Post.objects.filter(
+        group=Subquery(Group.objects.filter(slug=slug).values('pk'))))
+
+
+def profile_last_modified(username):
+    return max_updated(Post.objects.filter(
+        author=Subquery(User.objects.filter(username=username).values('pk'))))
+
+
+def load_post_validators(request, post_id):
+    if not hasattr(request, '_post_validators'):
+        request._post_validators = (
+            Post.objects.filter(pk=post_id)
+            .values('updated', 'author__username', 'group__slug')
+            .first()
+        )
+    return request._post_validators
+
+
+def post_feed_keys(row):
+    keys = [profile_feed_key(row['author__username'])]
+    if row['group__slug'] is not None:
+        keys.append(group_feed_key(row['group__slug']))
+    return keys
+
+
+def post_last_modified(request, post_id):
+    """Пост меняется и при переименовании автора или группы."""
+
+    row = load_post_validators(request, post_id)
+    if row is None:
+        return None
+    return max(row['updated'], feeds_changed_at(post_feed_keys(row)))
+
+
+def post_etag(request, post_id):
+    """
+    Страница поста зависит ещё и от автора (имя, число постов) и группы,
+    поэтому в ETag входят версии их лент.
+    """
+
+    row = load_post_validators(request, post_id)
+    if row is None:
+        return None
+    keys = post_feed_keys(row)
+    versions = get_versions(keys)
+    return make_etag(
+        row['updated'].timestamp(), request.user.pk,
+        *(versions[key] for key in keys),
+    )
+
+
+index_condition = feed_condition(index_feed_key, ring.last_modified)
+group_condition = feed_condition(group_feed_key, group_last_modified)
+profile_condition = feed_condition(profile_feed_key, profile_last_modified)
+post_detail_condition = condition(
+    etag_func=post_etag, last_modified_func=post_last_modified)
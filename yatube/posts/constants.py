@@ -2,3 +2,52 @@ INDEX_PER_PAGE_LIMIT = 10
 GROUP_PER_PAGE_LIMIT = 10
 PROFILE_PER_PAGE_LIMIT = 10
 POST_STR_LIM = 15
+PAGE_PARAM = 'page'
+CURSOR_PARAM = 'cursor'
+CURSOR_ORDERING = ('-pub_date', '-id')
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+# Карточка из данных реплики могла отстать от своей версии, поэтому
+# живёт не дольше, чем допустимо отставание реплики.
+REPLICA_CARD_CACHE_TIMEOUT = 30
+# Кольцо новых постов для первых двух страниц главной и признак
+# следующей страницы.
+INDEX_RING_SIZE = INDEX_PER_PAGE_LIMIT * 2 + 1
+INDEX_RING_LOCK_TIMEOUT = 5
+# Кольцо правится на месте; срок жизни лишь исправляет расхождение
+# с базой, если правка всё же потерялась.
+INDEX_RING_TIMEOUT = 60 * 10
+PAGE_CACHE_TIMEOUT = 60 * 15
+# Сколько секунд админка показывает запомненное число постов.
+ADMIN_COUNT_CACHE_TIMEOUT = 60
+# Максимум SQL-запросов на запрос, включая чтение сессии и пользователя.
+QUERY_BUDGETS = {
+    # С учётом пересборки кольца новых постов на холодном кэше.
+    'index': 6,
+    'group_posts': 6,
+    'profile': 6,
+    'post_detail': 5,
+    'post_create': 9,
+    'post_edit': 10,
+    'search': 5,
+    # Только запросы до начала потока: выгрузка читается после ответа.
+    'export': 3,
+    'feed': 2,
+}
+SEARCH_PER_PAGE_LIMIT = 10
+SEARCH_SNIPPET_TOKENS = 16
+POST_EXCERPT_LENGTH = 300
+EXPORT_CHUNK_SIZE = 2000
+FEED_ITEMS_LIMIT = 20
+FEED_CACHE_TIMEOUT = 60 * 60
+# Миниатюры картинок постов: геометрии sorl для 1x и 2x и параметры.
+POST_IMAGE_SIZES = {
+    # Карточка в лентах главной, группы и профиля.
+    'card': {
+        'geometry': ('480x270', '960x540'),
+        'options': {'crop': 'center'},
+    },
+    'detail': {
+        'geometry': ('960', '1920'),
+        'options': {},
+    },
+}
@@ -0,0 +1,60 @@
+import csv
+import json
+
+from .constants import EXPORT_CHUNK_SIZE
+
+EXPORT_FIELDS = ('id', 'pub_date', 'updated', 'author', 'group', 'text')
+EXPORT_COLUMNS = (
+    'id', 'pub_date', 'updated', 'author__username', 'group__slug', 'text',
+)
+EXPORT_FORMATS = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+class Echo:
+    """Псевдофайл для csv.writer: возвращает строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(posts):
+    """
+    Кортежи полей постов в хронологическом порядке. `iterator()` читает
+    их из курсора пачками и не складывает в кэш QuerySet'а.
+    """
+
+    return (
+        posts.order_by('pub_date', 'id')
+        .values_list(*EXPORT_COLUMNS)
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+
+def serialize_row(row):
+    values = dict(zip(EXPORT_FIELDS, row))
+    values['pub_date'] = values['pub_date'].isoformat()
+    values['updated'] = values['updated'].isoformat()
+    return values
+
+
+def jsonl_lines(posts):
+    for row in export_rows(posts):
+        yield json.dumps(serialize_row(row), ensure_ascii=False) + '\n'
+
+
+def csv_lines(posts):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in export_rows(posts):
+        yield writer.writerow(serialize_row(row).values())
+
+
+def export_lines(posts, fmt):
+    """Строки выгрузки в формате `jsonl` или `csv`."""
+
+    if fmt == 'csv':
+        return csv_lines(posts)
+    return jsonl_lines(posts)
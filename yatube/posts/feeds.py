@@ -0,0 +1,150 @@
+import hashlib
+
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.db.models.functions import Substr
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.views.decorators.http import condition
+
+from core.cache import get_version
+from core.db_router import primary_reads, read_only
+from core.query_budget import query_budget
+from core.url_templates import fast_reverse
+
+from .cache import group_feed_key, index_feed_key, profile_feed_key
+from .constants import (FEED_CACHE_TIMEOUT, FEED_ITEMS_LIMIT, POST_STR_LIM,
+                        QUERY_BUDGETS)
+from .models import FEED_DEFERRED_FIELDS, Group, Post, User
+
+
+class LatestPostsFeed(Feed):
+    title = 'Yatube: новые посты'
+    description = 'Последние посты всех авторов.'
+
+    def link(self):
+        return reverse('posts:index')
+
+    def posts(self, obj):
+        return Post.objects.all()
+
+    def items(self, obj):
+        return (
+            self.posts(obj)
+            .select_related('author', 'group')
+            .defer(*FEED_DEFERRED_FIELDS)
+            # Заголовок — начало текста, как в __str__, но без загрузки
+            # полного текста поста.
+            .annotate(title=Substr('text', 1, POST_STR_LIM))
+            [:FEED_ITEMS_LIMIT]
+        )
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.excerpt_html
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated
+
+
+class GroupPostsFeed(LatestPostsFeed):
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, obj):
+        return f'Yatube: {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return obj.get_absolute_url()
+
+    def posts(self, obj):
+        return obj.posts.all()
+
+
+class AuthorPostsFeed(LatestPostsFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, obj):
+        return f'Yatube: посты {obj.get_full_name() or obj.username}'
+
+    def description(self, obj):
+        return f'Последние посты пользователя {obj.username}.'
+
+    def link(self, obj):
+        return fast_reverse('posts:profile', obj.username)
+
+    def posts(self, obj):
+        return obj.posts.all()
+
+
+class AtomMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr('description', obj)
+
+
+class LatestPostsAtomFeed(AtomMixin, LatestPostsFeed):
+    pass
+
+
+class GroupPostsAtomFeed(AtomMixin, GroupPostsFeed):
+    pass
+
+
+class AuthorPostsAtomFeed(AtomMixin, AuthorPostsFeed):
+    pass
+
+
+def cached_feed(feed, feed_key_func):
+    """
+    Превращает `Feed` во view с кэшем готового XML.
+
+    Ключ кэша включает версию ленты, которую сбрасывают сигналы постов,
+    поэтому отдельной инвалидации не нужно. Эта же версия служит ETag:
+    повторный опрос с `If-None-Match` стоит одного чтения из кэша.
+    """
+
+    def etag(request, **kwargs):
+        if not hasattr(request, '_feed_etag'):
+            key = feed_key_func(**kwargs)
+            request._feed_etag = hashlib.md5(
+                f'{key}:{get_version(key)}:{request.path}'.encode(),
+            ).hexdigest()
+        return request._feed_etag
+
+    @read_only
+    @query_budget(QUERY_BUDGETS['feed'])
+    @condition(etag_func=etag)
+    def view(request, **kwargs):
+        key = f'syndication:{etag(request, **kwargs)}'
+        response = cache.get(key)
+        if response is None:
+            with primary_reads():
+                response = feed(request, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response, FEED_CACHE_TIMEOUT)
+        return response
+
+    return view
+
+
+index_rss = cached_feed(LatestPostsFeed(), index_feed_key)
+index_atom = cached_feed(LatestPostsAtomFeed(), index_feed_key)
+group_rss = cached_feed(GroupPostsFeed(), group_feed_key)
+group_atom = cached_feed(GroupPostsAtomFeed(), group_feed_key)
+profile_rss = cached_feed(AuthorPostsFeed(), profile_feed_key)
+profile_atom = cached_feed(AuthorPostsAtomFeed(), profile_feed_key)
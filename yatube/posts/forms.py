@@ -6,4 +6,7 @@ from .models import Post
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
-        fields = ('text', 'group')
+        fields = ('text', 'group', 'image')
+        # Поле модели из sorl даёт форме FileField; картинку проверяет
+        # обычный ImageField.
+        field_classes = {'image': forms.ImageField}
@@ -0,0 +1,55 @@
+"""DDL полнотекстового индекса FTS5 по Post.text (только SQLite)."""
+
+FTS_TABLE = 'posts_post_fts'
+
+CREATE_TABLE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"text, content='posts_post', content_rowid='id', "
+    f"tokenize='unicode61 remove_diacritics 2')"
+)
+# Триггеры живут на самой таблице posts_post, а SQLite при изменении
+# схемы пересоздаёт таблицу и теряет их: миграции, меняющие Post,
+# должны заново вызвать install_triggers.
+TRIGGERS_SQL = (
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai "
+    f"AFTER INSERT ON posts_post BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad "
+    f"AFTER DELETE ON posts_post BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) "
+    f"VALUES ('delete', old.id, old.text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au "
+    f"AFTER UPDATE OF text ON posts_post BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) "
+    f"VALUES ('delete', old.id, old.text); "
+    f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END",
+)
+TRIGGER_NAMES = tuple(f'{FTS_TABLE}_{suffix}' for suffix in ('ai', 'ad', 'au'))
+
+
+def install_triggers(cursor):
+    for sql in TRIGGERS_SQL:
+        cursor.execute(sql)
+
+
+def reinstall_triggers(apps, schema_editor):
+    """
+    Операция RunPython для миграций, меняющих Post: SQLite пересоздаёт
+    таблицу при AddField и теряет триггеры FTS.
+    """
+
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        install_triggers(cursor)
+
+
+def rebuild(cursor):
+    """Перестраивает индекс целиком по содержимому posts_post."""
+
+    cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def optimize(cursor):
+    cursor.execute(
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
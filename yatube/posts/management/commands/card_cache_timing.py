@@ -0,0 +1,57 @@
+import statistics
+import time
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management.base import BaseCommand
+from django.template.loader import get_template
+
+from posts.cache import attach_card_versions
+from posts.constants import INDEX_PER_PAGE_LIMIT, POST_CARD_CACHE_TIMEOUT
+from posts.models import Post
+from posts.thumbnails import prefetch_thumbnails
+
+CARD_TEMPLATE = 'posts/includes/post_card.html'
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время рендера карточек первой страницы главной с '
+        'холодным и тёплым кэшем карточек постов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=20)
+
+    def handle(self, *args, runs, **options):
+        # Карточки рендерятся напрямую: главная целиком отдаётся из кэша
+        # страниц и кольца новых постов и кэш карточек не затрагивает.
+        posts = attach_card_versions(
+            Post.objects.select_related('author', 'group')
+            [:INDEX_PER_PAGE_LIMIT])
+        prefetch_thumbnails(posts, 'card')
+        template = get_template(CARD_TEMPLATE)
+
+        cold = [self.measure(template, posts, evict=True) for _ in range(runs)]
+        warm = [
+            self.measure(template, posts, evict=False) for _ in range(runs)]
+
+        cold_ms = statistics.median(cold) * 1000
+        warm_ms = statistics.median(warm) * 1000
+        self.stdout.write(f'Холодный кэш: {cold_ms:.2f} мс (медиана)')
+        self.stdout.write(f'Тёплый кэш:   {warm_ms:.2f} мс (медиана)')
+        if warm_ms:
+            self.stdout.write(f'Ускорение:    x{cold_ms / warm_ms:.2f}')
+
+    def measure(self, template, posts, evict):
+        if evict:
+            cache.delete_many([
+                make_template_fragment_key(
+                    'post_card', [post.pk, post.card_version])
+                for post in posts
+            ])
+        started = time.perf_counter()
+        for post in posts:
+            template.render(
+                {'post': post, 'card_timeout': POST_CARD_CACHE_TIMEOUT})
+        return time.perf_counter() - started
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import EXPORT_FORMATS, export_lines
+from posts.models import Group, Post, User
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает посты автора или группы в JSONL или CSV '
+        'в файл или stdout, читая их из базы пачками.'
+    )
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument('--author', help='username автора.')
+        target.add_argument('--group', help='slug группы.')
+        parser.add_argument(
+            '--format', choices=tuple(EXPORT_FORMATS), default='jsonl')
+        parser.add_argument(
+            '--output', help='Файл для выгрузки; по умолчанию stdout.')
+
+    def handle(self, *args, author, group, format, output, **options):
+        if author:
+            if not User.objects.filter(username=author).exists():
+                raise CommandError(f'Автор {author} не найден.')
+            posts = Post.objects.filter(author__username=author)
+        else:
+            if not Group.objects.filter(slug=group).exists():
+                raise CommandError(f'Группа {group} не найдена.')
+            posts = Post.objects.filter(group__slug=group)
+
+        lines = export_lines(posts, format)
+        if output:
+            with open(output, 'w', encoding='utf-8', newline='') as file:
+                file.writelines(lines)
+            return
+        for line in lines:
+            self.stdout.write(line, ending='')
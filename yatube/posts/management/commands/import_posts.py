@@ -0,0 +1,234 @@
+import csv
+import json
+import os
+import sys
+import time
+from collections import Counter
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.cache import bump_feeds
+from posts.management.utils import explicit_dates
+from posts.models import Group, Post, User
+from posts.ring import drop_ring
+from posts.signals import shift_author_count, shift_group_count
+
+FORMATS = ('jsonl', 'csv')
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково импортирует посты из JSONL или CSV (файл или stdin). '
+        'Поля записи: text, author (username), group (slug, необязательно), '
+        'pub_date (ISO 8601, необязательно). Посты вставляются пачками, '
+        'каждая пачка — своя транзакция; после неё пишется контрольная '
+        'точка, с которой импорт продолжится после сбоя.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл с постами или - для stdin.')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл контрольной точки; для файла по умолчанию '
+                 '<path>.checkpoint, для stdin не ведётся.',
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Начать с начала, игнорируя контрольную точку.',
+        )
+
+    def handle(self, *args, path, batch_size, restart, **options):
+        fmt = options['format'] or (
+            'csv' if path.lower().endswith('.csv') else 'jsonl')
+        self.checkpoint = options['checkpoint'] or (
+            None if path == '-' else f'{path}.checkpoint')
+        self.authors = {}
+        self.groups = {}
+        self.skipped = 0
+        start = 0 if restart else self.load_checkpoint()
+        if start:
+            self.stdout.write(f'Продолжаю с записи {start}.')
+
+        self.start = self.consumed = start
+        self.imported = 0
+        self.started = time.perf_counter()
+        stream = sys.stdin if path == '-' else self.open(path)
+        try:
+            records = islice(self.read(stream, fmt), start, None)
+            batch = []
+            with explicit_dates(Post, 'pub_date', 'updated'):
+                for record in records:
+                    self.consumed += 1
+                    post = self.parse(record)
+                    if post is not None:
+                        batch.append(post)
+                    if len(batch) >= batch_size:
+                        self.flush(batch)
+                        batch = []
+                self.flush(batch)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        if self.checkpoint and os.path.exists(self.checkpoint):
+            os.remove(self.checkpoint)
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано {self.imported}, пропущено {self.skipped} '
+            f'за {time.perf_counter() - self.started:.1f} с.'))
+
+    def open(self, path):
+        try:
+            return open(path, encoding='utf-8', newline='')
+        except OSError as error:
+            raise CommandError(f'Не удалось открыть {path}: {error}')
+
+    def read(self, stream, fmt):
+        """Сырые записи по одной: строки JSONL или словари CSV."""
+
+        if fmt == 'csv':
+            yield from csv.DictReader(stream)
+            return
+        for line in stream:
+            yield line
+
+    def load_checkpoint(self):
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return 0
+        with open(self.checkpoint, encoding='utf-8') as file:
+            return json.load(file)['consumed']
+
+    def save_checkpoint(self):
+        if not self.checkpoint:
+            return
+        temporary = f'{self.checkpoint}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump({'consumed': self.consumed}, file)
+        os.replace(temporary, self.checkpoint)
+
+    def skip(self, number, reason):
+        self.skipped += 1
+        self.stderr.write(f'Запись {number}: {reason}, пропускаю.')
+
+    def decode(self, record):
+        """Разбирает строку JSONL; словари CSV возвращает как есть."""
+
+        if not isinstance(record, str):
+            return record
+        if not record.strip():
+            return None
+        try:
+            record = json.loads(record)
+        except ValueError:
+            self.skip(self.consumed, 'некорректный JSON')
+            return None
+        if not isinstance(record, dict):
+            self.skip(self.consumed, 'ожидался объект')
+            return None
+        return record
+
+    def parse_date(self, value):
+        if not value:
+            return timezone.now()
+        try:
+            pub_date = parse_datetime(value)
+        except ValueError:
+            pub_date = None
+        if pub_date is not None and timezone.is_naive(pub_date):
+            pub_date = timezone.make_aware(pub_date)
+        return pub_date
+
+    def parse(self, record):
+        """Проверяет запись и возвращает словарь полей или None."""
+
+        record = self.decode(record)
+        if record is None:
+            return None
+        text = (record.get('text') or '').strip()
+        author = (record.get('author') or '').strip()
+        if not text or not author:
+            self.skip(self.consumed, 'нет текста или автора')
+            return None
+        pub_date = self.parse_date(record.get('pub_date'))
+        if pub_date is None:
+            self.skip(self.consumed, 'некорректная дата')
+            return None
+        return {
+            'number': self.consumed,
+            'text': text,
+            'author': author,
+            'group': (record.get('group') or '').strip() or None,
+            'pub_date': pub_date,
+        }
+
+    def resolve(self, mapping, queryset, field, keys):
+        """Дозагружает в карту поиска только ещё не встречавшиеся ключи."""
+
+        missing = {key for key in keys if key not in mapping}
+        if not missing:
+            return
+        found = dict(queryset.filter(
+            **{f'{field}__in': missing}).values_list(field, 'pk'))
+        for key in missing:
+            mapping[key] = found.get(key)
+
+    def build_posts(self, batch):
+        self.resolve(
+            self.authors, User.objects, 'username',
+            {row['author'] for row in batch})
+        self.resolve(
+            self.groups, Group.objects, 'slug',
+            {row['group'] for row in batch if row['group']})
+        posts = []
+        for row in batch:
+            author_id = self.authors[row['author']]
+            group_id = self.groups[row['group']] if row['group'] else None
+            if author_id is None or (row['group'] and group_id is None):
+                self.skip(row['number'], 'неизвестный автор или группа')
+                continue
+            post = Post(
+                author_id=author_id,
+                group_id=group_id,
+                text=row['text'],
+                pub_date=row['pub_date'],
+                updated=row['pub_date'],
+            )
+            post.render_text()
+            posts.append(post)
+        return posts
+
+    def flush(self, batch):
+        """Вставляет пачку и пересчитывает счётчики в одной транзакции."""
+
+        posts = self.build_posts(batch) if batch else []
+        authors = Counter(post.author_id for post in posts)
+        groups = Counter(
+            post.group_id for post in posts if post.group_id is not None)
+        with transaction.atomic():
+            Post.objects.bulk_create(posts)
+            for author_id, count in authors.items():
+                shift_author_count(author_id, count)
+            for group_id, count in groups.items():
+                shift_group_count(group_id, count)
+        self.save_checkpoint()
+        if posts:
+            drop_ring()
+            bump_feeds(
+                group_slugs={
+                    row['group'] for row in batch
+                    if self.groups.get(row['group']) in groups},
+                usernames={
+                    row['author'] for row in batch
+                    if self.authors[row['author']] in authors},
+            )
+        self.imported += len(posts)
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        rate = (self.consumed - self.start) / elapsed
+        self.stdout.write(
+            f'Обработано {self.consumed}, импортировано {self.imported}, '
+            f'пропущено {self.skipped} ({rate:.0f} в секунду)')
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from posts import fts
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестраивает полнотекстовый индекс постов по текущим данным '
+        'и восстанавливает триггеры синхронизации.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--optimize',
+            action='store_true',
+            help='После перестройки слить сегменты индекса.',
+        )
+
+    def handle(self, *args, optimize=False, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Полнотекстовый индекс есть только в SQLite.')
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(fts.CREATE_TABLE_SQL)
+            fts.install_triggers(cursor)
+            fts.rebuild(cursor)
+            if optimize:
+                fts.optimize(cursor)
+        self.stdout.write(self.style.SUCCESS('Поисковый индекс перестроен.'))
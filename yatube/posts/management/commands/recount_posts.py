@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from posts.models import AuthorStats, Group, User
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает разошедшиеся счётчики постов авторов и групп.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать расхождения, ничего не сохраняя.',
+        )
+
+    def handle(self, *args, dry_run=False, **options):
+        self.verbosity = options['verbosity']
+        with transaction.atomic():
+            authors_fixed = self.recount_authors(dry_run)
+            groups_fixed = self.recount_groups(dry_run)
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено счётчиков: авторов {authors_fixed}, '
+            f'групп {groups_fixed}.'
+        ))
+
+    def recount_authors(self, dry_run):
+        stored = dict(
+            AuthorStats.objects.values_list('author_id', 'posts_count'))
+        actual = User.objects.annotate(total=Count('posts')).values_list(
+            'pk', 'total')
+        fixed = 0
+        for author_id, total in actual.iterator():
+            if stored.get(author_id) == total:
+                continue
+            fixed += 1
+            self.report(
+                f'Автор {author_id}: {stored.get(author_id)} -> {total}')
+            if not dry_run:
+                AuthorStats.objects.update_or_create(
+                    author_id=author_id, defaults={'posts_count': total})
+        return fixed
+
+    def recount_groups(self, dry_run):
+        actual = Group.objects.annotate(total=Count('posts')).values_list(
+            'pk', 'posts_count', 'total')
+        fixed = 0
+        for group_id, stored, total in actual.iterator():
+            if stored == total:
+                continue
+            fixed += 1
+            self.report(f'Группа {group_id}: {stored} -> {total}')
+            if not dry_run:
+                Group.objects.filter(pk=group_id).update(posts_count=total)
+        return fixed
+
+    def report(self, message):
+        if self.verbosity > 0:
+            self.stdout.write(message)
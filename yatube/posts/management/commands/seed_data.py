@@ -0,0 +1,157 @@
+import random
+import time
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+
+from posts.management.utils import explicit_dates
+from posts.models import Group, Post, User
+from posts.ring import drop_ring
+
+TEXT_POOL_SIZE = 2000
+NO_GROUP_SHARE = 0.3
+
+
+def zipf_cum_weights(size, exponent):
+    """Кумулятивные веса Ципфа: немногие получают большую часть постов."""
+
+    return list(accumulate(
+        1 / rank ** exponent for rank in range(1, size + 1)))
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет базу синтетическими пользователями, группами и постами '
+        'пакетными вставками. Размеры групп и активность авторов '
+        'распределены по закону Ципфа.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20000)
+        parser.add_argument('--groups', type=int, default=2000)
+        parser.add_argument('--posts', type=int, default=1000000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Показатель распределения Ципфа для авторов и групп.',
+        )
+        parser.add_argument(
+            '--days', type=int, default=3 * 365,
+            help='За сколько дней назад растянуть даты публикации.',
+        )
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.faker = Faker('ru_RU')
+        self.faker.seed_instance(options['seed'])
+        self.batch_size = options['batch_size']
+        self.prefix = f'seed{int(time.time())}'
+
+        started = time.perf_counter()
+        self.create_users(options['users'])
+        self.create_groups(options['groups'])
+        self.create_posts(options['posts'], options['skew'], options['days'])
+        call_command('recount_posts', verbosity=0, stdout=self.stdout)
+        # Пакетные вставки идут мимо сигналов.
+        drop_ring()
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.perf_counter() - started:.1f} с.'))
+
+    def write_progress(self, label, done, total, started):
+        rate = done / max(time.perf_counter() - started, 1e-9)
+        self.stdout.write(f'{label}: {done}/{total} ({rate:.0f} в секунду)')
+
+    def insert(self, model, objects, total, label):
+        """Вставляет объекты пачками, каждая пачка — своя транзакция."""
+
+        started = time.perf_counter()
+        batch = []
+        done = 0
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                done += self.flush(model, batch)
+                self.write_progress(label, done, total, started)
+        if batch:
+            done += self.flush(model, batch)
+            self.write_progress(label, done, total, started)
+
+    def flush(self, model, batch):
+        with transaction.atomic():
+            model.objects.bulk_create(batch)
+        size = len(batch)
+        batch.clear()
+        return size
+
+    def create_users(self, count):
+        password = make_password(None)
+        users = (
+            User(
+                username=f'{self.faker.user_name()}_{self.prefix}_{i}',
+                first_name=self.faker.first_name(),
+                last_name=self.faker.last_name(),
+                password=password,
+            )
+            for i in range(count)
+        )
+        self.insert(User, users, count, 'Пользователи')
+
+    def create_groups(self, count):
+        groups = (
+            Group(
+                title=self.faker.sentence(nb_words=3)[:200],
+                slug=f'{self.prefix}-{i}',
+                description=self.faker.paragraph(),
+            )
+            for i in range(count)
+        )
+        self.insert(Group, groups, count, 'Группы')
+
+    def create_posts(self, count, skew, days):
+        author_ids = list(User.objects.values_list('pk', flat=True))
+        group_ids = list(Group.objects.values_list('pk', flat=True))
+        if not author_ids:
+            return
+        self.random.shuffle(author_ids)
+        self.random.shuffle(group_ids)
+        author_weights = zipf_cum_weights(len(author_ids), skew)
+        group_weights = zipf_cum_weights(len(group_ids), skew)
+        texts = [
+            Post(text=self.faker.paragraph(
+                nb_sentences=self.random.randint(1, 12)))
+            for _ in range(TEXT_POOL_SIZE)
+        ]
+        for sample in texts:
+            sample.render_text()
+        now = timezone.now()
+        span = timedelta(days=days).total_seconds()
+
+        def posts():
+            for _ in range(count):
+                group_id = None
+                if group_ids and self.random.random() > NO_GROUP_SHARE:
+                    group_id = self.random.choices(
+                        group_ids, cum_weights=group_weights)[0]
+                sample = self.random.choice(texts)
+                pub_date = now - timedelta(
+                    seconds=self.random.random() * span)
+                yield Post(
+                    author_id=self.random.choices(
+                        author_ids, cum_weights=author_weights)[0],
+                    group_id=group_id,
+                    text=sample.text,
+                    text_html=sample.text_html,
+                    excerpt_html=sample.excerpt_html,
+                    pub_date=pub_date,
+                    updated=pub_date,
+                )
+
+        with explicit_dates(Post, 'pub_date', 'updated'):
+            self.insert(Post, posts(), count, 'Посты')
@@ -0,0 +1,19 @@
+from contextlib import contextmanager
+
+
+@contextmanager
+def explicit_dates(model, *field_names):
+    """
+    Отключает `auto_now_add`/`auto_now`, чтобы bulk_create сохранил
+    сгенерированные даты, а не текущее время.
+    """
+
+    fields = [model._meta.get_field(name) for name in field_names]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
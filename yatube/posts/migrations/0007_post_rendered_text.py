@@ -0,0 +1,53 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:18
+
+from django.db import migrations, models
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+from posts import fts
+from posts.constants import POST_EXCERPT_LENGTH
+
+BACKFILL_CHUNK = 2000
+
+
+def render_existing(apps, schema_editor):
+    """В исторической модели нет `render_text`, поэтому рендерим здесь."""
+
+    Post = apps.get_model('posts', 'Post')
+    posts = Post.objects.only('pk', 'text').order_by('pk')
+    last_pk = 0
+    while True:
+        chunk = list(posts.filter(pk__gt=last_pk)[:BACKFILL_CHUNK])
+        if not chunk:
+            break
+        for post in chunk:
+            post.text_html = linebreaksbr(post.text, autoescape=True)
+            post.excerpt_html = linebreaksbr(
+                Truncator(post.text).chars(POST_EXCERPT_LENGTH),
+                autoescape=True,
+            )
+        Post.objects.bulk_update(chunk, ['text_html', 'excerpt_html'])
+        last_pk = chunk[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_post_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt_html',
+            field=models.TextField(default='', editable=False, verbose_name='начало поста в HTML'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(default='', editable=False, verbose_name='текст поста в HTML'),
+        ),
+        migrations.RunPython(
+            fts.reinstall_triggers, migrations.RunPython.noop),
+        migrations.RunPython(render_existing, migrations.RunPython.noop),
+    ]
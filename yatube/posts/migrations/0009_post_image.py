@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:47
+
+from django.db import migrations
+import sorl.thumbnail.fields
+
+from posts import fts
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_post_updated'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image',
+            field=sorl.thumbnail.fields.ImageField(blank=True, help_text='Картинка к посту', upload_to='posts/', verbose_name='картинка'),
+        ),
+        migrations.RunPython(
+            fts.reinstall_triggers, migrations.RunPython.noop),
+    ]
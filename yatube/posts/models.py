@@ -1,10 +1,20 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+from sorl.thumbnail import ImageField
 
-from .constants import POST_STR_LIM
+from core.url_templates import fast_reverse
+
+from .constants import POST_EXCERPT_LENGTH, POST_STR_LIM
 
 User = get_user_model()
 
+TRACKED_RELATIONS = ('author_id', 'group_id')
+RENDERED_TEXT_FIELDS = ('text_html', 'excerpt_html')
+# Поля, которые ленты не загружают: карточке хватает excerpt_html.
+FEED_DEFERRED_FIELDS = ('text', 'text_html')
+
 
 class Post(models.Model):
     """Модель постов."""
@@ -13,10 +23,24 @@ class Post(models.Model):
         verbose_name='текст поста',
         help_text='Введите текст поста',
     )
+    text_html = models.TextField(
+        default='',
+        editable=False,
+        verbose_name='текст поста в HTML',
+    )
+    excerpt_html = models.TextField(
+        default='',
+        editable=False,
+        verbose_name='начало поста в HTML',
+    )
     pub_date = models.DateTimeField(
         auto_now_add=True,
         verbose_name='дата публикации'
     )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='дата изменения',
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -32,9 +56,38 @@ class Post(models.Model):
         verbose_name='группа постов',
         help_text='Группа, к которой будет относиться пост',
     )
+    image = ImageField(
+        upload_to='posts/',
+        blank=True,
+        verbose_name='картинка',
+        help_text='Картинка к посту',
+    )
 
     class Meta:
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-id')
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='post_feed_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_feed_idx',
+            ),
+            models.Index(
+                fields=('group', '-pub_date', '-id'),
+                name='post_group_feed_idx',
+            ),
+            models.Index(fields=('updated',), name='post_updated_idx'),
+            models.Index(
+                fields=('author', 'updated'),
+                name='post_author_updated_idx',
+            ),
+            models.Index(
+                fields=('group', 'updated'),
+                name='post_group_updated_idx',
+            ),
+        )
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
@@ -42,6 +95,47 @@ class Post(models.Model):
         """Метод, позволяющий получить text объекта"""
         return self.text[:POST_STR_LIM]
 
+    def get_absolute_url(self):
+        return fast_reverse('posts:post_detail', self.pk)
+
+    def save(self, *args, **kwargs):
+        """
+        Перед сохранением заново рендерит HTML текста и анонса; частичное
+        сохранение тоже считается правкой и обновляет `updated`.
+        """
+        update_fields = kwargs.get('update_fields')
+        if update_fields:
+            update_fields = set(update_fields) | {'updated'}
+            if 'text' in update_fields:
+                update_fields |= set(RENDERED_TEXT_FIELDS)
+            kwargs['update_fields'] = update_fields
+        if update_fields is None or 'text' in update_fields:
+            self.render_text()
+        super().save(*args, **kwargs)
+
+    def render_text(self):
+        """Заполняет text_html и ограниченный по длине excerpt_html."""
+        self.text_html = linebreaksbr(self.text, autoescape=True)
+        self.excerpt_html = linebreaksbr(
+            Truncator(self.text).chars(POST_EXCERPT_LENGTH),
+            autoescape=True,
+        )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Запоминает загруженные автора и группу для пересчёта счётчиков
+        и картинку, чтобы не делать миниатюры заново без её замены.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_relations = {
+            name: instance.__dict__[name]
+            for name in TRACKED_RELATIONS
+            if name in instance.__dict__
+        }
+        instance._loaded_image = instance.__dict__.get('image')
+        return instance
+
 
 class Group(models.Model):
     """Модель групп постов."""
@@ -49,7 +143,39 @@ class Group(models.Model):
     title = models.CharField(max_length=200, verbose_name='заголовок группы')
     slug = models.SlugField(max_length=200, unique=True, verbose_name='слаг')
     description = models.TextField(verbose_name='описание группы')
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='количество постов',
+    )
 
     def __str__(self):
         """Метод, позволяющий получить title объекта Group."""
         return self.title
+
+    def get_absolute_url(self):
+        return fast_reverse('posts:group_list', self.slug)
+
+
+class AuthorStats(models.Model):
+    """Денормализованные счётчики автора."""
+
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='автор',
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='количество постов',
+    )
+
+    class Meta:
+        verbose_name = 'Статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self):
+        """Метод, позволяющий получить имя автора."""
+        return str(self.author)
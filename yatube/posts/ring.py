@@ -0,0 +1,208 @@
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.db.models import Max
+from django.db.models.fields.files import FieldFile
+
+from core.cache import bump_version, get_version, version_key
+from core.db_router import fills_cache
+
+from .constants import (CURSOR_PARAM, INDEX_RING_LOCK_TIMEOUT,
+                        INDEX_RING_SIZE, INDEX_RING_TIMEOUT, PAGE_PARAM)
+from .models import Post
+from .utils import CursorPage, CursorPaginator
+
+RING_KEY = 'index_ring'
+RING_LOCK_KEY = 'index_ring:lock'
+# Поколение кольца: растёт при каждой правке и сбросе, в том числе
+# когда кольца в кэше нет.
+RING_VERSION_KEY = version_key('index_ring')
+# Ровно то, что выводит карточка поста, без полного текста и HTML.
+POST_FIELDS = (
+    'id', 'pub_date', 'updated', 'excerpt_html', 'image', 'author_id',
+    'group_id')
+RELATED_FIELDS = {
+    'author': ('id', 'username', 'first_name', 'last_name'),
+    'group': ('id', 'slug'),
+}
+RING_FIELDS = POST_FIELDS + tuple(
+    f'{relation}__{name}'
+    for relation, names in RELATED_FIELDS.items()
+    for name in names if name != 'id'
+)
+
+
+def ring_posts():
+    return Post.objects.select_related('author', 'group').only(*RING_FIELDS)
+
+
+@fills_cache
+def build_ring():
+    """
+    Заново собирает кольцо из базы и кладёт его в кэш. Если за время
+    сборки кольцо правили, собранное могло не увидеть правку, поэтому
+    оно убирается из кэша и будет собрано снова.
+    """
+
+    version = get_version(RING_VERSION_KEY)
+    posts = list(ring_posts()[:INDEX_RING_SIZE])
+    ring = {
+        'posts': posts,
+        # Кольцо вмещает все посты: за его концом страниц нет.
+        'complete': len(posts) < INDEX_RING_SIZE,
+        'last_modified': Post.objects.aggregate(
+            last=Max('updated'))['last'],
+    }
+    cache.set(RING_KEY, ring, INDEX_RING_TIMEOUT)
+    if get_version(RING_VERSION_KEY) != version:
+        cache.delete(RING_KEY)
+    return ring
+
+
+def get_ring():
+    ring = cache.get(RING_KEY)
+    if ring is None:
+        ring = build_ring()
+    return ring
+
+
+def drop_ring():
+    bump_version(RING_VERSION_KEY)
+    cache.delete(RING_KEY)
+
+
+def last_modified():
+    return get_ring()['last_modified']
+
+
+def slim_copy(obj, fields):
+    """Копия объекта только с `fields`, как после `.only()`."""
+
+    if obj.get_deferred_fields() & set(fields):
+        return None
+    # from_db ждёт значения в порядке полей модели.
+    names = [
+        field.attname for field in obj._meta.concrete_fields
+        if field.attname in fields
+    ]
+    values = [getattr(obj, name) for name in names]
+    # Файл копируется по имени, как из базы: FieldFile привязан
+    # к исходному объекту.
+    values = [
+        value.name if isinstance(value, FieldFile) else value
+        for value in values
+    ]
+    return obj._meta.model.from_db(obj._state.db, names, values)
+
+
+def ring_entry(post):
+    """
+    Пост для кольца в том же виде, что отдаёт `ring_posts()`. Собирается
+    из сохранённого экземпляра без запроса, если его автор и группа уже
+    загружены; иначе перечитывается из базы.
+    """
+
+    entry = slim_copy(post, POST_FIELDS)
+    for relation, fields in RELATED_FIELDS.items():
+        field = Post._meta.get_field(relation)
+        related = None
+        if getattr(post, field.attname) is not None:
+            if entry is None or not field.is_cached(post):
+                return ring_posts().filter(pk=post.pk).first()
+            related = slim_copy(field.get_cached_value(post), fields)
+            if related is None:
+                return ring_posts().filter(pk=post.pk).first()
+        setattr(entry, relation, related)
+    return entry
+
+
+def sort_key(post):
+    return post.pub_date, post.pk
+
+
+@contextmanager
+def locked_ring():
+    """
+    Отдаёт кольцо для правки под коротким замком в кэше. Если кольца нет,
+    править нечего; если замок занят, кольцо сбрасывается и будет
+    пересобрано при следующем чтении.
+    """
+
+    bump_version(RING_VERSION_KEY)
+    if not cache.add(RING_LOCK_KEY, 1, INDEX_RING_LOCK_TIMEOUT):
+        drop_ring()
+        yield None
+        return
+    try:
+        ring = cache.get(RING_KEY)
+        yield ring
+        if ring is not None:
+            cache.set(RING_KEY, ring, INDEX_RING_TIMEOUT)
+    finally:
+        cache.delete(RING_LOCK_KEY)
+
+
+def update_ring(saved):
+    """
+    Вставляет созданный или заменяет изменённый пост на его месте.
+    Вызывается после коммита; пост, удалённый в той же транзакции,
+    уже без pk и в кольцо не попадает.
+    """
+
+    with locked_ring() as ring:
+        if ring is None or saved.pk is None:
+            return
+        posts = [post for post in ring['posts'] if post.pk != saved.pk]
+        was_in_ring = len(posts) < len(ring['posts'])
+        post = ring_entry(saved)
+        if post is not None and (
+                was_in_ring or ring['complete'] or not posts
+                or sort_key(post) > sort_key(posts[-1])):
+            posts.append(post)
+            posts.sort(key=sort_key, reverse=True)
+        if len(posts) > INDEX_RING_SIZE:
+            posts = posts[:INDEX_RING_SIZE]
+            ring['complete'] = False
+        ring['posts'] = posts
+        ring['last_modified'] = max(
+            filter(None, (ring['last_modified'], saved.updated)))
+
+
+def remove_from_ring(post_id):
+    """Убирает пост; оставшиеся посты кольца — всё ещё самые новые."""
+
+    with locked_ring() as ring:
+        if ring is None:
+            return
+        ring['posts'] = [
+            post for post in ring['posts'] if post.pk != post_id]
+
+
+def ring_page(request, per_page):
+    """
+    Страница главной из кольца: первая или следующая по курсору.
+    None, если страницы в кольце нет и её нужно читать из базы.
+    """
+
+    if PAGE_PARAM in request.GET:
+        return None
+    paginator = CursorPaginator(Post.objects.all(), per_page)
+    token = request.GET.get(CURSOR_PARAM)
+    decoded = paginator.decode_cursor(token) if token else None
+    forward, key = decoded or (True, None)
+    if not forward:
+        return None
+    ring = get_ring()
+    posts = ring['posts']
+    start = 0
+    if key is not None:
+        start = next(
+            (i for i, post in enumerate(posts)
+             if sort_key(post) < tuple(key)),
+            len(posts),
+        )
+    rows = posts[start:start + per_page + 1]
+    if len(rows) <= per_page and not ring['complete']:
+        return None
+    return CursorPage(
+        rows[:per_page], paginator, len(rows) > per_page, key is not None)
@@ -0,0 +1,87 @@
+import re
+
+from django.db import connections, router
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .constants import SEARCH_SNIPPET_TOKENS
+from .fts import FTS_TABLE
+from .models import FEED_DEFERRED_FIELDS, Post
+
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+TOKEN_RE = re.compile(r'\w+')
+
+
+def build_match_query(query):
+    """
+    Превращает пользовательский ввод в безопасное выражение MATCH:
+    каждое слово — префиксный поиск, все слова обязательны.
+    """
+
+    return ' '.join(f'"{token}"*' for token in TOKEN_RE.findall(query))
+
+
+def highlight(snippet):
+    """Экранирует фрагмент и заменяет маркеры совпадений на <mark>."""
+
+    html = escape(snippet)
+    html = html.replace(HIGHLIGHT_START, '<mark>')
+    html = html.replace(HIGHLIGHT_END, '</mark>')
+    return mark_safe(html)
+
+
+class SearchResults:
+    """
+    Ленивая выборка результатов для `Paginator`: `count()` и срезы
+    выполняются отдельными запросами к FTS5, строки сортируются по bm25.
+    Индекс и посты читаются из одной базы: иначе реплика, отстающая от
+    основной базы, теряла бы свежие совпадения.
+    """
+
+    def __init__(self, query):
+        self.match = build_match_query(query)
+        self.db = router.db_for_read(Post)
+
+    def count(self):
+        if not self.match:
+            return 0
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(
+                f'SELECT count(*) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s',
+                [self.match],
+            )
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        if not self.match:
+            return []
+        start = index.start or 0
+        limit = -1 if index.stop is None else index.stop - start
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, snippet({FTS_TABLE}, 0, %s, %s, %s, %s) '
+                f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY rank LIMIT %s OFFSET %s',
+                [HIGHLIGHT_START, HIGHLIGHT_END, '…',
+                 SEARCH_SNIPPET_TOKENS, self.match, limit, start],
+            )
+            rows = cursor.fetchall()
+        posts = (
+            Post.objects.using(self.db).select_related('author', 'group')
+            .defer(*FEED_DEFERRED_FIELDS)
+            .in_bulk([post_id for post_id, _ in rows])
+        )
+        results = []
+        for post_id, snippet in rows:
+            post = posts.get(post_id)
+            if post is not None:
+                post.snippet = highlight(snippet)
+                results.append(post)
+        return results
@@ -0,0 +1,265 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+
+from .cache import (AUTHOR_NAME_FIELDS, bump_author_cards, bump_feeds,
+                    bump_group_cards, bump_post_card)
+from .models import TRACKED_RELATIONS, AuthorStats, Group, Post, User
+from .ring import drop_ring, remove_from_ring, update_ring
+from .thumbnails import schedule_thumbnails
+
+
+def shift_author_count(author_id, delta):
+    """Сдвигает счётчик постов автора, при необходимости создавая его."""
+
+    updated = AuthorStats.objects.filter(
+        author_id=author_id, posts_count__gte=-delta,
+    ).update(posts_count=F('posts_count') + delta)
+    if not updated and delta > 0:
+        AuthorStats.objects.get_or_create(
+            author_id=author_id,
+            defaults={
+                'posts_count': Post.objects.filter(
+                    author_id=author_id).count(),
+            },
+        )
+
+
+def shift_group_count(group_id, delta):
+    """Сдвигает счётчик постов группы."""
+
+    if group_id is None:
+        return
+    Group.objects.filter(
+        pk=group_id, posts_count__gte=-delta,
+    ).update(posts_count=F('posts_count') + delta)
+
+
+def group_slugs(group_ids):
+    group_ids = {pk for pk in group_ids if pk is not None}
+    if not group_ids:
+        return []
+    return list(Group.objects.filter(pk__in=group_ids).values_list(
+        'slug', flat=True))
+
+
+def usernames(user_ids):
+    return list(User.objects.filter(pk__in=set(user_ids)).values_list(
+        'username', flat=True))
+
+
+def after_commit(bump, *args, **kwargs):
+    """
+    Сбрасывает кэш после коммита: иначе запрос, пришедший до коммита,
+    положит под новой версией страницу без изменения. Затронутые ленты
+    вычисляются сразу, пока транзакция видит прежнее и новое состояние.
+    """
+
+    transaction.on_commit(partial(bump, *args, **kwargs))
+
+
+@receiver(post_save, sender=User)
+def create_author_stats(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        AuthorStats.objects.get_or_create(author=instance)
+
+
+@receiver(pre_save, sender=User)
+def load_author_names(sender, instance, raw, update_fields, **kwargs):
+    """Запоминает прежние имена автора, если они могут измениться."""
+
+    instance._loaded_names = None
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not (
+            AUTHOR_NAME_FIELDS & set(update_fields)):
+        return
+    instance._loaded_names = (
+        User.objects.filter(pk=instance.pk)
+        .values(*AUTHOR_NAME_FIELDS)
+        .first()
+    )
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_pages(sender, instance, **kwargs):
+    """
+    Смена имени автора меняет его карточки, а значит и все ленты,
+    где они выводятся: профиль, главную и группы автора.
+    """
+
+    loaded = getattr(instance, '_loaded_names', None)
+    if not loaded or all(
+            loaded[name] == getattr(instance, name)
+            for name in AUTHOR_NAME_FIELDS):
+        return
+    after_commit(bump_author_cards, instance.pk)
+    transaction.on_commit(drop_ring)
+    after_commit(
+        bump_feeds,
+        group_slugs=list(Group.objects.filter(
+            posts__author=instance).values_list('slug', flat=True).distinct()),
+        usernames={loaded['username'], instance.username},
+    )
+
+
+@receiver(pre_save, sender=Group)
+def load_group_slug(sender, instance, raw, **kwargs):
+    instance._loaded_slug = None
+    if not raw and not instance._state.adding:
+        instance._loaded_slug = Group.objects.filter(
+            pk=instance.pk).values_list('slug', flat=True).first()
+
+
+@receiver(post_save, sender=Group)
+def invalidate_group_pages(sender, instance, created, **kwargs):
+    """
+    Заголовок и описание видны только на странице группы; слаг же
+    входит в ссылки карточек, поэтому его смена сбрасывает и ленты,
+    где выводятся посты группы.
+    """
+
+    if created:
+        return
+    if instance._loaded_slug == instance.slug:
+        after_commit(bump_feeds, group_slugs=[instance.slug], index=False)
+        return
+    after_commit(bump_group_cards, instance.pk)
+    transaction.on_commit(drop_ring)
+    after_commit(
+        bump_feeds,
+        group_slugs={instance._loaded_slug, instance.slug} - {None},
+        usernames=list(User.objects.filter(
+            posts__group=instance).values_list(
+                'username', flat=True).distinct()),
+    )
+
+
+@receiver(pre_delete, sender=Group)
+def load_group_authors(sender, instance, **kwargs):
+    """До SET_NULL запоминаем авторов, в чьих профилях видна группа."""
+
+    instance._loaded_usernames = list(User.objects.filter(
+        posts__group=instance).values_list('username', flat=True).distinct())
+
+
+@receiver(post_delete, sender=Group)
+def invalidate_deleted_group_pages(sender, instance, **kwargs):
+    transaction.on_commit(drop_ring)
+    after_commit(
+        bump_feeds,
+        group_slugs=[instance.slug],
+        usernames=instance._loaded_usernames,
+    )
+
+
+@receiver(pre_save, sender=Post)
+def load_post_relations(sender, instance, raw, **kwargs):
+    """
+    Подтягивает прежних автора и группу, если пост сохраняется
+    не из загруженного из базы экземпляра.
+    """
+
+    loaded = getattr(instance, '_loaded_relations', {})
+    if raw or instance._state.adding or set(TRACKED_RELATIONS) <= set(loaded):
+        return
+    instance._loaded_relations = (
+        Post.objects.filter(pk=instance.pk)
+        .values(*TRACKED_RELATIONS)
+        .first()
+    ) or {}
+
+
+@receiver(post_save, sender=Post)
+def update_counters_on_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    if created:
+        shift_author_count(instance.author_id, 1)
+        shift_group_count(instance.group_id, 1)
+        return
+    loaded = instance._loaded_relations
+    if loaded.get('author_id', instance.author_id) != instance.author_id:
+        shift_author_count(loaded['author_id'], -1)
+        shift_author_count(instance.author_id, 1)
+    if loaded.get('group_id', instance.group_id) != instance.group_id:
+        shift_group_count(loaded['group_id'], -1)
+        shift_group_count(instance.group_id, 1)
+
+
+@receiver(post_save, sender=Post)
+def invalidate_post_pages(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    after_commit(bump_post_card, instance.pk)
+    loaded = {} if created else instance._loaded_relations
+    after_commit(
+        bump_feeds,
+        group_slugs=group_slugs(
+            {loaded.get('group_id'), instance.group_id}),
+        usernames=usernames(
+            {loaded.get('author_id', instance.author_id),
+             instance.author_id}),
+    )
+
+
+@receiver(post_save, sender=Post)
+def refresh_ring_on_save(sender, instance, raw, **kwargs):
+    """
+    Кольцо правится после коммита: до него пост не виден другим
+    запросам, а после отката его не должно быть и в кольце.
+    """
+
+    if not raw:
+        transaction.on_commit(partial(update_ring, instance))
+
+
+@receiver(post_save, sender=Post)
+def make_thumbnails_on_save(sender, instance, raw, update_fields, **kwargs):
+    """Миниатюры заказываются только для новой картинки."""
+
+    if raw or 'image' in instance.get_deferred_fields() or (
+            update_fields is not None and 'image' not in update_fields):
+        return
+    name = instance.image.name or None
+    if name is not None and name != getattr(instance, '_loaded_image', None):
+        schedule_thumbnails(instance)
+    instance._loaded_image = name
+
+
+@receiver(post_save, sender=Post)
+def remember_post_relations(sender, instance, **kwargs):
+    """Фиксирует сохранённые связи для следующего сохранения поста."""
+
+    instance._loaded_relations = {
+        name: getattr(instance, name) for name in TRACKED_RELATIONS
+    }
+
+
+@receiver(post_delete, sender=Post)
+def update_counters_on_delete(sender, instance, **kwargs):
+    """
+    Уменьшает счётчики; при каскадном удалении автора его строка
+    статистики может быть уже удалена, и тогда обновлять нечего.
+    """
+
+    shift_author_count(instance.author_id, -1)
+    shift_group_count(instance.group_id, -1)
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_deleted_post_pages(sender, instance, **kwargs):
+    after_commit(
+        bump_feeds,
+        group_slugs=group_slugs([instance.group_id]),
+        usernames=usernames([instance.author_id]),
+    )
+
+
+@receiver(post_delete, sender=Post)
+def refresh_ring_on_delete(sender, instance, **kwargs):
+    transaction.on_commit(partial(remove_from_ring, instance.pk))
@@ -0,0 +1,189 @@
+from datetime import datetime, timedelta
+
+from django import forms
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Max, Min
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ..admin import PostAdmin, PostAdminQuerySet, SharedOptionsSelect
+from ..management.utils import explicit_dates
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin')
+        cls.authors = [
+            User.objects.create_user(username=f'author_{i}')
+            for i in range(3)
+        ]
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.group_two = Group.objects.create(
+            title='Тестовая группа 2',
+            slug='test_slug_two',
+            description='Тестовое описание 2',
+        )
+        start = timezone.make_aware(datetime(2020, 12, 30, 12))
+        posts = []
+        for i in range(PostAdmin.list_per_page + 20):
+            pub_date = start + timedelta(days=i // 10)
+            post = Post(
+                author=cls.authors[i % 3],
+                group=cls.group if i % 2 else None,
+                text=f'Тестовый пост номер {i}',
+                pub_date=pub_date,
+                updated=pub_date,
+            )
+            post.render_text()
+            posts.append(post)
+        with explicit_dates(Post, 'pub_date', 'updated'):
+            Post.objects.bulk_create(posts)
+        cls.url = reverse('admin:posts_post_changelist')
+
+    def setUp(self):
+        cache.clear()
+        self.admin_client = Client()
+        self.admin_client.force_login(PostAdminTests.admin)
+
+    def get_changelist(self, params=None):
+        response = self.admin_client.get(self.url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return response.context['cl']
+
+    def test_changelist_queries_do_not_depend_on_rows(self):
+        """Тестируем, что строки списка не добавляют запросов."""
+
+        self.get_changelist()
+        with CaptureQueriesContext(connection) as many:
+            self.get_changelist()
+        Post.objects.filter(pk__in=list(
+            Post.objects.values_list('pk', flat=True)[:PostAdmin.list_per_page]
+        )).delete()
+        cache.clear()
+        self.get_changelist()
+        with CaptureQueriesContext(connection) as few:
+            self.get_changelist()
+        self.assertEqual(len(many), len(few))
+
+    def test_count_is_cached(self):
+        """Тестируем, что COUNT(*) списка берётся из кэша."""
+
+        self.get_changelist()
+        with CaptureQueriesContext(connection) as queries:
+            self.get_changelist()
+        self.assertFalse(
+            [q for q in queries if 'COUNT(' in q['sql'].upper()])
+
+    def test_keyset_pages_walk_changelist(self):
+        """Тестируем обход списка по курсору без OFFSET."""
+
+        expected = list(Post.objects.values_list('pk', flat=True))
+        first = self.get_changelist()
+        self.assertListEqual(
+            [post.pk for post in first.result_list],
+            expected[:PostAdmin.list_per_page],
+        )
+        cursor = first.cursor_page.next_cursor()
+        with CaptureQueriesContext(connection) as queries:
+            second = self.get_changelist({'cursor': cursor})
+        self.assertListEqual(
+            [post.pk for post in second.result_list],
+            expected[PostAdmin.list_per_page:],
+        )
+        self.assertFalse(second.next_url)
+        self.assertTrue(second.previous_url)
+        self.assertFalse(
+            [q for q in queries if 'OFFSET' in q['sql'].upper()])
+
+    def test_date_hierarchy_matches_distinct_dates(self):
+        """Тестируем даты date_hierarchy против обычного dates()."""
+
+        admin_posts = PostAdmin(Post, None).get_queryset(None)
+        self.assertIsInstance(admin_posts, PostAdminQuerySet)
+        for kind, lookups in (
+            ('year', {}),
+            ('month', {'pub_date__year': 2021}),
+            ('day', {'pub_date__year': 2021, 'pub_date__month': 1}),
+        ):
+            with self.subTest(kind=kind):
+                self.assertListEqual(
+                    admin_posts.filter(**lookups).dates('pub_date', kind),
+                    list(Post.objects.filter(**lookups).dates(
+                        'pub_date', kind)),
+                )
+
+    def test_date_bounds_match_aggregate(self):
+        """Тестируем границы дат по индексу против Min/Max."""
+
+        admin_posts = PostAdmin(Post, None).get_queryset(None)
+        for lookups in ({}, {'pub_date__year': 2021}, {'pk': 0}):
+            with self.subTest(lookups=lookups):
+                self.assertDictEqual(
+                    admin_posts.filter(**lookups).aggregate(
+                        first=Min('pub_date'), last=Max('pub_date')),
+                    Post.objects.filter(**lookups).aggregate(
+                        first=Min('pub_date'), last=Max('pub_date')),
+                )
+
+    def test_shared_options_select_matches_select(self):
+        """Тестируем, что SharedOptionsSelect выводит тот же select."""
+
+        choices = [('', '---------'), (1, 'Группа <1>'), (2, 'Группа 2')]
+        shared = SharedOptionsSelect(choices=choices)
+        for value in (None, 1, 2):
+            with self.subTest(value=value):
+                self.assertHTMLEqual(
+                    shared.render('group', value, {'id': 'id_group'}),
+                    forms.Select(choices=choices).render(
+                        'group', value, {'id': 'id_group'}),
+                )
+
+    def test_search_uses_full_text_index(self):
+        """Тестируем поиск в админке через FTS5."""
+
+        cl = self.get_changelist({'q': 'номер 7'})
+        self.assertSetEqual(
+            {post.text for post in cl.result_list},
+            {'Тестовый пост номер 7'} | {
+                f'Тестовый пост номер {i}' for i in range(70, 80)},
+        )
+
+    def test_list_editable_saves_groups(self):
+        """Тестируем сохранение групп из списка одной транзакцией."""
+
+        posts = list(Post.objects.all()[:3])
+        data = {
+            'form-TOTAL_FORMS': len(posts),
+            'form-INITIAL_FORMS': len(posts),
+            'form-MIN_NUM_FORMS': 0,
+            'form-MAX_NUM_FORMS': 1000,
+            '_save': 'Сохранить',
+        }
+        for i, post in enumerate(posts):
+            data[f'form-{i}-id'] = post.pk
+            data[f'form-{i}-group'] = self.group_two.pk
+        response = self.admin_client.post(self.url, data)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            Post.objects.filter(
+                pk__in=[post.pk for post in posts],
+                group=self.group_two,
+            ).count(),
+            len(posts),
+        )
+        self.group_two.refresh_from_db()
+        self.assertEqual(self.group_two.posts_count, len(posts))
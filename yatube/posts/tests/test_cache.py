@@ -0,0 +1,221 @@
+from django.contrib.auth import get_user_model
+from django.core import serializers
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+from .utils import run_on_commit
+
+User = get_user_model()
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            group=cls.group,
+            text='Тестовый пост',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.index_url = reverse('posts:index')
+
+    def test_card_is_rendered_once(self):
+        """Тестируем, что повторный рендер берёт карточку из кэша."""
+
+        response = self.client.get(self.index_url)
+        self.assertTemplateUsed(response, 'posts/includes/post_card.html')
+        Post.objects.filter(pk=self.post.pk).update(text='Без сигналов')
+        response = self.client.get(self.index_url)
+        self.assertContains(response, 'Тестовый пост')
+
+    def test_card_version_bumps(self):
+        """Тестируем сброс карточки при изменении поста, группы и автора."""
+
+        self.client.get(self.index_url)
+        changes = (
+            (self.post, 'text', 'Изменённый пост'),
+            (self.group, 'slug', 'new_slug'),
+            (self.user, 'first_name', 'Лев'),
+        )
+        for instance, field, value in changes:
+            with self.subTest(field=field):
+                setattr(instance, field, value)
+                with run_on_commit():
+                    instance.save()
+                response = self.client.get(self.index_url)
+                self.assertContains(response, value)
+
+    def test_last_login_keeps_author_cards(self):
+        """Тестируем, что обновление last_login не сбрасывает карточки."""
+
+        self.client.get(self.index_url)
+        User.objects.filter(pk=self.user.pk).update(first_name='Лев')
+        self.client.force_login(self.user)
+        response = self.client.get(self.index_url)
+        self.assertNotContains(response, 'Лев')
+
+
+class AnonymousPageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        cls.other = User.objects.create_user(username='other_user')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.group_two = Group.objects.create(
+            title='Тестовая группа 2',
+            slug='test_slug_two',
+            description='Тестовое описание 2',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            group=cls.group,
+            text='Тестовый пост',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.urls = {
+            'index': reverse('posts:index'),
+            'group': reverse(
+                'posts:group_list', kwargs={'slug': 'test_slug'}),
+            'group_two': reverse(
+                'posts:group_list', kwargs={'slug': 'test_slug_two'}),
+            'profile': reverse(
+                'posts:profile', kwargs={'username': 'test_user'}),
+            'other': reverse(
+                'posts:profile', kwargs={'username': 'other_user'}),
+        }
+
+    def warm_up(self):
+        for url in self.urls.values():
+            self.guest_client.get(url)
+
+    def cached_pages(self):
+        """Имена страниц, которые отдаются из кэша без запросов к базе."""
+
+        cached = set()
+        for name, url in self.urls.items():
+            response = self.guest_client.get(url)
+            if response.context is None:
+                cached.add(name)
+        return cached
+
+    def test_anonymous_pages_are_cached(self):
+        """
+        Тестируем, что повторный анонимный запрос читает из базы только
+        валидаторы условного GET; главная берёт их из кольца новых постов.
+        """
+
+        self.warm_up()
+        with self.assertNumQueries(len(self.urls) - 1):
+            for url in self.urls.values():
+                self.guest_client.get(url)
+
+    def test_unused_query_params_share_cached_page(self):
+        """Тестируем, что посторонние параметры не плодят копии страницы."""
+
+        self.warm_up()
+        for query in ('?utm_source=feed', '?utm_source=mail&ref=1'):
+            with self.subTest(query=query):
+                response = self.guest_client.get(self.urls['profile'] + query)
+                self.assertIsNone(response.context)
+        response = self.guest_client.get(self.urls['profile'] + '?page=1')
+        self.assertIsNotNone(response.context)
+
+    def test_raw_save_skips_invalidation(self):
+        """Тестируем сохранение поста из фикстуры, как в loaddata."""
+
+        data = serializers.serialize('json', Post.objects.all())
+        for obj in serializers.deserialize('json', data):
+            obj.save()
+        self.assertEqual(Post.objects.count(), 1)
+
+    def test_authorized_user_bypasses_cache(self):
+        """Тестируем, что авторизованный пользователь кэш не использует."""
+
+        self.warm_up()
+        response = self.authorized_client.get(self.urls['index'])
+        self.assertIsNotNone(response.context)
+        self.assertContains(response, 'Пользователь: test_user')
+
+    def test_post_changes_reset_only_affected_feeds(self):
+        """Тестируем точечный сброс лент при изменении постов."""
+
+        self.warm_up()
+        with run_on_commit():
+            Post.objects.create(
+                author=self.other, group=self.group_two, text='Новый пост')
+        self.assertSetEqual(self.cached_pages(), {'group', 'profile'})
+
+        self.warm_up()
+        self.post.group = self.group_two
+        with run_on_commit():
+            self.post.save()
+        self.assertSetEqual(self.cached_pages(), {'other'})
+
+        self.warm_up()
+        with run_on_commit():
+            self.post.delete()
+        self.assertSetEqual(self.cached_pages(), {'group', 'other'})
+
+    def test_feeds_are_reset_after_commit(self):
+        """
+        Тестируем, что до коммита ленты не сбрасываются: иначе запрос
+        из другого процесса положил бы под новой версией старую страницу.
+        """
+
+        self.warm_up()
+        with run_on_commit():
+            Post.objects.create(
+                author=self.other, group=self.group_two, text='Новый пост')
+            self.assertEqual(len(self.cached_pages()), len(self.urls))
+        self.assertSetEqual(self.cached_pages(), {'group', 'profile'})
+
+    def test_group_and_author_changes_reset_feeds(self):
+        """Тестируем сброс лент при изменении группы и автора."""
+
+        self.warm_up()
+        self.group.title = 'Новое название'
+        with run_on_commit():
+            self.group.save()
+        self.assertSetEqual(
+            self.cached_pages(), {'index', 'group_two', 'profile', 'other'})
+
+        self.warm_up()
+        self.group.slug = 'new_slug'
+        with run_on_commit():
+            self.group.save()
+        self.urls['group'] = reverse(
+            'posts:group_list', kwargs={'slug': 'new_slug'})
+        self.assertSetEqual(self.cached_pages(), {'group_two', 'other'})
+
+        self.warm_up()
+        self.user.last_name = 'Толстой'
+        with run_on_commit():
+            self.user.save()
+        self.assertSetEqual(self.cached_pages(), {'group_two', 'other'})
+
+        self.warm_up()
+        with run_on_commit():
+            self.user.save(update_fields=['last_login'])
+        self.assertEqual(len(self.cached_pages()), len(self.urls))
@@ -0,0 +1,154 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..cache import attach_card_versions
+from ..models import AuthorStats, Group, Post, User
+
+
+class SeedAndBenchCommandsTests(TestCase):
+    def test_seed_data_creates_consistent_dataset(self):
+        """Тестируем генерацию данных с согласованными счётчиками."""
+
+        call_command(
+            'seed_data', users=20, groups=5, posts=300, batch_size=50,
+            seed=1, stdout=StringIO(),
+        )
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Group.objects.count(), 5)
+        self.assertEqual(Post.objects.count(), 300)
+        self.assertEqual(
+            sum(AuthorStats.objects.values_list('posts_count', flat=True)),
+            300,
+        )
+        self.assertGreater(
+            Post.objects.dates('pub_date', 'day').count(), 1)
+
+    def test_bench_views_reports_every_url(self):
+        """Тестируем, что бенчмарк пишет JSON по каждому URL."""
+
+        call_command(
+            'seed_data', users=5, groups=2, posts=30, seed=1,
+            stdout=StringIO(),
+        )
+        out = StringIO()
+        call_command(
+            'bench_views', iterations=2, warmup=0, stdout=out,
+            stderr=StringIO(),
+        )
+        report = json.loads(out.getvalue())
+        names = {result['name'] for result in report['results']}
+        self.assertIn('posts:index', names)
+        self.assertIn('about:tech', names)
+        for result in report['results']:
+            with self.subTest(name=result['name'], mode=result['as']):
+                self.assertEqual(result['status'], 200)
+                self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+
+    def test_card_cache_timing_renders_cards(self):
+        """Тестируем, что замер рендерит карточки и прогревает их кэш."""
+
+        call_command(
+            'seed_data', users=2, groups=1, posts=12, seed=1,
+            stdout=StringIO(),
+        )
+        cache.clear()
+        out = StringIO()
+        call_command('card_cache_timing', runs=2, stdout=out)
+        self.assertIn('Тёплый кэш', out.getvalue())
+        posts = attach_card_versions(Post.objects.all()[:2])
+        for post in posts:
+            self.assertIsNotNone(cache.get(make_template_fragment_key(
+                'post_card', [post.pk, post.card_version])))
+
+
+class ImportPostsCommandTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='importer')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        return path
+
+    def run_import(self, path, **options):
+        call_command(
+            'import_posts', path, stdout=StringIO(), stderr=StringIO(),
+            **options,
+        )
+
+    def test_jsonl_import(self):
+        """Тестируем импорт JSONL с пропуском некорректных записей."""
+
+        records = [
+            {'text': '<b>Первый</b>', 'author': 'importer',
+             'group': 'test_slug', 'pub_date': '2020-01-02T03:04:05'},
+            {'text': 'Второй', 'author': 'importer'},
+            {'text': 'Чужой', 'author': 'nobody'},
+            {'text': 'Третий', 'author': 'importer', 'group': 'test_slug'},
+        ]
+        lines = [json.dumps(record) for record in records]
+        lines.insert(1, '{broken')
+        path = self.write('posts.jsonl', '\n'.join(lines))
+
+        self.run_import(path, batch_size=2)
+
+        self.assertEqual(Post.objects.count(), 3)
+        first = Post.objects.get(text='<b>Первый</b>')
+        self.assertEqual(first.text_html, '&lt;b&gt;Первый&lt;/b&gt;')
+        self.assertEqual(first.pub_date.year, 2020)
+        self.assertEqual(first.updated, first.pub_date)
+        self.user.stats.refresh_from_db()
+        self.group.refresh_from_db()
+        self.assertEqual(self.user.stats.posts_count, 3)
+        self.assertEqual(self.group.posts_count, 2)
+        self.assertFalse(os.path.exists(f'{path}.checkpoint'))
+
+    def test_csv_import_resumes_from_checkpoint(self):
+        """Тестируем, что импорт продолжается с контрольной точки."""
+
+        path = self.write(
+            'posts.csv',
+            'text,author,group\n'
+            'Уже импортирован,importer,\n'
+            'Новый,importer,test_slug\n',
+        )
+        self.write('posts.csv.checkpoint', json.dumps({'consumed': 1}))
+
+        self.run_import(path)
+
+        self.assertListEqual(
+            list(Post.objects.values_list('text', flat=True)), ['Новый'])
+
+    def test_export_round_trip(self):
+        """Тестируем, что выгрузка export_posts читается import_posts."""
+
+        Post.objects.create(author=self.user, text='Выгруженный пост')
+        path = os.path.join(self.directory.name, 'export.jsonl')
+        call_command(
+            'export_posts', '--author', 'importer', '--output', path)
+        Post.objects.all().delete()
+
+        self.run_import(path)
+
+        self.assertListEqual(
+            list(Post.objects.values_list('text', flat=True)),
+            ['Выгруженный пост'],
+        )
@@ -0,0 +1,124 @@
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+from .utils import run_on_commit
+
+User = get_user_model()
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='test_user')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            author=self.user, group=self.group, text='Тестовый пост')
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user.username}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+        )
+
+    def test_unchanged_pages_return_304_without_rendering(self):
+        """Тестируем, что по совпавшему ETag шаблон не рендерится."""
+
+        for client in (self.client, self.authorized_client):
+            for url in self.urls:
+                with self.subTest(url=url):
+                    etag = client.get(url)['ETag']
+                    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+                    self.assertEqual(response.status_code, 304)
+                    self.assertIsNone(response.context)
+
+    def test_if_modified_since(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                last_modified = self.client.get(url)['Last-Modified']
+                response = self.client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=last_modified)
+                self.assertEqual(response.status_code, 304)
+
+    def test_changes_invalidate_etag(self):
+        """Тестируем, что правка и удаление постов меняют ETag."""
+
+        def etags():
+            return [self.client.get(url)['ETag'] for url in self.urls]
+
+        def edit():
+            self.post.text = 'Новый текст'
+            self.post.save(update_fields=['text'])
+
+        def delete():
+            Post.objects.create(author=self.user, group=self.group,
+                                text='Удаляемый пост').delete()
+
+        for change in (edit, delete):
+            with self.subTest(change=change.__name__):
+                before = etags()
+                with run_on_commit():
+                    change()
+                after = etags()
+                for url, old, new in zip(self.urls, before, after):
+                    self.assertNotEqual(old, new, url)
+
+    def test_etag_depends_on_user(self):
+        url = self.urls[0]
+        self.assertNotEqual(
+            self.client.get(url)['ETag'],
+            self.authorized_client.get(url)['ETag'],
+        )
+
+    def test_removals_and_renames_update_last_modified(self):
+        """
+        Тестируем, что удаление, перенос поста и переименование автора
+        сдвигают Last-Modified, хотя `updated` оставшихся постов прежний.
+        """
+
+        other = Group.objects.create(
+            title='Другая группа', slug='other_slug', description='Другая')
+
+        def rename():
+            self.user.first_name = 'Лев'
+            self.user.save()
+
+        def move():
+            self.post.group = other
+            self.post.save(update_fields=['group'])
+
+        def delete():
+            self.post.delete()
+
+        index, group, profile, _ = self.urls
+        cases = (
+            (rename, self.urls),
+            (move, [group]),
+            (delete, [index, profile]),
+        )
+        for shift, (change, urls) in enumerate(cases, start=1):
+            with self.subTest(change=change.__name__):
+                stamps = {
+                    url: self.client.get(url)['Last-Modified'] for url in urls}
+                later = time.time() + shift * 5
+                with mock.patch('posts.cache.time.time',
+                                return_value=later), run_on_commit():
+                    change()
+                for url in urls:
+                    response = self.client.get(
+                        url, HTTP_IF_MODIFIED_SINCE=stamps[url])
+                    self.assertEqual(response.status_code, 200, url)
@@ -0,0 +1,92 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import AuthorStats, Group, Post
+
+User = get_user_model()
+
+
+class PostCountersTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='test_user')
+        self.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        self.group_two = Group.objects.create(
+            title='Тестовая группа 2',
+            slug='test_slug_two',
+            description='Тестовое описание 2',
+        )
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def assertCounters(self, author, group, group_two):
+        self.group.refresh_from_db()
+        self.group_two.refresh_from_db()
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.user).posts_count, author)
+        self.assertEqual(self.group.posts_count, group)
+        self.assertEqual(self.group_two.posts_count, group_two)
+
+    def test_counters_follow_create_edit_and_delete(self):
+        """Тестируем счётчики при создании, переносе и удалении поста."""
+
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Новый пост', 'group': self.group.id},
+        )
+        self.assertCounters(1, 1, 0)
+
+        post = Post.objects.get()
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.id}),
+            data={'text': 'Новый пост', 'group': self.group_two.id},
+        )
+        self.assertCounters(1, 0, 1)
+
+        post = Post.objects.only('text').get()
+        post.group = None
+        post.save()
+        self.assertCounters(1, 0, 0)
+
+        Post.objects.get().delete()
+        self.assertCounters(0, 0, 0)
+
+    def test_group_delete_and_author_cascade(self):
+        """Тестируем удаление группы (SET_NULL) и автора (CASCADE)."""
+
+        Post.objects.create(author=self.user, group=self.group, text='1')
+        Post.objects.create(author=self.user, group=self.group_two, text='2')
+        self.group.delete()
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.user).posts_count, 2)
+
+        self.user.delete()
+        self.group_two.refresh_from_db()
+        self.assertEqual(self.group_two.posts_count, 0)
+        self.assertFalse(AuthorStats.objects.exists())
+
+    def test_recount_command_fixes_drift(self):
+        """Тестируем пересчёт счётчиков после bulk_create."""
+
+        Post.objects.bulk_create(
+            [Post(author=self.user, group=self.group, text=str(i))
+             for i in range(3)]
+        )
+        self.assertCounters(0, 0, 0)
+        call_command('recount_posts', stdout=StringIO())
+        self.assertCounters(3, 3, 0)
+
+    def test_profile_shows_stored_counter(self):
+        """Тестируем, что профиль выводит сохранённый счётчик."""
+
+        AuthorStats.objects.filter(author=self.user).update(posts_count=42)
+        response = self.authorized_client.get(
+            reverse('posts:profile', kwargs={'username': 'test_user'}))
+        self.assertContains(response, 'Всего постов: 42')
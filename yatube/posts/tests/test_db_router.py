@@ -0,0 +1,143 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+
+from core.db_router import (PRIMARY_DB_ALIAS, REPLICA_DB_ALIAS,
+                            PrimaryReplicaRouter, fills_cache, read_only,
+                            replica_reads, use_replica)
+from core.middleware import REPLICA_STICKY_COOKIE, ReplicaRoutingMiddleware
+
+from ..cache import cache_anonymous_page, card_timeout
+from ..constants import POST_CARD_CACHE_TIMEOUT, REPLICA_CARD_CACHE_TIMEOUT
+from ..models import Post
+from ..ring import build_ring, drop_ring
+
+User = get_user_model()
+
+CONFIGURED = mock.patch(
+    'core.db_router.connections', [PRIMARY_DB_ALIAS, REPLICA_DB_ALIAS])
+
+
+class PrimaryReplicaRouterTests(TestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+
+    def test_reads_go_to_replica_only_when_marked(self):
+        with CONFIGURED:
+            self.assertEqual(self.router.db_for_read(Post), PRIMARY_DB_ALIAS)
+            with replica_reads():
+                self.assertEqual(
+                    self.router.db_for_read(Post), REPLICA_DB_ALIAS)
+                self.assertEqual(
+                    self.router.db_for_write(Post), PRIMARY_DB_ALIAS)
+
+    def test_sessions_and_users_are_read_from_primary(self):
+        with CONFIGURED, replica_reads():
+            for model in (Session, User):
+                with self.subTest(model=model.__name__):
+                    self.assertEqual(
+                        self.router.db_for_read(model), PRIMARY_DB_ALIAS)
+
+    def test_missing_replica_falls_back_to_primary(self):
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(Post), PRIMARY_DB_ALIAS)
+
+    def test_cache_fills_read_from_primary(self):
+        """Тестируем, что данные для кэша не читаются из реплики."""
+
+        @fills_cache
+        def read():
+            return self.router.db_for_read(Post)
+
+        self.addCleanup(drop_ring)
+        with CONFIGURED, replica_reads():
+            self.assertEqual(read(), PRIMARY_DB_ALIAS)
+            self.assertEqual(self.router.db_for_read(Post), REPLICA_DB_ALIAS)
+            with mock.patch('posts.ring.ring_posts') as ring_posts:
+                ring_posts.side_effect = lambda: [read.__wrapped__()]
+                self.assertListEqual(
+                    build_ring()['posts'], [PRIMARY_DB_ALIAS])
+
+    def test_only_page_fill_reads_from_primary(self):
+        """
+        Тестируем, что из основной базы читается только страница для
+        кэша, а авторизованный пользователь читает из реплики.
+        """
+
+        seen = []
+
+        @cache_anonymous_page(lambda: 'router_test')
+        def view(request):
+            seen.append((use_replica(), card_timeout()))
+            return HttpResponse()
+
+        anonymous = RequestFactory().get('/')
+        anonymous.user = AnonymousUser()
+        authorized = RequestFactory().get('/')
+        authorized.user = User(username='reader')
+        self.addCleanup(cache.clear)
+        with replica_reads():
+            view(anonymous)
+            view(authorized)
+        self.assertListEqual(seen, [
+            (False, POST_CARD_CACHE_TIMEOUT),
+            (True, REPLICA_CARD_CACHE_TIMEOUT),
+        ])
+
+    def test_only_primary_is_migrated(self):
+        self.assertTrue(self.router.allow_migrate(PRIMARY_DB_ALIAS, 'posts'))
+        self.assertFalse(self.router.allow_migrate(REPLICA_DB_ALIAS, 'posts'))
+
+
+class ReplicaRoutingMiddlewareTests(TestCase):
+    def route(self, method='get', cookies=None, view_is_read_only=True):
+        """Возвращает, читала ли view из реплики."""
+
+        seen = {}
+
+        def view(request):
+            return HttpResponse()
+
+        if view_is_read_only:
+            view = read_only(view)
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            seen['replica'] = use_replica()
+            return view(request)
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        request = getattr(RequestFactory(), method)('/')
+        request.COOKIES.update(cookies or {})
+        response = middleware(request)
+        self.assertFalse(use_replica())
+        return seen['replica'], response
+
+    def test_read_only_get_uses_replica(self):
+        self.assertTrue(self.route()[0])
+
+    def test_other_requests_use_primary(self):
+        cases = {
+            'не помечена': {'view_is_read_only': False},
+            'POST': {'method': 'post'},
+            'после записи': {'cookies': {REPLICA_STICKY_COOKIE: '1'}},
+        }
+        for case, kwargs in cases.items():
+            with self.subTest(case=case):
+                self.assertFalse(self.route(**kwargs)[0])
+
+    def test_write_makes_reads_sticky(self):
+        user = User.objects.create_user(username='writer')
+        client = Client()
+        client.force_login(user)
+        response = client.post(reverse('posts:post_create'), {'text': 'x'})
+        self.assertIn(REPLICA_STICKY_COOKIE, response.cookies)
+
+        response = client.get(reverse('posts:index'))
+        self.assertNotIn(REPLICA_STICKY_COOKIE, response.cookies)
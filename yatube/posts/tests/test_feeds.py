@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+from .utils import run_on_commit
+
+User = get_user_model()
+
+
+class SyndicationFeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='test_user')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            author=self.user, group=self.group, text='Пост для ленты')
+        self.urls = [
+            reverse(name, args=args)
+            for names, args in (
+                (('posts:index_rss', 'posts:index_atom'), []),
+                (('posts:group_rss', 'posts:group_atom'), ['test_slug']),
+                (('posts:profile_rss', 'posts:profile_atom'), ['test_user']),
+            )
+            for name in names
+        ]
+
+    def test_feeds_list_posts(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, 'Пост для ленты')
+                self.assertContains(response, reverse(
+                    'posts:post_detail', args=[self.post.pk]))
+
+    def test_repeated_poll_hits_cache(self):
+        """Тестируем, что повторный опрос не обращается к базе."""
+
+        for url in self.urls:
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                with self.assertNumQueries(0):
+                    response = self.client.get(url)
+                    self.assertEqual(response.status_code, 200)
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                    self.assertEqual(response.status_code, 304)
+
+    def test_feeds_are_invalidated_by_new_posts(self):
+        for url in self.urls:
+            self.client.get(url)
+        with run_on_commit():
+            Post.objects.create(
+                author=self.user, group=self.group, text='Свежий пост')
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertContains(self.client.get(url), 'Свежий пост')
+
+    def test_unknown_group_returns_404(self):
+        response = self.client.get(reverse('posts:group_rss', args=['nope']))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,186 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+from sorl.thumbnail import default
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.kvstores.cached_db_kvstore import EMPTY_VALUE
+from sorl.thumbnail.models import KVStore
+
+from core.templatetags.post_images import PLACEHOLDER_SRC
+
+from ..models import Post
+from ..thumbnails import (cached_thumbnails, generate_thumbnails,
+                          make_thumbnails, thumbnail_files, thumbnails_ready)
+from .utils import run_on_commit
+
+User = get_user_model()
+
+KVSTORE_CLASS = 'sorl.thumbnail.kvstores.cached_db_kvstore.KVStore'
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def image_file(name='picture.png', size=(1200, 800)):
+    content = io.BytesIO()
+    Image.new('RGB', size, 'teal').save(content, 'PNG')
+    return SimpleUploadedFile(name, content.getvalue(), 'image/png')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PostImageTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост с картинкой',
+            image=image_file(),
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(PostImageTests.user)
+
+    def test_create_post_with_image(self):
+        """Тестируем загрузку картинки и заказ миниатюр для неё."""
+
+        with mock.patch('posts.signals.schedule_thumbnails') as schedule:
+            response = self.authorized_client.post(
+                reverse('posts:post_create'),
+                {'text': 'Пост из формы', 'image': image_file('new.png')},
+            )
+            post = Post.objects.first()
+            self.assertRedirects(
+                response, reverse('posts:profile', args=['test_user']))
+            self.assertTrue(post.image.name.startswith('posts/new'))
+            schedule.assert_called_once_with(post)
+            post.text = 'Правка без новой картинки'
+            post.save()
+            schedule.assert_called_once()
+
+    def test_placeholder_until_thumbnails_exist(self):
+        """Тестируем заглушку без srcset, пока миниатюр нет."""
+
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:post_detail', args=[self.post.pk]),
+        ):
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertContains(response, PLACEHOLDER_SRC)
+                self.assertNotContains(response, 'srcset')
+
+    def generate_in_worker(self):
+        """Миниатюры, созданные процессом пула со своим кэшем."""
+
+        # LocMemCache с одним именем делит хранилище: чистим прошлый тест.
+        worker_cache = LocMemCache('worker', {})
+        worker_cache.clear()
+        with mock.patch(
+                f'{KVSTORE_CLASS}.cache', new_callable=mock.PropertyMock,
+                return_value=worker_cache):
+            generate_thumbnails(self.post.image.name)
+
+    def test_pages_use_thumbnails_without_storage_calls(self):
+        """
+        Тестируем srcset готовых миниатюр: после заглушки страницы
+        перерисовываются, берут миниатюры из хранилища ключей и к файлам
+        не обращаются.
+        """
+
+        self.authorized_client.get(reverse('posts:index'))
+        self.generate_in_worker()
+        with run_on_commit():
+            thumbnails_ready(self.post.pk)
+        failing = mock.Mock(side_effect=AssertionError('обращение к файлу'))
+        with mock.patch.multiple(
+                FileSystemStorage, exists=failing, size=failing,
+                _open=failing, listdir=failing):
+            for url, size in (
+                (reverse('posts:index'), 'card'),
+                (reverse('posts:profile', args=['test_user']), 'card'),
+                (reverse('posts:post_detail', args=[self.post.pk]), 'detail'),
+            ):
+                with self.subTest(url=url):
+                    first, second = cached_thumbnails(self.post.image, size)
+                    response = self.authorized_client.get(url)
+                    self.assertContains(
+                        response, f'{first.url} 1x, {second.url} 2x')
+                    self.assertNotContains(response, PLACEHOLDER_SRC)
+
+    def test_misses_are_not_cached(self):
+        """
+        Тестируем, что промах не запоминается: миниатюры другого
+        процесса видны сразу, даже поверх промаха, закэшированного sorl.
+        """
+
+        self.authorized_client.get(reverse('posts:index'))
+        self.assertIsNone(cached_thumbnails(self.post.image, 'card'))
+        first, _ = thumbnail_files(self.post.image, 'card')
+        default.kvstore.cache.set(add_prefix(first.key), EMPTY_VALUE)
+        self.generate_in_worker()
+        self.assertIsNotNone(cached_thumbnails(self.post.image, 'card'))
+
+    def test_page_reads_thumbnail_keys_in_one_query(self):
+        """Тестируем, что ключи миниатюр страницы читаются одним запросом."""
+
+        for i in range(3):
+            Post.objects.create(
+                author=self.user, text=f'Ещё картинка {i}', image=image_file())
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.authorized_client.get(
+                reverse('posts:profile', args=['test_user']))
+        self.assertEqual(len([
+            query for query in queries
+            if KVStore._meta.db_table in query['sql']
+        ]), 1)
+
+    def test_thumbnail_sizes(self):
+        """Тестируем размеры миниатюр карточки и страницы поста."""
+
+        generate_thumbnails(self.post.image.name)
+        sizes = {
+            size: [
+                (thumbnail.width, thumbnail.height)
+                for thumbnail in cached_thumbnails(self.post.image, size)
+            ]
+            for size in ('card', 'detail')
+        }
+        self.assertDictEqual(sizes, {
+            'card': [(480, 270), (960, 540)],
+            # Без увеличения: 2x не больше исходной картинки.
+            'detail': [(960, 640), (1200, 800)],
+        })
+
+    @override_settings(THUMBNAIL_WORKERS=2)
+    def test_thumbnails_are_made_in_process_pool(self):
+        """Тестируем, что миниатюры уходят в пул, а не делаются сразу."""
+
+        with mock.patch('posts.thumbnails.get_executor') as get_executor:
+            make_thumbnails(self.post.pk, self.post.image.name)
+        submit = get_executor.return_value.submit
+        submit.assert_called_once_with(
+            generate_thumbnails, self.post.image.name)
+        submit.return_value.add_done_callback.assert_called_once()
+        self.assertIsNone(cached_thumbnails(self.post.image, 'card'))
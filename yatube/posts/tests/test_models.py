@@ -1,8 +1,10 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
 
-from ..constants import POST_STR_LIM
-from ..models import Post, Group
+from ..constants import POST_EXCERPT_LENGTH, POST_STR_LIM
+from ..models import FEED_DEFERRED_FIELDS, Post, Group
 
 
 User = get_user_model()
@@ -62,3 +64,42 @@ class PostModelTest(TestCase):
 
         post_expected_object_name = post.text[:POST_STR_LIM]
         self.assertEqual(post_expected_object_name, str(post))
+
+
+class PostRenderedTextTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='render')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_html_is_rendered_on_save(self):
+        """HTML текста и анонса экранируется и рендерится при сохранении."""
+
+        post = Post.objects.create(author=self.user, text='<b>раз</b>\nдва')
+        expected = '&lt;b&gt;раз&lt;/b&gt;<br>два'
+        self.assertEqual(post.text_html, expected)
+        self.assertEqual(post.excerpt_html, expected)
+
+        post.text = 'новый текст'
+        post.save(update_fields=['text'])
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, 'новый текст')
+        self.assertEqual(post.excerpt_html, 'новый текст')
+
+    def test_excerpt_is_bounded(self):
+        post = Post.objects.create(
+            author=self.user, text='а' * (POST_EXCERPT_LENGTH * 2))
+        self.assertEqual(len(post.excerpt_html), POST_EXCERPT_LENGTH)
+        self.assertEqual(len(post.text_html), POST_EXCERPT_LENGTH * 2)
+
+    def test_feeds_do_not_load_full_text(self):
+        """Ленты выводят анонс и не читают из базы полный текст поста."""
+
+        Post.objects.create(author=self.user, text='a' * 1000)
+        response = self.client.get(reverse('posts:index'))
+        post = response.context['page_obj'][0]
+        self.assertTrue(
+            set(FEED_DEFERRED_FIELDS) <= post.get_deferred_fields())
+        self.assertContains(response, post.excerpt_html)
@@ -0,0 +1,82 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.query_budget import QueryBudgetExceeded, check_query_budget
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.user = User.objects.create_user(username='test_user')
+        authors = [cls.user] + [
+            User.objects.create_user(username=f'author_{i}')
+            for i in range(5)
+        ]
+        Post.objects.bulk_create(
+            [Post(
+                author=authors[i % len(authors)],
+                group=cls.group,
+                text=f'Тестовый пост № {i}',
+            ) for i in range(25)]
+        )
+        cls.post = Post.objects.filter(author=cls.user).first()
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(QueryBudgetTests.user)
+
+    def test_views_fit_their_budgets(self):
+        """Тестируем, что view укладываются в бюджет SQL-запросов."""
+
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:index') + '?page=2',
+            reverse('posts:group_list', kwargs={'slug': 'test_slug'}),
+            reverse('posts:group_list', kwargs={'slug': 'test_slug'})
+            + '?page=2',
+            reverse('posts:profile', kwargs={'username': 'test_user'}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id}),
+            reverse('posts:post_edit', kwargs={'post_id': self.post.id}),
+            reverse('posts:post_create'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                cache.clear()
+                response = self.authorized_client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Новый пост', 'group': self.group.id},
+        )
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.id}),
+            data={'text': 'Изменённый пост'},
+        )
+
+    def test_overrun_raises_in_strict_mode(self):
+        """Тестируем, что в строгом режиме превышение бюджета роняет тест."""
+
+        with self.assertRaises(QueryBudgetExceeded):
+            check_query_budget('posts:index', 1, 2)
+
+    @override_settings(QUERY_BUDGET_STRICT=False)
+    def test_overrun_is_logged_in_production(self):
+        """Тестируем, что без строгого режима превышение пишется в лог."""
+
+        with self.assertLogs('yatube.query_budget', 'WARNING') as logs:
+            check_query_budget('posts:index', 1, 2)
+        self.assertIn('posts:index', logs.output[0])
@@ -0,0 +1,54 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+from .utils import assert_index_only_plans
+
+User = get_user_model()
+
+
+class FeedQueryPlanTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            [Post(
+                author=cls.user,
+                group=cls.group if i % 2 else None,
+                text=f'Тестовый пост № {i}',
+            ) for i in range(30)]
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(FeedQueryPlanTests.user)
+
+    def assert_plans(self, url):
+        # Главная читается из кольца новых постов: без сброса кэша в базу
+        # уходит только его пересборка, её планы и проверяем.
+        cache.clear()
+        assert_index_only_plans(self, self.authorized_client, url)
+
+    def test_feeds_use_indexes(self):
+        """Тестируем, что ленты читаются по индексу без сортировки."""
+
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': 'test_slug'}),
+            reverse('posts:profile', kwargs={'username': 'test_user'}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                first = self.authorized_client.get(url).context['page_obj']
+                self.assert_plans(url)
+                self.assert_plans(f'{url}?cursor={first.next_cursor()}')
+                self.assert_plans(f'{url}?page=2')
@@ -0,0 +1,165 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import ring
+from ..constants import INDEX_PER_PAGE_LIMIT, INDEX_RING_SIZE
+from ..models import Group, Post
+from ..ring import (RING_KEY, RING_LOCK_KEY, build_ring, get_ring,
+                    remove_from_ring, update_ring)
+from .utils import CACHED_SESSIONS, run_on_commit
+
+User = get_user_model()
+
+
+class IndexRingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            [Post(
+                author=cls.user,
+                group=cls.group if i % 2 else None,
+                text=f'Тестовый пост № {i}',
+            ) for i in range(INDEX_RING_SIZE + 4)]
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(IndexRingTests.user)
+
+    def ring_ids(self):
+        return [post.pk for post in get_ring()['posts']]
+
+    def newest_ids(self):
+        return list(
+            Post.objects.values_list('pk', flat=True)[:INDEX_RING_SIZE])
+
+    @override_settings(**CACHED_SESSIONS)
+    def test_first_pages_are_served_from_ring(self):
+        """
+        Тестируем, что первые страницы главной после прогрева не
+        обращаются к базе: посты берутся из кольца, сессия и
+        пользователь — из кэша.
+        """
+
+        url = reverse('posts:index')
+        self.authorized_client.get(url)
+        expected = list(Post.objects.all())
+        with self.assertNumQueries(0):
+            first = self.authorized_client.get(url).context['page_obj']
+        self.assertListEqual(
+            list(first), expected[:INDEX_PER_PAGE_LIMIT])
+        with self.assertNumQueries(0):
+            second = self.authorized_client.get(
+                url, {'cursor': first.next_cursor()}).context['page_obj']
+        self.assertListEqual(
+            list(second),
+            expected[INDEX_PER_PAGE_LIMIT:INDEX_PER_PAGE_LIMIT * 2],
+        )
+        self.assertTrue(second.has_next())
+        self.assertTrue(second.has_previous())
+
+    def test_ring_follows_create_edit_and_delete(self):
+        """Тестируем правку кольца на месте, без пересборки."""
+
+        get_ring()
+        with run_on_commit():
+            post = Post.objects.create(
+                author=self.user, group=self.group, text='Новый пост')
+        self.assertListEqual(self.ring_ids(), self.newest_ids())
+
+        post.text = 'Изменённый пост'
+        with run_on_commit():
+            post.save()
+        self.assertEqual(
+            get_ring()['posts'][0].excerpt_html, 'Изменённый пост')
+        self.assertEqual(get_ring()['last_modified'], post.updated)
+
+        with run_on_commit():
+            post.delete()
+        self.assertListEqual(
+            self.ring_ids(), self.newest_ids()[:INDEX_RING_SIZE - 1])
+
+    def test_old_post_does_not_enter_ring(self):
+        """Тестируем, что правка поста за концом кольца его не меняет."""
+
+        ids = self.ring_ids()
+        oldest = Post.objects.last()
+        oldest.text = 'Старый пост'
+        oldest.save()
+        self.assertListEqual(self.ring_ids(), ids)
+
+    def test_short_ring_falls_back_to_database(self):
+        """
+        Тестируем, что после удалений страница, которой не хватает постов
+        в кольце, читается из базы.
+        """
+
+        get_ring()
+        with run_on_commit():
+            Post.objects.first().delete()
+        url = reverse('posts:index')
+        first = self.authorized_client.get(url).context['page_obj']
+        second = self.authorized_client.get(
+            url, {'cursor': first.next_cursor()}).context['page_obj']
+        self.assertListEqual(
+            list(second),
+            list(Post.objects.all()[
+                INDEX_PER_PAGE_LIMIT:INDEX_PER_PAGE_LIMIT * 2]),
+        )
+
+    def test_author_rename_drops_ring(self):
+        """Тестируем сброс кольца при смене имени автора."""
+
+        get_ring()
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Новое имя'
+        with run_on_commit():
+            user.save()
+        self.assertIsNone(cache.get(RING_KEY))
+
+    def test_busy_lock_drops_ring(self):
+        """Тестируем, что при занятом замке кольцо сбрасывается."""
+
+        get_ring()
+        cache.add(RING_LOCK_KEY, 1)
+        update_ring(Post.objects.first())
+        self.assertIsNone(cache.get(RING_KEY))
+
+    def test_rolled_back_post_stays_out_of_ring(self):
+        """Тестируем, что откаченный пост не попадает в кольцо."""
+
+        ids = self.ring_ids()
+        with run_on_commit(), self.assertRaises(DatabaseError):
+            with transaction.atomic():
+                Post.objects.create(author=self.user, text='Откаченный пост')
+                raise DatabaseError
+        self.assertListEqual(self.ring_ids(), ids)
+
+    def test_build_drops_ring_edited_meanwhile(self):
+        """
+        Тестируем, что кольцо, собранное до правки, которую оно могло не
+        увидеть, не остаётся в кэше.
+        """
+
+        def ring_posts():
+            posts = real_ring_posts()
+            remove_from_ring(Post.objects.first().pk)
+            return posts
+
+        real_ring_posts = ring.ring_posts
+        with mock.patch('posts.ring.ring_posts', ring_posts):
+            build_ring()
+        self.assertIsNone(cache.get(RING_KEY))
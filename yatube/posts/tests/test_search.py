@@ -0,0 +1,102 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.db_router import PRIMARY_DB_ALIAS, REPLICA_DB_ALIAS, replica_reads
+
+from ..fts import FTS_TABLE, TRIGGER_NAMES
+from ..models import Post
+from ..search import SearchResults
+
+User = get_user_model()
+
+
+class PostSearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='test_user')
+        self.post = Post.objects.create(
+            author=self.user,
+            text='Про котов и <b>кошек</b>',
+        )
+        self.other_post = Post.objects.create(
+            author=self.user,
+            text='Собаки лучше. Кот, впрочем, тоже ничего.',
+        )
+        self.guest_client = Client()
+        self.url = reverse('posts:search')
+
+    def search(self, query, **params):
+        response = self.guest_client.get(self.url, {'q': query, **params})
+        return list(response.context['page_obj'])
+
+    def test_search_finds_and_highlights(self):
+        """Тестируем поиск по префиксу и подсветку совпадений."""
+
+        response = self.guest_client.get(self.url, {'q': 'кош'})
+        self.assertEqual(list(response.context['page_obj']), [self.post])
+        self.assertContains(response, '<mark>кошек</mark>')
+        self.assertContains(response, '&lt;b&gt;')
+        self.assertCountEqual(
+            self.search('кот'), [self.post, self.other_post])
+
+    def test_index_and_posts_are_read_from_one_database(self):
+        """Тестируем, что поиск с реплики читает с неё и индекс, и посты."""
+
+        with mock.patch('core.db_router.connections',
+                        [PRIMARY_DB_ALIAS, REPLICA_DB_ALIAS]):
+            self.assertEqual(SearchResults('кот').db, PRIMARY_DB_ALIAS)
+            with replica_reads():
+                self.assertEqual(SearchResults('кот').db, REPLICA_DB_ALIAS)
+
+    def test_index_follows_edit_and_delete(self):
+        """Тестируем синхронизацию индекса при правке и удалении."""
+
+        self.post.text = 'Теперь про хомяков'
+        self.post.save()
+        self.assertEqual(self.search('кошек'), [])
+        self.assertEqual(self.search('хомяков'), [self.post])
+
+        self.post.delete()
+        self.assertEqual(self.search('хомяков'), [])
+
+    def test_bulk_created_posts_are_indexed(self):
+        """Тестируем, что bulk_create тоже попадает в индекс."""
+
+        Post.objects.bulk_create(
+            [Post(author=self.user, text=f'Попугай № {i}')
+             for i in range(12)]
+        )
+        self.assertEqual(len(self.search('попугай')), 10)
+        self.assertEqual(len(self.search('попугай', page=2)), 2)
+
+    def test_garbage_query_is_safe(self):
+        """Тестируем, что спецсимволы FTS5 не ломают поиск."""
+
+        for query in ('"', 'AND OR NOT', '*', '(кот', ''):
+            with self.subTest(query=query):
+                response = self.guest_client.get(self.url, {'q': query})
+                self.assertEqual(response.status_code, 200)
+
+    def test_triggers_survive_migrations(self):
+        """Тестируем, что после всех миграций триггеры индекса на месте."""
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger'")
+            triggers = {row[0] for row in cursor.fetchall()}
+        self.assertLessEqual(set(TRIGGER_NAMES), triggers)
+
+    def test_rebuild_command(self):
+        """Тестируем перестройку индекса командой."""
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')")
+        self.assertEqual(self.search('кошек'), [])
+        call_command('rebuild_search_index', optimize=True, stdout=StringIO())
+        self.assertEqual(self.search('кошек'), [self.post])
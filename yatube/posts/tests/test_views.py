@@ -1,10 +1,18 @@
+import csv
+import io
+import json
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from ..constants import INDEX_PER_PAGE_LIMIT
 from ..forms import PostForm
 from ..models import Post, Group
+from ..ring import drop_ring
 
 User = get_user_model()
 
@@ -25,6 +33,7 @@ class PostPagesTests(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.authorized_client = Client()
         self.authorized_client.force_login(PostPagesTests.user)
 
@@ -71,6 +80,7 @@ class TestPostContext(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.authorized_client = Client()
         self.authorized_client.force_login(TestPostContext.user)
 
@@ -197,6 +207,7 @@ class TestOnePost(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.authorized_client = Client()
         self.authorized_client.force_login(TestOnePost.user)
 
@@ -215,3 +226,131 @@ class TestOnePost(TestCase):
                     len(
                         response.context.get('page_obj').object_list
                     ), posts_count)
+
+
+class TestCursorPagination(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='test_user')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            [Post(
+                author=cls.user,
+                group=cls.group,
+                text=f'Тестовый пост № {i}',
+            ) for i in range(13)]
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_cursor_pages_walk_whole_feed(self):
+        """Тестируем обход ленты по курсорам вперёд и назад."""
+
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': 'test_slug'}),
+            reverse('posts:profile', kwargs={'username': 'test_user'}),
+        )
+        expected = list(Post.objects.all())
+        for url in urls:
+            with self.subTest(url=url):
+                first = self.client.get(url).context['page_obj']
+                self.assertListEqual(
+                    list(first), expected[:INDEX_PER_PAGE_LIMIT])
+                self.assertFalse(first.has_previous())
+                self.assertTrue(first.has_next())
+
+                second = self.client.get(
+                    url, {'cursor': first.next_cursor()}
+                ).context['page_obj']
+                self.assertListEqual(
+                    list(second), expected[INDEX_PER_PAGE_LIMIT:])
+                self.assertFalse(second.has_next())
+                self.assertTrue(second.has_previous())
+
+                back = self.client.get(
+                    url, {'cursor': second.previous_cursor()}
+                ).context['page_obj']
+                self.assertListEqual(list(back), list(first))
+
+    def test_cursor_page_does_not_count_rows(self):
+        """Тестируем, что страница по курсору не выполняет COUNT(*)."""
+
+        first = self.client.get(reverse('posts:index')).context['page_obj']
+        drop_ring()
+        with CaptureQueriesContext(connection) as queries:
+            page = self.client.get(
+                reverse('posts:index'), {'cursor': first.next_cursor()}
+            ).context['page_obj']
+            list(page)
+        # Выборка кольца новых постов и max(updated) для Last-Modified.
+        self.assertEqual(len(queries), 2)
+        for query in queries:
+            self.assertNotIn('COUNT', query['sql'])
+
+    def test_broken_cursor_returns_first_page(self):
+        """Тестируем, что битый курсор отдаёт первую страницу."""
+
+        response = self.client.get(reverse('posts:index'), {'cursor': '!!!'})
+        self.assertListEqual(
+            list(response.context['page_obj']),
+            list(Post.objects.all()[:INDEX_PER_PAGE_LIMIT]),
+        )
+
+
+class ExportViewsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        for i in range(3):
+            Post.objects.create(
+                author=cls.author,
+                group=cls.group if i else None,
+                text=f'Пост, № {i}',
+            )
+
+    def setUp(self):
+        self.staff_client = Client()
+        self.staff_client.force_login(ExportViewsTests.staff)
+
+    def test_export_streams_all_posts(self):
+        """Тестируем потоковую выгрузку постов автора и группы."""
+
+        urls = {
+            reverse('posts:profile_export', args=['author']): 3,
+            reverse('posts:group_export', args=['test_slug']): 2,
+        }
+        for url, count in urls.items():
+            with self.subTest(url=url):
+                response = self.staff_client.get(url)
+                self.assertTrue(response.streaming)
+                lines = b''.join(response.streaming_content).decode()
+                records = [json.loads(line) for line in lines.splitlines()]
+                self.assertEqual(len(records), count)
+                self.assertEqual(records[-1]['text'], 'Пост, № 2')
+
+                response = self.staff_client.get(url, {'format': 'csv'})
+                rows = list(csv.reader(io.StringIO(
+                    b''.join(response.streaming_content).decode())))
+                self.assertEqual(rows[0][-1], 'text')
+                self.assertEqual(len(rows), count + 1)
+
+    def test_export_requires_staff(self):
+        client = Client()
+        client.force_login(ExportViewsTests.author)
+        response = client.get(
+            reverse('posts:profile_export', args=['author']))
+        self.assertEqual(response.status_code, 302)
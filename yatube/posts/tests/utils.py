@@ -0,0 +1,77 @@
+import re
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test.utils import CaptureQueriesContext
+
+FULL_SCAN_RE = re.compile(r'\bSCAN (?:TABLE )?(\w+)$')
+
+AUTH_MIDDLEWARE = 'django.contrib.auth.middleware.AuthenticationMiddleware'
+CACHED_AUTH_MIDDLEWARE = 'core.middleware.CachedAuthenticationMiddleware'
+# Настройки с общим кэшем: сессии и пользователь запроса из кэша.
+# Кэш в тестах локален, но процесс один, и сброс виден сразу.
+CACHED_SESSIONS = {
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+    'MIDDLEWARE': [
+        CACHED_AUTH_MIDDLEWARE if name == AUTH_MIDDLEWARE else name
+        for name in settings.MIDDLEWARE
+    ],
+}
+
+
+@contextmanager
+def run_on_commit(using=DEFAULT_DB_ALIAS):
+    """
+    Выполняет колбэки `transaction.on_commit`, заказанные внутри блока:
+    TestCase не коммитит транзакцию, и сами они не запустятся.
+    """
+
+    connection = connections[using]
+    start = len(connection.run_on_commit)
+    yield
+    # Откат точки сохранения заменяет список, поэтому он читается заново.
+    while len(connection.run_on_commit) > start:
+        callbacks = connection.run_on_commit[start:]
+        del connection.run_on_commit[start:]
+        for _, callback in callbacks:
+            callback()
+
+
+def explain_query_plan(sql):
+    """Возвращает строки `EXPLAIN QUERY PLAN` для готового SQL-запроса."""
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def assert_index_only_plans(testcase, client, url, table='posts_post'):
+    """
+    Выполняет GET-запрос и проверяет планы всех SELECT-ов по `table`:
+    ни сортировки через временное B-дерево, ни полного скана таблицы.
+    """
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    testcase.assertEqual(response.status_code, 200)
+
+    checked = 0
+    for query in queries.captured_queries:
+        sql = query['sql']
+        if not sql.startswith('SELECT') or f'"{table}"' not in sql:
+            continue
+        checked += 1
+        plan = explain_query_plan(sql)
+        with testcase.subTest(url=url, sql=sql):
+            testcase.assertFalse(
+                [line for line in plan if 'TEMP B-TREE' in line],
+                f'Сортировка без индекса: {plan}',
+            )
+            testcase.assertNotIn(
+                table,
+                [FULL_SCAN_RE.search(line).group(1) for line in plan
+                 if FULL_SCAN_RE.search(line)],
+                f'Полный скан таблицы {table}: {plan}',
+            )
+    testcase.assertTrue(checked, f'Нет запросов к {table} на {url}')
@@ -0,0 +1,203 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+
+import django
+from django.conf import settings
+from django.db import connections, transaction
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.conf import defaults as default_settings
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile, deserialize_image_file
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.kvstores.cached_db_kvstore import EMPTY_VALUE
+from sorl.thumbnail.models import KVStore
+from sorl.thumbnail.parsers import parse_geometry
+
+from .constants import POST_IMAGE_SIZES
+from .models import Post
+
+logger = logging.getLogger('yatube.thumbnails')
+
+
+def thumbnail_options(source, options):
+    """
+    Параметры миниатюры с умолчаниями, дополненные так же, как это
+    делает `get_thumbnail()` sorl: от них зависит имя её файла.
+    """
+
+    backend = default.backend
+    options = dict(options)
+    if thumbnail_settings.THUMBNAIL_PRESERVE_FORMAT:
+        options.setdefault('format', backend._get_format(source))
+    for key, value in backend.default_options.items():
+        options.setdefault(key, value)
+    for key, attr in backend.extra_options:
+        value = getattr(thumbnail_settings, attr)
+        if value != getattr(default_settings, attr):
+            options.setdefault(key, value)
+    return options
+
+
+def thumbnail_file(source, geometry, options):
+    """Файл миниатюры под именем, которое ей даст sorl; файл не читается."""
+
+    name = default.backend._get_thumbnail_filename(
+        source, geometry, thumbnail_options(source, options))
+    return ImageFile(name, default.storage)
+
+
+def thumbnail_files(image, size):
+    source = ImageFile(image)
+    spec = POST_IMAGE_SIZES[size]
+    return [
+        thumbnail_file(source, geometry, spec['options'])
+        for geometry in spec['geometry']
+    ]
+
+
+def load_thumbnail_values(keys):
+    """
+    Сырые значения хранилища ключей: из кэша, а недостающие — из базы
+    одним запросом. Найденные кэшируются, промахи нет: миниатюры пишет
+    процесс пула, и запомненный промах скрывал бы их от других
+    процессов сайта. Промахи, которые закэшировал сам sorl, тоже
+    считаются недостающими.
+    """
+
+    kv_cache = default.kvstore.cache
+    values = {
+        key: value for key, value in kv_cache.get_many(keys).items()
+        if value != EMPTY_VALUE
+    }
+    missing = [key for key in keys if key not in values]
+    if missing:
+        found = dict(KVStore.objects.filter(
+            key__in=missing).values_list('key', 'value'))
+        kv_cache.set_many(found, thumbnail_settings.THUMBNAIL_CACHE_TIMEOUT)
+        values.update(found)
+    return values
+
+
+def thumbnails_from(files, values):
+    """Миниатюры из прочитанных значений или None, если есть не все."""
+
+    keys = [add_prefix(thumbnail.key) for thumbnail in files]
+    if not all(key in values for key in keys):
+        return None
+    return [deserialize_image_file(values[key]) for key in keys]
+
+
+def cached_thumbnails(image, size):
+    """
+    Миниатюры 1x и 2x размера `size` из хранилища ключей или None, пока
+    готовы не все. В отличие от `get_thumbnail()` ничего не создаёт
+    и к файлам не обращается.
+    """
+
+    files = thumbnail_files(image, size)
+    keys = [add_prefix(thumbnail.key) for thumbnail in files]
+    return thumbnails_from(files, load_thumbnail_values(keys))
+
+
+def prefetch_thumbnails(posts, size):
+    """
+    Читает миниатюры постов страницы разом, а не по запросу на карточку,
+    и запоминает их в посте для `post_thumbnails()`.
+    """
+
+    files = {
+        post: thumbnail_files(post.image, size)
+        for post in posts if post.image
+    }
+    if not files:
+        return
+    values = load_thumbnail_values([
+        add_prefix(thumbnail.key)
+        for post_files in files.values() for thumbnail in post_files
+    ])
+    for post, post_files in files.items():
+        if not hasattr(post, '_thumbnails'):
+            post._thumbnails = {}
+        post._thumbnails[size] = thumbnails_from(post_files, values)
+
+
+def post_thumbnails(post, size):
+    """Миниатюры поста из `prefetch_thumbnails()` или прочитанные заново."""
+
+    prefetched = getattr(post, '_thumbnails', {})
+    if size in prefetched:
+        return prefetched[size]
+    return cached_thumbnails(post.image, size)
+
+
+def placeholder_size(size):
+    """Ширина и высота заглушки; высоты нет, если геометрия без неё."""
+
+    return parse_geometry(POST_IMAGE_SIZES[size]['geometry'][0])
+
+
+def generate_thumbnails(name):
+    """Создаёт миниатюры картинки во всех размерах; идёт в процессе пула."""
+
+    for spec in POST_IMAGE_SIZES.values():
+        for geometry in spec['geometry']:
+            get_thumbnail(name, geometry, **spec['options'])
+
+
+@lru_cache(maxsize=None)
+def get_executor():
+    # spawn, а не fork: дочерний процесс не наследует открытые
+    # соединения с базой и потоки родителя.
+    return ProcessPoolExecutor(
+        max_workers=settings.THUMBNAIL_WORKERS,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=django.setup,
+    )
+
+
+def thumbnails_ready(post_id):
+    """
+    Сохраняет пост с готовыми миниатюрами: новый `updated` и сигналы
+    post_save сбрасывают его карточку, страницы лент и кольцо главной,
+    и страницы перерисовываются уже с srcset вместо заглушки.
+    """
+
+    post = Post.objects.select_related('author', 'group').filter(
+        pk=post_id).first()
+    if post is None or not post.image:
+        return
+    post.save(update_fields=['updated'])
+
+
+def finish_thumbnails(post_id, future):
+    """Колбэк пула; выполняется в служебном потоке процесса сайта."""
+
+    try:
+        error = future.exception()
+        if error is not None:
+            logger.error(
+                'Миниатюры поста %s не созданы', post_id, exc_info=error)
+            return
+        thumbnails_ready(post_id)
+    finally:
+        connections.close_all()
+
+
+def make_thumbnails(post_id, name):
+    if not settings.THUMBNAIL_WORKERS:
+        generate_thumbnails(name)
+        thumbnails_ready(post_id)
+        return
+    future = get_executor().submit(generate_thumbnails, name)
+    future.add_done_callback(partial(finish_thumbnails, post_id))
+
+
+def schedule_thumbnails(post):
+    """
+    Заказывает миниатюры картинки поста после коммита: к этому времени
+    и файл, и строка поста уже сохранены, а ответ на запрос их не ждёт.
+    """
+
+    transaction.on_commit(partial(make_thumbnails, post.pk, post.image.name))
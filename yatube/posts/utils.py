@@ -1,11 +1,133 @@
-from django.core.paginator import Paginator
+import base64
+import binascii
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+
+from .constants import CURSOR_ORDERING, CURSOR_PARAM, PAGE_PARAM
+
+
+class CursorPage(Page):
+    """Страница keyset-пагинации: без номера и без общего количества."""
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        super().__init__(object_list, None, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return '<CursorPage of %s objects>' % len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1], forward=True)
+
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        return self.paginator.encode_cursor(self.object_list[0], forward=False)
+
+
+class CursorPaginator(Paginator):
+    """
+    Keyset-паджинатор по ключу сортировки (по умолчанию `(pub_date, id)`).
+
+    Не выполняет ни `COUNT(*)`, ни `OFFSET`: каждая страница — это выборка
+    `per_page + 1` строк после (или до) ключа из непрозрачного курсора,
+    поэтому время ответа не зависит от глубины листания.
+    """
+
+    is_cursor = True
+
+    def __init__(self, object_list, per_page, ordering=CURSOR_ORDERING):
+        super().__init__(object_list, per_page)
+        self.fields = tuple(name.lstrip('-') for name in ordering)
+        self.descending = ordering[0].startswith('-')
+
+    def _ordering(self, forward):
+        prefix = '-' if self.descending == forward else ''
+        return [prefix + name for name in self.fields]
+
+    def _after(self, key, forward):
+        """Условие «строго после ключа» для составного ключа сортировки."""
+        lookup = 'lt' if self.descending == forward else 'gt'
+        condition = Q()
+        for i, name in enumerate(self.fields):
+            step = Q(**{f'{name}__{lookup}': key[i]})
+            for prev_name, prev_value in zip(self.fields[:i], key[:i]):
+                step &= Q(**{prev_name: prev_value})
+            condition |= step
+        return condition
+
+    def encode_cursor(self, obj, forward):
+        # Строки из `values()` приходят словарями, а не объектами модели.
+        if isinstance(obj, dict):
+            values = [str(obj[name]) for name in self.fields]
+        else:
+            values = [str(getattr(obj, name)) for name in self.fields]
+        raw = ('n' if forward else 'p') + '|'.join(values)
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, token):
+        """Возвращает `(forward, key)` или None для битого курсора."""
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        except (binascii.Error, UnicodeError, ValueError):
+            return None
+        direction, values = raw[:1], raw[1:].split('|')
+        if direction not in ('n', 'p') or len(values) != len(self.fields):
+            return None
+        model = self.object_list.model
+        try:
+            key = [
+                model._meta.get_field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except ValidationError:
+            return None
+        if any(value is None for value in key):
+            return None
+        return direction == 'n', key
+
+    def get_cursor_page(self, token):
+        """
+        Возвращает страницу по курсору; пустой или некорректный курсор
+        даёт первую страницу, как `get_page` для номера страницы.
+        """
+        decoded = self.decode_cursor(token) if token else None
+        forward, key = decoded or (True, None)
+        objects = self.object_list.order_by(*self._ordering(forward))
+        if key is not None:
+            objects = objects.filter(self._after(key, forward))
+        rows = list(objects[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if forward:
+            return CursorPage(rows, self, has_more, key is not None)
+        rows.reverse()
+        return CursorPage(rows, self, True, has_more)
 
 
 def paginator_func(objects, limit, request):
-    """Вынесенный в отдельную ф-ю паджинатор."""
+    """
+    Вынесенный в отдельную ф-ю паджинатор.
+
+    Старые ссылки вида `?page=N` обслуживаются обычным `Paginator`,
+    всё остальное — keyset-пагинацией по `?cursor=`.
+    """
 
-    paginator = Paginator(objects, limit)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    if PAGE_PARAM in request.GET:
+        paginator = Paginator(objects, limit)
+        return paginator.get_page(request.GET.get(PAGE_PARAM))
 
-    return page_obj
+    paginator = CursorPaginator(objects, limit)
+    return paginator.get_cursor_page(request.GET.get(CURSOR_PARAM))
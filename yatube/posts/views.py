@@ -1,57 +1,103 @@
 from typing import Any, Dict, Type, Union
+from urllib.parse import urlencode
 
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
 from django.db.models import QuerySet
-from django.http import HttpRequest, HttpResponse
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, render, redirect
 
+from core.db_router import read_only
+from core.query_budget import query_budget
+
+from .cache import (attach_card_versions, cache_anonymous_page, card_timeout,
+                    group_feed_key, index_feed_key, profile_feed_key)
+from .conditional import (group_condition, index_condition,
+                          post_detail_condition, profile_condition)
+from .export import EXPORT_FORMATS, export_lines
 from .forms import PostForm
-from .models import Group, Post, User
+from .models import FEED_DEFERRED_FIELDS, Group, Post, User
+from .ring import ring_page
+from .search import SearchResults
+from .thumbnails import prefetch_thumbnails
 from .utils import paginator_func
 from .constants import (GROUP_PER_PAGE_LIMIT, INDEX_PER_PAGE_LIMIT,
-                        PROFILE_PER_PAGE_LIMIT)
+                        PROFILE_PER_PAGE_LIMIT, QUERY_BUDGETS,
+                        SEARCH_PER_PAGE_LIMIT)
 
 
+@read_only
+@query_budget(QUERY_BUDGETS['index'])
+@index_condition
+@cache_anonymous_page(index_feed_key)
 def index(request: HttpRequest) -> HttpResponse:
-    posts: QuerySet = Post.objects.select_related(
-        'group', 'author',
-    ).all()
-    page_obj = paginator_func(posts, INDEX_PER_PAGE_LIMIT, request)
+    page_obj = ring_page(request, INDEX_PER_PAGE_LIMIT)
+    if page_obj is None:
+        posts: QuerySet = Post.objects.select_related(
+            'group', 'author',
+        ).defer(*FEED_DEFERRED_FIELDS)
+        page_obj = paginator_func(posts, INDEX_PER_PAGE_LIMIT, request)
+    attach_card_versions(page_obj)
+    prefetch_thumbnails(page_obj, 'card')
     context: Dict[str, QuerySet] = {
         'page_obj': page_obj,
+        'card_timeout': card_timeout(),
     }
 
     return render(request, 'posts/index.html', context)
 
 
+@read_only
+@query_budget(QUERY_BUDGETS['group_posts'])
+@group_condition
+@cache_anonymous_page(group_feed_key)
 def group_posts(request: HttpRequest, slug: Any) -> HttpResponse:
     group: Type[Group] = get_object_or_404(Group, slug=slug)
-    posts: QuerySet = group.posts.all()
+    posts: QuerySet = group.posts.select_related(
+        'author', 'group',
+    ).defer(*FEED_DEFERRED_FIELDS)
     page_obj = paginator_func(posts, GROUP_PER_PAGE_LIMIT, request)
+    attach_card_versions(page_obj)
+    prefetch_thumbnails(page_obj, 'card')
     context: Dict[str, Union[Type[Group], QuerySet]] = {
         'group': group,
         'page_obj': page_obj,
+        'card_timeout': card_timeout(),
     }
 
     return render(request, 'posts/group_list.html', context)
 
 
+@read_only
+@query_budget(QUERY_BUDGETS['profile'])
+@profile_condition
+@cache_anonymous_page(profile_feed_key)
 def profile(request, username):
-    user = get_object_or_404(User, username=username)
-    posts = user.posts.all()
+    user = get_object_or_404(
+        User.objects.select_related('stats'), username=username)
+    posts = user.posts.select_related('author', 'group').defer(
+        *FEED_DEFERRED_FIELDS)
     page_obj = paginator_func(posts, PROFILE_PER_PAGE_LIMIT, request)
+    attach_card_versions(page_obj)
+    prefetch_thumbnails(page_obj, 'card')
     context = {
         'author': user,
         'page_obj': page_obj,
+        'card_timeout': card_timeout(),
     }
 
     return render(request, 'posts/profile.html', context)
 
 
+@read_only
+@query_budget(QUERY_BUDGETS['post_detail'])
+@post_detail_condition
 def post_detail(request, post_id):
-    post = Post.objects.get(id=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author__stats', 'group'), id=post_id)
     context = {}
-    if post.author.username == request.user.username:
+    if post.author_id == request.user.id:
         context['is_edit'] = True
 
     context['post'] = post
@@ -59,9 +105,52 @@ def post_detail(request, post_id):
     return render(request, 'posts/post_detail.html', context)
 
 
+@read_only
+@query_budget(QUERY_BUDGETS['search'])
+def search(request):
+    query = request.GET.get('q', '').strip()
+    paginator = Paginator(SearchResults(query), SEARCH_PER_PAGE_LIMIT)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        'extra_query': urlencode({'q': query}),
+    }
+
+    return render(request, 'posts/search.html', context)
+
+
+def export_response(posts, request, name):
+    fmt = request.GET.get('format', 'jsonl')
+    if fmt not in EXPORT_FORMATS:
+        fmt = 'jsonl'
+    response = StreamingHttpResponse(
+        export_lines(posts, fmt), content_type=EXPORT_FORMATS[fmt])
+    response['Content-Disposition'] = (
+        f'attachment; filename="{name}.{fmt}"')
+    return response
+
+
+@query_budget(QUERY_BUDGETS['export'])
+@staff_member_required
+def profile_export(request, username):
+    user = get_object_or_404(User, username=username)
+    return export_response(
+        Post.objects.filter(author=user), request, f'posts-{username}')
+
+
+@query_budget(QUERY_BUDGETS['export'])
+@staff_member_required
+def group_export(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return export_response(
+        Post.objects.filter(group=group), request, f'posts-{slug}')
+
+
+@query_budget(QUERY_BUDGETS['post_create'])
 @login_required
 def post_create(request):
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     if form.is_valid():
         new_post = form.save(commit=False)
         new_post.author = request.user
@@ -76,14 +165,17 @@ def post_create(request):
     return render(request, 'posts/create_post.html', context)
 
 
+@query_budget(QUERY_BUDGETS['post_edit'])
 @login_required
 def post_edit(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
-    if post.author.username != request.user.username:
+    # Автор нужен кольцу новых постов после сохранения.
+    post = get_object_or_404(Post.objects.select_related('author'), id=post_id)
+    if post.author_id != request.user.id:
 
         return redirect('posts:post_detail', post_id)
 
-    form = PostForm(request.POST or None, instance=post)
+    form = PostForm(
+        request.POST or None, files=request.FILES or None, instance=post)
     if form.is_valid():
         form.save()
 
@@ -0,0 +1,18 @@
+from django.contrib import admin
+
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    """Очередь задач: только просмотр, правит её воркер."""
+
+    list_display = (
+        'pk', 'name', 'status', 'attempts', 'run_at', 'wait_ms', 'run_ms')
+    list_filter = ('status', 'name')
+    search_fields = ('dedup_key',)
+    readonly_fields = [field.name for field in Task._meta.fields]
+    empty_value_display = '-пусто-'
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,67 @@
+import base64
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+
+from .queue import task
+
+MESSAGE_FIELDS = (
+    'subject', 'body', 'from_email', 'to', 'cc', 'bcc', 'reply_to',
+    'extra_headers', 'alternatives',
+)
+
+
+def serialize_attachment(attachment):
+    filename, content, mimetype = attachment
+    if isinstance(content, bytes):
+        return [filename, base64.b64encode(content).decode(), mimetype, True]
+    return [filename, content, mimetype, False]
+
+
+def serialize_message(message):
+    data = {name: getattr(message, name, None) for name in MESSAGE_FIELDS}
+    data['attachments'] = [
+        serialize_attachment(attachment)
+        for attachment in message.attachments
+    ]
+    return data
+
+
+def deserialize_message(data):
+    message = EmailMultiAlternatives(
+        subject=data['subject'],
+        body=data['body'],
+        from_email=data['from_email'],
+        to=data['to'],
+        cc=data['cc'],
+        bcc=data['bcc'],
+        reply_to=data['reply_to'],
+        headers=data['extra_headers'],
+        alternatives=[tuple(item) for item in data['alternatives'] or ()],
+    )
+    for filename, content, mimetype, encoded in data['attachments']:
+        if encoded:
+            content = base64.b64decode(content)
+        message.attach(filename, content, mimetype)
+    return message
+
+
+@task(max_attempts=5)
+def send_queued_email(data):
+    """Отправляет письмо настоящим бэкендом из QUEUED_EMAIL_BACKEND."""
+
+    connection = get_connection(settings.QUEUED_EMAIL_BACKEND)
+    connection.send_messages([deserialize_message(data)])
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """
+    Бэкенд почты для запросов: письма не отправляются, а ставятся
+    в очередь задач, и ответ не ждёт SMTP или записи файла.
+    """
+
+    def send_messages(self, email_messages):
+        for message in email_messages:
+            send_queued_email.enqueue(serialize_message(message))
+        return len(email_messages)
@@ -0,0 +1,42 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from tasks.queue import tasks_settings
+from tasks.worker import Worker
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет задачи из очереди в пуле потоков или процессов. '
+        'SIGINT/SIGTERM останавливают приём новых задач, а начатые '
+        'дорабатывают.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int)
+        parser.add_argument(
+            '--processes', action='store_true', default=None,
+            help='Пул процессов вместо потоков.')
+        parser.add_argument('--poll-interval', type=float)
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Выйти, когда в очереди не останется готовых задач.')
+
+    def handle(self, *args, workers, processes, poll_interval, burst,
+               **options):
+        settings = tasks_settings()
+        for key, value in (
+            ('WORKERS', workers),
+            ('PROCESSES', processes),
+            ('POLL_INTERVAL', poll_interval),
+        ):
+            if value is not None:
+                settings[key] = value
+        worker = Worker(settings)
+        signal.signal(signal.SIGINT, worker.stop)
+        signal.signal(signal.SIGTERM, worker.stop)
+        self.stdout.write(
+            f'Воркер {worker.name}: {settings["WORKERS"]} '
+            f'{"процессов" if settings["PROCESSES"] else "потоков"}')
+        worker.run(burst=burst)
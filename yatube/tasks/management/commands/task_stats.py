@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, Max, Q
+
+from tasks.models import DONE, FAILED, PENDING, Task
+
+
+class Command(BaseCommand):
+    help = 'Сводка по задачам: сколько ждут и выполнены, время в мс.'
+
+    def handle(self, *args, **options):
+        rows = Task.objects.values('name').annotate(
+            pending=Count('pk', filter=Q(status=PENDING)),
+            done=Count('pk', filter=Q(status=DONE)),
+            failed=Count('pk', filter=Q(status=FAILED)),
+            avg_wait=Avg('wait_ms'),
+            avg_run=Avg('run_ms'),
+            max_run=Max('run_ms'),
+        ).order_by('name')
+        for row in rows:
+            self.stdout.write(
+                '{name}: ждут {pending}, выполнены {done}, ошибки {failed}; '
+                'ожидание {avg_wait:.1f}, выполнение {avg_run:.1f} '
+                '(макс. {max_run:.1f})'.format(**{
+                    **row,
+                    **{
+                        key: row[key] or 0
+                        for key in ('avg_wait', 'avg_run', 'max_run')
+                    },
+                }))
@@ -0,0 +1,52 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:53
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='функция')),
+                ('payload', models.TextField(verbose_name='аргументы в JSON')),
+                ('dedup_key', models.CharField(blank=True, max_length=200, null=True, verbose_name='ключ дедупликации')),
+                ('status', models.CharField(choices=[('pending', 'в очереди'), ('running', 'выполняется'), ('done', 'выполнена'), ('failed', 'не выполнена')], default='pending', max_length=10, verbose_name='статус')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='попыток')),
+                ('max_attempts', models.PositiveIntegerField(verbose_name='максимум попыток')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='поставлена в очередь')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='выполнить не раньше')),
+                ('started', models.DateTimeField(blank=True, null=True, verbose_name='начало попытки')),
+                ('finished', models.DateTimeField(blank=True, null=True, verbose_name='окончание')),
+                ('wait_ms', models.FloatField(blank=True, null=True, verbose_name='ожидание в очереди, мс')),
+                ('run_ms', models.FloatField(blank=True, null=True, verbose_name='выполнение, мс')),
+                ('worker', models.CharField(blank=True, max_length=100, verbose_name='воркер')),
+                ('last_error', models.TextField(blank=True, verbose_name='ошибка')),
+            ],
+            options={
+                'verbose_name': 'Задача',
+                'verbose_name_plural': 'Задачи',
+                'ordering': ('run_at', 'id'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'run_at', 'id'], name='task_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'finished'], name='task_finished_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.UniqueConstraint(condition=models.Q(status='pending'), fields=('dedup_key',), name='task_pending_dedup'),
+        ),
+    ]
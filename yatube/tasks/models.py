@@ -0,0 +1,78 @@
+from django.db import models
+from django.utils import timezone
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+STATUSES = (
+    (PENDING, 'в очереди'),
+    (RUNNING, 'выполняется'),
+    (DONE, 'выполнена'),
+    (FAILED, 'не выполнена'),
+)
+
+
+class Task(models.Model):
+    """Отложенная задача: вызов зарегистрированной функции воркером."""
+
+    name = models.CharField(max_length=200, verbose_name='функция')
+    payload = models.TextField(verbose_name='аргументы в JSON')
+    dedup_key = models.CharField(
+        max_length=200,
+        blank=True,
+        null=True,
+        verbose_name='ключ дедупликации',
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUSES,
+        default=PENDING,
+        verbose_name='статус',
+    )
+    attempts = models.PositiveIntegerField(
+        default=0, verbose_name='попыток')
+    max_attempts = models.PositiveIntegerField(
+        verbose_name='максимум попыток')
+    created = models.DateTimeField(
+        auto_now_add=True, verbose_name='поставлена в очередь')
+    run_at = models.DateTimeField(
+        default=timezone.now, verbose_name='выполнить не раньше')
+    started = models.DateTimeField(
+        blank=True, null=True, verbose_name='начало попытки')
+    finished = models.DateTimeField(
+        blank=True, null=True, verbose_name='окончание')
+    wait_ms = models.FloatField(
+        blank=True, null=True, verbose_name='ожидание в очереди, мс')
+    run_ms = models.FloatField(
+        blank=True, null=True, verbose_name='выполнение, мс')
+    worker = models.CharField(
+        max_length=100, blank=True, verbose_name='воркер')
+    last_error = models.TextField(blank=True, verbose_name='ошибка')
+
+    class Meta:
+        ordering = ('run_at', 'id')
+        indexes = (
+            # Выбор следующих задач воркером.
+            models.Index(
+                fields=('status', 'run_at', 'id'),
+                name='task_queue_idx',
+            ),
+            models.Index(
+                fields=('status', 'finished'),
+                name='task_finished_idx',
+            ),
+        )
+        constraints = (
+            # Две одинаковые задачи могут ждать очереди только как одна.
+            models.UniqueConstraint(
+                fields=('dedup_key',),
+                condition=models.Q(status=PENDING),
+                name='task_pending_dedup',
+            ),
+        )
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
@@ -0,0 +1,212 @@
+import json
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import DONE, FAILED, PENDING, RUNNING, Task
+
+
+# Переопределяются ключами settings.TASKS. RETRY_DELAY удваивается
+# с каждой попыткой, брошенные задачи возвращаются в очередь через
+# STALE_AFTER секунд, выполненные хранятся KEEP_DONE секунд.
+DEFAULT_SETTINGS = {
+    'WORKERS': 4,
+    'PROCESSES': False,
+    'POLL_INTERVAL': 1.0,
+    'MAX_ATTEMPTS': 3,
+    'RETRY_DELAY': 10,
+    'STALE_AFTER': 10 * 60,
+    'KEEP_DONE': 7 * 24 * 60 * 60,
+}
+SUPERSEDED = 'Её работу уже ждёт в очереди задача с тем же ключом.'
+
+
+def tasks_settings():
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'TASKS', {})}
+
+
+class TaskFunction:
+    """
+    Функция, которую можно поставить в очередь. Обычный вызов выполняет
+    её сразу; `enqueue()` записывает задачу и возвращается.
+    """
+
+    def __init__(self, func, max_attempts=None):
+        self.func = func
+        self.name = f'{func.__module__}.{func.__qualname__}'
+        self.max_attempts = max_attempts
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, *args, dedup_key=None, delay=None, **kwargs):
+        return enqueue(
+            self.name, args, kwargs,
+            dedup_key=dedup_key,
+            delay=delay,
+            max_attempts=(
+                self.max_attempts or tasks_settings()['MAX_ATTEMPTS']),
+        )
+
+
+def task(func=None, *, max_attempts=None):
+    """Декоратор функции-задачи: `@task` или `@task(max_attempts=5)`."""
+
+    if func is None:
+        return lambda func: TaskFunction(func, max_attempts)
+    return TaskFunction(func, max_attempts)
+
+
+def enqueue(name, args=(), kwargs=None, dedup_key=None, delay=None,
+            max_attempts=1):
+    """
+    Ставит задачу в очередь в текущей транзакции: воркер увидит её только
+    после коммита. Если в очереди уже ждёт задача с тем же `dedup_key`,
+    новая не создаётся и возвращается ожидающая.
+    """
+
+    task = Task(
+        name=name,
+        payload=json.dumps(
+            {'args': list(args), 'kwargs': kwargs or {}},
+            cls=DjangoJSONEncoder,
+        ),
+        dedup_key=dedup_key,
+        max_attempts=max_attempts,
+        run_at=timezone.now() + timedelta(seconds=delay or 0),
+    )
+    if dedup_key is None:
+        task.save()
+        return task
+    try:
+        with transaction.atomic():
+            task.save()
+    except IntegrityError:
+        pending = Task.objects.filter(
+            dedup_key=dedup_key, status=PENDING).first()
+        if pending is None:
+            # Ожидавшую задачу только что забрал воркер.
+            return enqueue(
+                name, args, kwargs, dedup_key, delay, max_attempts)
+        return pending
+    return task
+
+
+def get_task(name):
+    func = import_string(name)
+    if not isinstance(func, TaskFunction):
+        raise ImportError(f'{name} не зарегистрирована как задача')
+    return func
+
+
+def run_task(name, payload):
+    """
+    Выполняет задачу в потоке или процессе пула. Не бросает исключений:
+    возвращает текст ошибки или None и время выполнения в мс.
+    """
+
+    close_old_connections()
+    started = time.perf_counter()
+    error = None
+    try:
+        data = json.loads(payload)
+        get_task(name)(*data['args'], **data['kwargs'])
+    except Exception:
+        error = traceback.format_exc()
+    finally:
+        close_old_connections()
+    return error, (time.perf_counter() - started) * 1000
+
+
+def claim_tasks(limit, worker):
+    """
+    Забирает до `limit` готовых к выполнению задач. Каждая помечается
+    условным UPDATE, поэтому два воркера не возьмут одну задачу.
+    """
+
+    now = timezone.now()
+    candidates = Task.objects.filter(
+        status=PENDING, run_at__lte=now,
+    ).values_list('pk', flat=True)[:limit]
+    claimed = []
+    for pk in candidates:
+        if Task.objects.filter(pk=pk, status=PENDING).update(
+                status=RUNNING, started=now, worker=worker):
+            claimed.append(pk)
+    tasks = list(Task.objects.filter(pk__in=claimed))
+    for task in tasks:
+        task.attempts += 1
+        task.wait_ms = (now - task.run_at).total_seconds() * 1000
+    Task.objects.bulk_update(tasks, ('attempts', 'wait_ms'))
+    return tasks
+
+
+def finish_task(task, error, run_ms):
+    """
+    Записывает итог попытки. После ошибки задача возвращается в очередь
+    с экспоненциальной задержкой, пока не кончатся попытки, — если
+    только её работу уже не ждёт в очереди задача с тем же ключом:
+    это проверяет само ограничение уникальности при сохранении.
+    """
+
+    now = timezone.now()
+    task.run_ms = run_ms
+    task.last_error = error or ''
+    if error is None:
+        task.status = DONE
+        task.finished = now
+    elif task.attempts < task.max_attempts:
+        task.status = PENDING
+        task.run_at = now + timedelta(seconds=(
+            tasks_settings()['RETRY_DELAY'] * 2 ** (task.attempts - 1)))
+    else:
+        task.status = FAILED
+        task.finished = now
+    fields = ('status', 'run_at', 'finished', 'run_ms', 'last_error')
+    try:
+        with transaction.atomic():
+            task.save(update_fields=fields)
+    except IntegrityError:
+        task.status = FAILED
+        task.finished = now
+        task.save(update_fields=fields)
+    return task
+
+
+def recover_stale_tasks(stale_after):
+    """
+    Возвращает в очередь задачи, брошенные остановившимся воркером.
+    Задача с ключом, работу которой уже ждёт в очереди другая, не
+    возвращается, а завершается как ненужная.
+    """
+
+    now = timezone.now()
+    stale = Task.objects.filter(
+        status=RUNNING,
+        started__lt=now - timedelta(seconds=stale_after),
+    )
+    recovered = stale.filter(dedup_key__isnull=True).update(
+        status=PENDING, run_at=now)
+    for pk in list(stale.values_list('pk', flat=True)):
+        try:
+            with transaction.atomic():
+                recovered += Task.objects.filter(
+                    pk=pk, status=RUNNING).update(status=PENDING, run_at=now)
+        except IntegrityError:
+            Task.objects.filter(pk=pk, status=RUNNING).update(
+                status=FAILED, finished=now, last_error=SUPERSEDED)
+    return recovered
+
+
+def purge_finished_tasks(keep):
+    return Task.objects.filter(
+        status__in=(DONE, FAILED),
+        finished__lt=timezone.now() - timedelta(seconds=keep),
+    ).delete()[0]
@@ -0,0 +1,155 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks.models import DONE, FAILED, PENDING, RUNNING, Task
+from tasks.queue import (claim_tasks, enqueue, finish_task,
+                         recover_stale_tasks, run_task, task, tasks_settings)
+from tasks.worker import Worker
+
+User = get_user_model()
+
+CALLS = []
+
+
+@task
+def remember(value, twice=False):
+    CALLS.append(value * 2 if twice else value)
+
+
+@task(max_attempts=2)
+def explode():
+    raise ValueError('сбой задачи')
+
+
+def not_a_task():
+    pass
+
+
+def run_worker():
+    Worker({**tasks_settings(), 'WORKERS': 2, 'POLL_INTERVAL': 0.01}).run(
+        burst=True)
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_worker_runs_tasks_and_records_timings(self):
+        """Тестируем выполнение задач пулом и их метрики."""
+
+        for value in range(3):
+            remember.enqueue(value, twice=True)
+        run_worker()
+        self.assertCountEqual(CALLS, [0, 2, 4])
+        for saved in Task.objects.all():
+            with self.subTest(task=saved.pk):
+                self.assertEqual(saved.status, DONE)
+                self.assertEqual(saved.attempts, 1)
+                self.assertIsNotNone(saved.wait_ms)
+                self.assertIsNotNone(saved.run_ms)
+                self.assertIsNotNone(saved.finished)
+
+    def test_failed_task_is_retried_with_backoff(self):
+        """Тестируем повтор упавшей задачи и отказ после последней попытки."""
+
+        saved = explode.enqueue()
+        run_worker()
+        saved.refresh_from_db()
+        self.assertEqual(saved.status, PENDING)
+        self.assertGreater(saved.run_at, timezone.now())
+        self.assertIn('сбой задачи', saved.last_error)
+        Task.objects.filter(pk=saved.pk).update(run_at=timezone.now())
+        run_worker()
+        saved.refresh_from_db()
+        self.assertEqual(saved.status, FAILED)
+        self.assertEqual(saved.attempts, 2)
+
+    def test_dedup_key_keeps_one_pending_task(self):
+        """Тестируем, что задачи с одним ключом ждут в очереди как одна."""
+
+        first = remember.enqueue(1, dedup_key='remember:1')
+        second = remember.enqueue(1, dedup_key='remember:1')
+        self.assertEqual(first.pk, second.pk)
+        claim_tasks(1, 'test')
+        third = remember.enqueue(1, dedup_key='remember:1')
+        self.assertNotEqual(third.pk, first.pk)
+        self.assertEqual(Task.objects.count(), 2)
+
+    def test_retry_yields_to_pending_duplicate(self):
+        """Тестируем, что повтор не нужен, если дубль уже в очереди."""
+
+        running = explode.enqueue(dedup_key='explode')
+        claimed, = claim_tasks(1, 'test')
+        explode.enqueue(dedup_key='explode')
+        finish_task(claimed, 'ошибка', 1.0)
+        running.refresh_from_db()
+        self.assertEqual(running.status, FAILED)
+
+    def test_task_is_claimed_once(self):
+        """Тестируем, что задачу забирает только один воркер."""
+
+        remember.enqueue(1)
+        self.assertEqual(len(claim_tasks(10, 'first')), 1)
+        self.assertListEqual(claim_tasks(10, 'second'), [])
+
+    def test_delayed_and_stale_tasks(self):
+        """Тестируем отложенный запуск и возврат брошенных задач."""
+
+        remember.enqueue(1, delay=60)
+        self.assertListEqual(claim_tasks(10, 'test'), [])
+        stale = remember.enqueue(2)
+        claim_tasks(10, 'test')
+        Task.objects.filter(pk=stale.pk).update(
+            started=timezone.now() - timedelta(hours=1))
+        self.assertEqual(recover_stale_tasks(60), 1)
+        self.assertEqual(Task.objects.get(pk=stale.pk).status, PENDING)
+        self.assertEqual(
+            Task.objects.filter(status=RUNNING).count(), 0)
+
+    def test_stale_task_yields_to_pending_duplicate(self):
+        """Тестируем возврат брошенной задачи, чей дубль уже в очереди."""
+
+        stale = remember.enqueue(1, dedup_key='remember:1')
+        claim_tasks(1, 'test')
+        pending = remember.enqueue(1, dedup_key='remember:1')
+        Task.objects.filter(pk=stale.pk).update(
+            started=timezone.now() - timedelta(hours=1))
+        self.assertEqual(recover_stale_tasks(60), 0)
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, FAILED)
+        self.assertListEqual(
+            list(Task.objects.filter(status=PENDING)), [pending])
+
+    def test_only_registered_tasks_run(self):
+        """Тестируем, что воркер не вызывает произвольные функции."""
+
+        saved = enqueue(f'{__name__}.not_a_task')
+        error, run_ms = run_task(saved.name, saved.payload)
+        self.assertIn('не зарегистрирована', error)
+
+
+@override_settings(
+    EMAIL_BACKEND='tasks.mail.QueuedEmailBackend',
+    QUEUED_EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class QueuedEmailTests(TestCase):
+    def test_password_reset_email_is_sent_by_worker(self):
+        """Тестируем, что письмо сброса пароля отправляет воркер."""
+
+        User.objects.create_user(
+            username='test_user', email='user@example.com',
+            password='password-123')
+        response = self.client.post(
+            reverse('password_reset'), {'email': 'user@example.com'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(Task.objects.filter(status=PENDING).count(), 1)
+        run_worker()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertListEqual(mail.outbox[0].to, ['user@example.com'])
+        self.assertIn('test_user', mail.outbox[0].body)
@@ -0,0 +1,94 @@
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+
+import django
+
+from .queue import (claim_tasks, finish_task, purge_finished_tasks,
+                    recover_stale_tasks, run_task)
+
+metrics_logger = logging.getLogger('yatube.tasks')
+
+
+def task_metrics(task):
+    return {
+        'task': task.name,
+        'id': task.pk,
+        'status': task.status,
+        'attempt': task.attempts,
+        'wait_ms': round(task.wait_ms or 0, 3),
+        'run_ms': round(task.run_ms, 3),
+    }
+
+
+class Worker:
+    """
+    Главный поток забирает задачи из таблицы и пишет их итоги, а сами
+    функции выполняются в пуле потоков или процессов. В пул уходят
+    только имя функции и аргументы, так что оба пула устроены одинаково.
+    """
+
+    def __init__(self, options):
+        self.options = options
+        self.name = f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = threading.Event()
+        self.running = {}
+
+    def make_executor(self):
+        workers = self.options['WORKERS']
+        if not self.options['PROCESSES']:
+            return ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix='task')
+        # spawn: дочерние процессы не наследуют соединения с базой.
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=django.setup,
+        )
+
+    def stop(self, *args):
+        self.stopping.set()
+
+    def run(self, burst=False):
+        """
+        Выполняет задачи до `stop()`; в режиме `burst` — пока в очереди
+        есть готовые задачи. Запущенные задачи всегда дорабатывают.
+        """
+
+        recover_stale_tasks(self.options['STALE_AFTER'])
+        purge_finished_tasks(self.options['KEEP_DONE'])
+        with self.make_executor() as executor:
+            while not self.stopping.is_set():
+                claimed = self.submit(executor)
+                if not self.running:
+                    if burst and not claimed:
+                        break
+                    self.stopping.wait(self.options['POLL_INTERVAL'])
+                    continue
+                self.collect(self.options['POLL_INTERVAL'])
+            self.collect(None, until_empty=True)
+
+    def submit(self, executor):
+        free = self.options['WORKERS'] - len(self.running)
+        if free <= 0:
+            return []
+        tasks = claim_tasks(free, self.name)
+        for task in tasks:
+            future = executor.submit(run_task, task.name, task.payload)
+            self.running[future] = task
+        return tasks
+
+    def collect(self, timeout, until_empty=False):
+        while self.running:
+            done, _ = wait(
+                self.running, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = finish_task(self.running.pop(future), *future.result())
+                metrics_logger.info(json.dumps(task_metrics(task)))
+            if not until_empty:
+                return
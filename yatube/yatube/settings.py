@@ -20,29 +20,99 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'sorl.thumbnail',
     'posts.apps.PostsConfig',
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
+    'tasks.apps.TasksConfig',
 
 ]
 
+# Всё, что сбрасывается версиями (core.cache.bump_version), требует
+# общего для процессов кэша: memcached через pylibmc по адресам из
+# YATUBE_MEMCACHED (через запятую). Без него кэш локален, и сайт
+# запускается одним процессом — это проверяет `check --deploy`.
+MEMCACHED_LOCATION = os.environ.get('YATUBE_MEMCACHED')
+SHARED_CACHE = bool(MEMCACHED_LOCATION)
+
+# Сессии и пользователь запроса кэшируются только в общем кэше: иначе
+# выход и смена пароля в одном процессе не завершают сессию в других.
+if SHARED_CACHE:
+    AUTHENTICATION_MIDDLEWARE = 'core.middleware.CachedAuthenticationMiddleware'
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+else:
+    AUTHENTICATION_MIDDLEWARE = 'django.contrib.auth.middleware.AuthenticationMiddleware'
+    SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+
 MIDDLEWARE = [
+    'core.middleware.LoadSheddingMiddleware',
+    'core.middleware.QueryBudgetMiddleware',
+    'core.middleware.ServerTimingMiddleware',
+    'core.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    AUTHENTICATION_MIDDLEWARE,
+    'core.middleware.RateLimitMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# При превышении бюджета SQL-запросов view в строгом режиме бросается
+# исключение (так работают тесты), иначе превышение пишется в лог.
+QUERY_BUDGET_STRICT = False
+
+# Лимиты частоты по имени URL: ключ — пользователь ('user', анонимы
+# по IP) или IP, rate — 'число/период' (s, m, h, d), algorithm —
+# 'sliding' (скользящее окно) или 'bucket' (корзина токенов на burst
+# запросов). По умолчанию ограничивается только POST. Счётчики живут
+# в кэше, поэтому лимиты включены только с общим кэшем: с локальным
+# каждый процесс пропускал бы свой лимит.
+RATE_LIMITS_ENABLED = SHARED_CACHE
+# Заголовок с адресом клиента за прокси (например, X-Forwarded-For) и
+# число доверенных прокси, дописывающих в него адрес. Без заголовка
+# клиентом считается REMOTE_ADDR.
+CLIENT_IP_HEADER = os.environ.get('YATUBE_CLIENT_IP_HEADER')
+TRUSTED_PROXY_COUNT = int(os.environ.get('YATUBE_TRUSTED_PROXY_COUNT', 1))
+LOGIN_RATE_LIMITS = (
+    {'key': 'ip', 'rate': '20/m', 'algorithm': 'sliding'},
+)
+RATE_LIMITS = {
+    'posts:post_create': (
+        {'key': 'user', 'rate': '10/m', 'algorithm': 'bucket', 'burst': 5},
+    ),
+    'posts:post_edit': (
+        {'key': 'user', 'rate': '30/m', 'algorithm': 'bucket', 'burst': 10},
+    ),
+    'users:signup': (
+        {'key': 'ip', 'rate': '10/h', 'algorithm': 'sliding'},
+    ),
+    'users:login': LOGIN_RATE_LIMITS,
+    'login': LOGIN_RATE_LIMITS,
+}
+
+# Отсечение нагрузки в процессе; умолчания и описание ключей —
+# в core.load_shedding.DEFAULT_SETTINGS, здесь только переопределения.
+LOAD_SHEDDING = {}
+
+# Выборочное профилирование; умолчания и описание ключей —
+# в core.profiling.DEFAULT_SETTINGS, здесь только переопределения.
+PROFILING = {
+    'SAMPLE_RATE': float(os.environ.get('YATUBE_PROFILE_SAMPLE_RATE', 0)),
+    'TOKEN': os.environ.get('YATUBE_PROFILE_TOKEN'),
+    'DIR': os.path.join(BASE_DIR, 'profiles'),
+}
+
 ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template_backends.TimedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -60,13 +130,53 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
+TEST_RUNNER = 'core.test_runner.QueryBudgetTestRunner'
+
+# Бэкенд core.db применяет PRAGMA (WAL, synchronous, busy_timeout,
+# cache_size, mmap_size) при открытии каждого соединения; значения по
+# умолчанию — в нём, а ключ PRAGMAS переопределяет отдельные из них.
+# Транзакции начинаются с BEGIN IMMEDIATE (ключ TRANSACTION_MODE).
+# CONN_MAX_AGE оставляет соединение открытым между запросами.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'core.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': 60,
     }
 }
 
+# Реплика для чтений подключается переменной окружения; локально это
+# второй файл SQLite, который обновляет команда sync_replica.
+REPLICA_DB_NAME = os.environ.get('YATUBE_REPLICA_DB')
+if REPLICA_DB_NAME:
+    DATABASES['replica'] = {
+        'ENGINE': 'core.db.backends.sqlite3',
+        'NAME': REPLICA_DB_NAME,
+        'CONN_MAX_AGE': 60,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.db_router.PrimaryReplicaRouter']
+
+# Сколько секунд после записи пользователь читает из основной базы.
+REPLICA_STICKY_SECONDS = 5
+
+# Общий кэш или локальный — см. SHARED_CACHE выше.
+if SHARED_CACHE:
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache_backends.TimedPyLibMCCache',
+            'LOCATION': MEMCACHED_LOCATION.split(','),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache_backends.TimedLocMemCache',
+            'LOCATION': 'yatube',
+        }
+    }
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -95,9 +205,60 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Хранилище ключей sorl-thumbnail читается из кэша, а в базу идёт только
+# при промахе: страницы со списками постов не обращаются к файлам.
+THUMBNAIL_KVSTORE = 'sorl.thumbnail.kvstores.cached_db_kvstore.KVStore'
+THUMBNAIL_UPSCALE = False
+# Миниатюры картинок постов делает пул процессов после коммита; 0 —
+# делать их синхронно в том же процессе.
+THUMBNAIL_WORKERS = int(os.environ.get('YATUBE_THUMBNAIL_WORKERS', 2))
+
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Письма из запросов ставятся в очередь задач, а воркер run_tasks
+# отправляет их бэкендом QUEUED_EMAIL_BACKEND.
+EMAIL_BACKEND = 'tasks.mail.QueuedEmailBackend'
+QUEUED_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+# Очередь задач в таблице tasks_task; умолчания и описание ключей —
+# в tasks.queue.DEFAULT_SETTINGS, здесь только переопределения.
+TASKS = {
+    'WORKERS': int(os.environ.get('YATUBE_TASK_WORKERS', 4)),
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'raw': {
+            'format': '%(message)s',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+        'timing': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'raw',
+        },
+    },
+    'loggers': {
+        'yatube': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+        # Одна JSON-строка на запрос с разбивкой времени для дашбордов.
+        'yatube.timing': {
+            'handlers': ['timing'],
+            'level': os.environ.get('YATUBE_TIMING_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}